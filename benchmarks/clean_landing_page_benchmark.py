@@ -0,0 +1,54 @@
+"""Benchmark: CleanLandingPage.process_data on synthetic landing pages.
+The joins run on 1M landing pages against 50k organisations, the previous
+iterrows implementation only on a sample, as it scans the data for each record.
+
+    python benchmarks/clean_landing_page_benchmark.py
+"""
+import sys
+import os
+import time
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+# pylint: disable=wrong-import-position
+from data_transform.clean_landing_page import CleanLandingPage
+from tests.data_transform.clean_landing_page_tests import (SACOMMUNITY_URL,
+                                                           get_landing_page_df,
+                                                           get_sa_community_df,
+                                                           process_data_iterrows)
+# pylint: enable=wrong-import-position
+
+NUMBER_OF_PAGES = 1_000_000
+NUMBER_OF_ORGANIZATIONS = 50_000
+NUMBER_OF_SAMPLE_PAGES = 5_000
+
+
+def timed(func) -> float:
+    """elapsed seconds of the function"""
+    started_at = time.perf_counter()
+    func()
+    return time.perf_counter() - started_at
+
+
+def main():
+    """print elapsed time of each implementation"""
+    clean_landing_page = CleanLandingPage(SACOMMUNITY_URL)
+    landing_page_df = get_landing_page_df(NUMBER_OF_PAGES, NUMBER_OF_ORGANIZATIONS)
+    sa_community_df = get_sa_community_df(NUMBER_OF_ORGANIZATIONS)
+    sample_df = landing_page_df.head(NUMBER_OF_SAMPLE_PAGES)
+
+    runs = [
+        ('iterrows', NUMBER_OF_SAMPLE_PAGES, lambda: process_data_iterrows(
+            clean_landing_page, sample_df, sa_community_df)),
+        ('joins', NUMBER_OF_SAMPLE_PAGES, lambda: clean_landing_page.process_data(
+            sample_df, sa_community_df)),
+        ('joins', NUMBER_OF_PAGES, lambda: clean_landing_page.process_data(
+            landing_page_df, sa_community_df)),
+    ]
+    print(f'{NUMBER_OF_ORGANIZATIONS} organisations in sa community export')
+    print(f'{"implementation":<20} {"pages":>10} {"seconds":>8}')
+    for name, number_of_pages, run in runs:
+        print(f'{name:<20} {number_of_pages:>10} {timed(run):>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
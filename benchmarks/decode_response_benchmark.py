@@ -0,0 +1,72 @@
+"""Benchmark: decoding of a synthetic 100k rows landing page response,
+row dictionaries against columnar decoding (dataframe with renamed and converted columns).
+
+    python benchmarks/decode_response_benchmark.py
+"""
+import sys
+import os
+import time
+from datetime import date
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+# pylint: disable=wrong-import-position
+from data_retrieval.google_analytics_api_retrieval import GoogleAnalyticsApiRetrieval
+from dtos.date_range_dto import DateRangeDto
+from helpers.enums import GoogleApiVersion, GoogleAuthenticationMethod
+# pylint: enable=wrong-import-position
+
+NUMBER_OF_ROWS = 100_000
+REPEAT = 5
+
+
+def get_response(number_of_rows: int):
+    """synthetic landing page response"""
+    devices = ['desktop', 'mobile', 'tablet']
+    sources = ['google / organic', '(direct) / (none)', 'facebook.com / referral']
+    rows = [{'dimensions': [str(i % 70),
+                            f'/org/{200000 + i % 5000}-Organisation_{i % 5000}',
+                            devices[i % 3],
+                            sources[i % 3]],
+             'metrics': [{'values': [str(i % 17 + 1)]}]}
+            for i in range(number_of_rows)]
+    return {'reports': [{
+        'columnHeader': {
+            'dimensions': ['ga:customVarValue1', 'ga:landingPagePath',
+                           'ga:deviceCategory', 'ga:sourceMedium'],
+            'metricHeader': {'metricHeaderEntries': [{'name': 'ga:sessions',
+                                                      'type': 'INTEGER'}]}},
+        'data': {'rows': rows, 'totals': [{'values': [str(number_of_rows)]}]}}]}
+
+
+def measure(google_analytics_api: GoogleAnalyticsApiRetrieval, response, date_range) -> float:
+    """best of REPEAT runs in seconds"""
+    timings = []
+    for _ in range(REPEAT):
+        started_at = time.perf_counter()
+        google_analytics_api.format_data_df(
+            google_analytics_api.decode_response(response, date_range),
+            GoogleApiVersion.VERSION_3)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main():
+    """print decoding time of both decoders"""
+    response = get_response(NUMBER_OF_ROWS)
+    date_range = DateRangeDto(date(2024, 1, 1), date(2024, 1, 1))
+    google_analytics_api = GoogleAnalyticsApiRetrieval(GoogleAuthenticationMethod.OAUTH,
+                                                       'credentials.json', 'token.json')
+
+    google_analytics_api.columnar_decoding = False
+    row_seconds = measure(google_analytics_api, response, date_range)
+    google_analytics_api.columnar_decoding = True
+    columnar_seconds = measure(google_analytics_api, response, date_range)
+
+    print(f'{NUMBER_OF_ROWS} rows, best of {REPEAT}')
+    print(f'{"decoder":>10} {"seconds":>8}')
+    print(f'{"rows":>10} {row_seconds:>8.3f}')
+    print(f'{"columnar":>10} {columnar_seconds:>8.3f}  ({row_seconds / columnar_seconds:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: reading a year of daily landing page files back into one dataframe,
+pd.read_csv per day against FileHelper.read_range on csv and parquet files.
+
+    python benchmarks/read_range_benchmark.py
+"""
+import sys
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+# pylint: disable=wrong-import-position
+import numpy as np
+import pandas as pd
+from helpers.enums import DataFrequency, DataModule, StorageFormat
+from helpers.file_helper import FileHelper
+# pylint: enable=wrong-import-position
+
+NUMBER_OF_DAYS = 365
+ROWS_PER_DAY = 3000
+START_DATE = date(2022, 7, 1)
+
+
+def get_landing_page_df(date_obj: date) -> pd.DataFrame:
+    """synthetic landing page data of the day"""
+    i = np.arange(ROWS_PER_DAY)
+    return pd.DataFrame({'start_date': pd.Timestamp(date_obj),
+                         'end_date': pd.Timestamp(date_obj),
+                         'dataset_id': (i % 70).astype(str),
+                         'landing_page': [f'/org/{200000 + n}-Organisation_{n}'
+                                          for n in i % 5000],
+                         'device_category': np.array(['desktop', 'mobile', 'tablet'])[i % 3],
+                         'source_medium': np.array(['google / organic', '(direct) / (none)',
+                                                    'facebook.com / referral'])[i % 3],
+                         'sessions': i % 17 + 1})
+
+
+def save_year(file_helper: FileHelper, root_dir: str):
+    """save a year of daily files in csv and parquet"""
+    for i in range(NUMBER_OF_DAYS):
+        date_obj = START_DATE + timedelta(days=i)
+        data_df = get_landing_page_df(date_obj)
+        for storage_format in [StorageFormat.CSV, StorageFormat.PARQUET]:
+            file_helper.save_df_to_file(data_df, file_helper.get_data_file_path(
+                root_dir, 'DAILY', 'LANDING_PAGE', date_obj, storage_format),
+                DataModule.LANDING_PAGE)
+
+
+def read_csv_per_day(file_helper: FileHelper, root_dir: str) -> pd.DataFrame:
+    """the loop callers had to write: pd.read_csv of each day"""
+    return pd.concat([pd.read_csv(file_helper.get_data_path(
+        root_dir, 'DAILY', 'LANDING_PAGE', START_DATE + timedelta(days=i)))
+                      for i in range(NUMBER_OF_DAYS)], ignore_index=True)
+
+
+def timed(func) -> tuple[float, pd.DataFrame]:
+    """elapsed seconds and result of the function"""
+    started_at = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started_at, result
+
+
+def main():
+    """print elapsed time of each reader"""
+    file_helper = FileHelper()
+    end_date = START_DATE + timedelta(days=NUMBER_OF_DAYS - 1)
+    with tempfile.TemporaryDirectory() as root_dir:
+        save_year(file_helper, root_dir)
+        readers = {
+            'pd.read_csv per day': lambda: read_csv_per_day(file_helper, root_dir),
+            'read_range csv': lambda: file_helper.read_range(
+                DataFrequency.DAILY, DataModule.LANDING_PAGE, START_DATE, end_date,
+                root_dir=root_dir, storage_format=StorageFormat.CSV),
+            'read_range parquet': lambda: file_helper.read_range(
+                DataFrequency.DAILY, DataModule.LANDING_PAGE, START_DATE, end_date,
+                root_dir=root_dir, storage_format=StorageFormat.PARQUET),
+            'read_range parquet, 2 columns, 5 datasets': lambda: file_helper.read_range(
+                DataFrequency.DAILY, DataModule.LANDING_PAGE, START_DATE, end_date,
+                dataset_ids=list(range(5)), columns=['start_date', 'sessions'],
+                root_dir=root_dir, storage_format=StorageFormat.PARQUET)
+        }
+        print(f'{NUMBER_OF_DAYS} days x {ROWS_PER_DAY} rows of landing page')
+        print(f'{"reader":<45} {"seconds":>8} {"rows":>10}')
+        for name, reader in readers.items():
+            elapsed, data_df = timed(reader)
+            print(f'{name:<45} {elapsed:>8.2f} {len(data_df):>10}')
+
+
+if __name__ == '__main__':
+    main()
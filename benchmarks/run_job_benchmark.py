@@ -0,0 +1,82 @@
+"""Benchmark: wall clock time of GoogleAnalyticsJobs.run_job against number of workers.
+Google analytics api is stubbed with a fixed latency, so no network call is made.
+
+    python benchmarks/run_job_benchmark.py
+"""
+import sys
+import os
+import json
+import tempfile
+import time
+from datetime import date, timedelta
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+# pylint: disable=wrong-import-position
+import pandas as pd
+from helpers.enums import DataFrequency, DataModule, JobStatus
+from helpers.metadata_helper import JobConfig, MetadataHelper
+from helpers.settings_helper import SettingsHelper
+from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+# pylint: enable=wrong-import-position
+
+API_LATENCY_IN_SECONDS = 0.05
+NUMBER_OF_DAYS = 60
+WORKERS = [1, 2, 4, 8, 16]
+
+
+# pylint: disable=too-few-public-methods
+class StubGoogleAnalyticsApi():
+    """google analytics api which waits for the latency and returns fixed data"""
+
+    def get_sessions_by_age(self, filter_clause):
+        """stubbed sessions by age"""
+        time.sleep(API_LATENCY_IN_SECONDS)
+        return pd.DataFrame([{'start_date': filter_clause.date_range.start_date,
+                              'end_date': filter_clause.date_range.end_date,
+                              'dataset_id': '1',
+                              'age_bracket': '18-24',
+                              'sessions': 10}])
+# pylint: enable=too-few-public-methods
+
+
+class StubGoogleAnalyticsJobs(GoogleAnalyticsJobs):
+    """jobs using the stubbed google analytics api"""
+
+    def get_google_analytics_api(self):
+        return StubGoogleAnalyticsApi()
+
+
+def run(root_dir: str, maximum_workers: int) -> float:
+    """run the age job for NUMBER_OF_DAYS days and return the elapsed seconds"""
+    settings_file_path = os.path.join(root_dir, 'app_settings.json')
+    with open(settings_file_path, 'w', encoding='UTF-8') as file_obj:
+        json.dump({'GoogleAnalytics': {'PageSize': 10000},
+                   'FileStorage': {'RootDir': root_dir},
+                   'Jobs': {'MaximumWorkers': maximum_workers}}, file_obj)
+
+    start_date = date(2021, 1, 1)
+    jobs = StubGoogleAnalyticsJobs()
+    jobs.settings_helper = SettingsHelper(settings_file_path)
+    jobs.metadata_helper = MetadataHelper(os.path.join(root_dir, 'metadata.json'))
+    jobs.metadata_helper.save_metadata(JobConfig(DataFrequency.DAILY, DataModule.AGE),
+                                       start_date, JobStatus.DEFAULT)
+
+    started_at = time.perf_counter()
+    jobs.age_daily(start_date + timedelta(days=NUMBER_OF_DAYS))
+    return time.perf_counter() - started_at
+
+
+def main():
+    """print elapsed time for each number of workers"""
+    print(f'{NUMBER_OF_DAYS} days, api latency {API_LATENCY_IN_SECONDS}s')
+    print(f'{"workers":>8} {"seconds":>8} {"speedup":>8}')
+    baseline = None
+    for maximum_workers in WORKERS:
+        with tempfile.TemporaryDirectory() as root_dir:
+            elapsed = run(root_dir, maximum_workers)
+        baseline = baseline or elapsed
+        print(f'{maximum_workers:>8} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
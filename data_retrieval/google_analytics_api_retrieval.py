@@ -2,37 +2,69 @@
 import os
 import sys
 import logging
+from datetime import date, timedelta
 
 sys.path.insert(1, os.getcwd())
 
 # pylint: disable=wrong-import-position
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
+import numpy as np
 import pandas as pd
+import backoff
+from googleapiclient.errors import HttpError
 
 from helpers.string_helper import StringHelper
 from helpers.date_helper import DateHelper
 from helpers.enums import GoogleApiVersion, GoogleAuthenticationMethod
 from helpers.settings_helper import SettingsHelper
+from helpers.file_helper import FileHelper
+from helpers.disk_cache_helper import DiskCacheHelper
+from helpers.rate_limit_helper import RateLimitHelper
+from data_retrieval.google_analytics_service_client import GoogleAnalyticsServiceClient
 from dtos.date_range_dto import DateRangeDto
-from dtos.page_dto import PageDto
 from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
 from dtos.google_analytics_request_config_dto import GoogleAnalyticsRequestConfig
 
 # pylint: enable=wrong-import-position
 
+def is_rate_limit_error(ex: HttpError) -> bool:
+    """True if google analytics refused the request because of quota or rate limit"""
+    rate_limit_reasons = ['RATE_LIMIT_EXCEEDED', 'rateLimitExceeded',
+                          'userRateLimitExceeded', 'quotaExceeded']
+    content = ex.content.decode('UTF-8', errors='ignore') \
+        if isinstance(ex.content, bytes) else str(ex.content)
+    return ex.resp.status == 429 or \
+        (ex.resp.status == 403 and any(r in content for r in rate_limit_reasons))
+
+
+def is_not_rate_limit_error(ex: HttpError) -> bool:
+    """give up retry if the error is not because of rate limit"""
+    return not is_rate_limit_error(ex)
+
+
+def on_rate_limit_backoff(details):
+    """backoff handler, calls the handler of the instance whose method is retried"""
+    details.get('args')[0].on_rate_limit_backoff_handler(details)
+
+
+# pylint: disable=too-many-instance-attributes, too-many-public-methods
 class GoogleAnalyticsApiRetrieval():
     """Retrieve data from google analytics"""
+    # batchGet accepts maximum of 5 report requests
+    max_reports_per_batch = 5
 
     def __init__(self, google_authentication_method: GoogleAuthenticationMethod,
                  oauth_credentials_filepath: str = '',
-                 oauth_token_filepath: str = '') -> None:
+                 oauth_token_filepath: str = '',
+                 columnar_decoding: bool = True) -> None:
+        """columnar_decoding: decode reports directly to typed columns,
+        if False, reports are decoded to row dictionaries (compatibility)"""
+        self.columnar_decoding = columnar_decoding
         self.str_helper = StringHelper()
         self.date_helper = DateHelper()
         self.settings_helper = SettingsHelper()
+        self.file_helper = FileHelper()
         self.log = logging.getLogger(__name__)
+        self.google_authentication_method = google_authentication_method
         if google_authentication_method == GoogleAuthenticationMethod.OAUTH:
             if self.str_helper.is_null_or_whitespace(oauth_credentials_filepath):
                 raise ValueError("oauth credentials filepath is required")
@@ -42,66 +74,122 @@ class GoogleAnalyticsApiRetrieval():
                 raise ValueError("oauth token filepath is required")
             self.oauth_token_filepath = oauth_token_filepath
 
-        self.creds = None
+    def get_service_client(self) -> GoogleAnalyticsServiceClient:
+        """returns service client shared by all instances with the same credential"""
+        if self.google_authentication_method != GoogleAuthenticationMethod.OAUTH:
+            raise ValueError(f'GoogleAuthenticationMethod: {self.google_authentication_method} '
+                             'is not supported')
+        return GoogleAnalyticsServiceClient.get_instance(self.oauth_credentials_filepath,
+                                                         self.oauth_token_filepath)
 
     def get_oauth_credentials(self):
         """get oauth credentials"""
-        scopes = ['https://www.googleapis.com/auth/analytics.readonly']
-        if os.path.exists(self.oauth_token_filepath):
-            self.creds = Credentials.from_authorized_user_file(
-                self.oauth_token_filepath, scopes)
-            if not self.creds or not self.creds.valid:
-                self.refresh_oauth_token()
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                self.oauth_credentials_filepath, scopes)
-            self.creds = flow.run_local_server(port=0)
-            with open(self.oauth_token_filepath, 'w', encoding='UTF-8') as token:
-                token.write(self.creds.to_json())
-
-    # REFRESH token doesnot work, need to debug it later
+        self.get_service_client().get_oauth_credentials()
+
     def refresh_oauth_token(self):
         """refresh oauth token if expired"""
-        if self.creds is None:
-            self.get_oauth_credentials()
-        elif self.creds.expired:
-            self.creds.refresh(Request())
-            with open(self.oauth_token_filepath, 'w', encoding='UTF-8') as token:
-                token.write(self.creds.to_json())
+        self.get_service_client().refresh_oauth_token()
+
+    def extract_data_from_report(self, report, date_range: DateRangeDto):
+        """fomat a report received from google analytics"""
+        column_header = report.get('columnHeader')
+        # if total is zero, there is no data in the report
+        if int(report.get('data').get('totals')[0]['values'][0]) == 0:
+            return []
+        dimensions = column_header.get('dimensions')
+        dimensions_len = len(dimensions)
+        metric_header = column_header.get('metricHeader')
+        metrics = metric_header.get('metricHeaderEntries')
+        metrics_len = len(metrics)
+
+        if report.get('data').get('rows') is None:
+            raise ValueError('No rows data')
+
+        results = []
+        for row in report.get('data').get('rows'):
+            result = {'start_date': date_range.start_date,
+                      'end_date': date_range.end_date}
+            for i in range(dimensions_len):
+                result[dimensions[i]] = row.get('dimensions')[i]
+
+            metric_values = row.get('metrics')[0].get('values')
+            for i in range(metrics_len):
+                result[metrics[i].get('name')] = metric_values[i]
+
+            results.append(result)
+
+        return results
 
     def extract_data_from_response(self, response, date_range: DateRangeDto):
         """fomat response received from google analytics"""
 
         results = []
         for report in response.get('reports'):
-            column_header = report.get('columnHeader')
-            # if total is zero, continue to another
-            if int(report.get('data').get('totals')[0]['values'][0]) == 0:
-                # print('continue for loop to next item')
-                continue
-            dimensions = column_header.get('dimensions')
-            dimensions_len = len(dimensions)
-            metric_header = column_header.get('metricHeader')
-            metrics = metric_header.get('metricHeaderEntries')
-            metrics_len = len(metrics)
-
-            if report.get('data').get('rows') is None:
-                raise ValueError('No rows data')
-
-            for row in report.get('data').get('rows'):
-                result = {'start_date': date_range.start_date,
-                          'end_date': date_range.end_date}
-                for i in range(dimensions_len):
-                    result[dimensions[i]] = row.get('dimensions')[i]
-
-                metric_values = row.get('metrics')[0].get('values')
-                for i in range(metrics_len):
-                    result[metrics[i].get('name')] = metric_values[i]
-
-                results.append(result)
+            results.extend(self.extract_data_from_report(report, date_range))
 
         return results
 
+    # pylint: disable=too-many-locals
+    def extract_columns_from_report(self, report, date_range: DateRangeDto) -> pd.DataFrame:
+        """decode a report received from google analytics to typed columns:
+        dimensions as categoricals, integer metrics as int64,
+        start_date and end_date as a constant broadcast to all the rows"""
+        column_header = report.get('columnHeader')
+        dimensions = column_header.get('dimensions')
+        metrics = column_header.get('metricHeader').get('metricHeaderEntries')
+        rows = report.get('data').get('rows')
+        # if total is zero, there is no data in the report
+        if int(report.get('data').get('totals')[0]['values'][0]) == 0:
+            rows = []
+        elif rows is None:
+            raise ValueError('No rows data')
+
+        columns = {'start_date': pd.Timestamp(date_range.start_date),
+                   'end_date': pd.Timestamp(date_range.end_date)}
+
+        # rows x dimensions matrix, each column is factorized to a categorical
+        dimension_values = np.array([row.get('dimensions') for row in rows],
+                                    dtype=object).reshape(len(rows), len(dimensions))
+        for i, dimension in enumerate(dimensions):
+            codes, categories = pd.factorize(dimension_values[:, i], sort=True)
+            columns[dimension] = pd.Categorical.from_codes(codes, categories)
+
+        # rows x metrics matrix of strings, each column is parsed to the type of its metric
+        metric_values = np.array([row.get('metrics')[0].get('values') for row in rows],
+                                 dtype=object).reshape(len(rows), len(metrics))
+        for i, metric in enumerate(metrics):
+            dtype = np.int64 if metric.get('type', 'INTEGER') == 'INTEGER' else np.float64
+            columns[metric.get('name')] = metric_values[:, i].astype(dtype)
+
+        return pd.DataFrame(columns, index=pd.RangeIndex(len(rows)))
+    # pylint: enable=too-many-locals
+
+    def decode_report(self, report, date_range: DateRangeDto) -> pd.DataFrame:
+        """decode a report to dataframe with the columnar or the row decoder"""
+        if self.columnar_decoding:
+            return self.extract_columns_from_report(report, date_range)
+        return pd.DataFrame(self.extract_data_from_report(report, date_range))
+
+    def decode_response(self, response, date_range: DateRangeDto) -> pd.DataFrame:
+        """decode all the reports of a response to a dataframe"""
+        return self.concat_data_dfs([self.decode_report(report, date_range)
+                                     for report in response.get('reports')])
+
+    def concat_data_dfs(self, data_dfs: list[pd.DataFrame]) -> pd.DataFrame:
+        """concat decoded pages, keeping categorical columns as categoricals"""
+        data_dfs = [data_df for data_df in data_dfs if len(data_df.columns) > 0]
+        if len(data_dfs) == 0:
+            return pd.DataFrame()
+        if len(data_dfs) == 1:
+            return data_dfs[0]
+
+        categorical_columns = [c for c in data_dfs[0].columns
+                               if isinstance(data_dfs[0][c].dtype, pd.CategoricalDtype)]
+        data_df = pd.concat(data_dfs, ignore_index=True)
+        for column in categorical_columns:
+            data_df[column] = data_df[column].astype('category')
+        return data_df
+
     def construct_filter(self, dimension_name: str, operator: str, expression: str):
         """construct filter object"""
         return {
@@ -110,14 +198,12 @@ class GoogleAnalyticsApiRetrieval():
             'expressions': [expression]
         }
 
-    def get_batch_data(self,
-                       view_id: str,
-                       request_config: GoogleAnalyticsRequestConfig,
-                       filter_clause: GoogleAnalyticsFilterClause):
-        """get batch data"""
-        self.refresh_oauth_token()
-        analytics = build('analyticsreporting', 'v4', credentials=self.creds)
-
+    def get_report_request(self,
+                           view_id: str,
+                           request_config: GoogleAnalyticsRequestConfig,
+                           filter_clause: GoogleAnalyticsFilterClause,
+                           page_token: str = None):
+        """get report request of the batchGet request body"""
         metrics_list = [{'expression': m}
                         for m in request_config.metrics]
         dimensions_list = [{'name': d}
@@ -125,7 +211,7 @@ class GoogleAnalyticsApiRetrieval():
 
         request = {
                     'pageSize': filter_clause.page_dto.page_size,
-                    'pageToken': filter_clause.page_dto.page_token,
+                    'pageToken': page_token,
                     'viewId': view_id,
                     'dateRanges': [
                         {
@@ -151,59 +237,199 @@ class GoogleAnalyticsApiRetrieval():
                         'filters' : filters
                     }
                 ]
+        return request
+
+    def get_response_cache(self):
+        """returns response cache, None if the cache is disabled"""
+        return DiskCacheHelper.from_settings(self.settings_helper.get_response_cache_settings())
+
+    def get_response_ttl_in_seconds(self, report_requests: list):
+        """time to live of a cached response. Data of closed past days doesn't change,
+        so only responses with dates in the recent mutable window expire"""
+        cache_settings = self.settings_helper.get_response_cache_settings()
+        mutable_from_date = date.today() - timedelta(
+            days=cache_settings.get('MutableWindowInDays'))
+        for report_request in report_requests:
+            for date_range in report_request.get('dateRanges'):
+                end_date = self.date_helper.convert_yyyy_mm_dd_to_date(date_range.get('endDate'))
+                if end_date >= mutable_from_date:
+                    return cache_settings.get('TimeToLiveInSeconds')
+        return None
+
+    def get_rate_limiter(self):
+        """returns rate limiter shared by all the callers, None if the rate limit is disabled"""
+        rate_limit_settings = self.settings_helper.get_rate_limit_settings()
+        if rate_limit_settings is None:
+            return None
+        return RateLimitHelper.get_instance({
+            'second': (rate_limit_settings.get('RequestsPerSecond'), 1),
+            '100_seconds': (rate_limit_settings.get('RequestsPer100Seconds'), 100),
+            'day': (rate_limit_settings.get('RequestsPerDay'), 24 * 60 * 60)
+        }, rate_limit_settings.get('StateFilePath'))
+
+    def on_rate_limit_backoff_handler(self, details):
+        """Handler function when the backoff occurs because of rate limit.
+        The 100 seconds budget is emptied, so other callers slow down as well"""
+        self.log.warning('Rate limit exceeded, backing off %0.1f seconds after %s tries',
+                         details.get('wait'), details.get('tries'))
+        rate_limiter = self.get_rate_limiter()
+        if rate_limiter is not None:
+            rate_limiter.drain('100_seconds')
+
+    # backoff reference: https://pypi.org/project/backoff/
+    @backoff.on_exception(backoff.expo,
+                          HttpError,
+                          max_tries=5,
+                          giveup=is_not_rate_limit_error,
+                          on_backoff=on_rate_limit_backoff)
+    def execute_batch_get(self, request_body: dict):
+        """execute batchGet within the rate limit, retry with backoff if the limit is exceeded"""
+        rate_limiter = self.get_rate_limiter()
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return self.get_service_client().batch_get(request_body)
+
+    def get_batch_data_for_reports(self, report_requests: list):
+        """get batch data for the report requests (maximum of 5).
+        Report requests carry view id, request config, date range, dataset filter and
+        page token, so they are the key of the response cache"""
         request_body = {
-            'reportRequests': [
-                request
-            ]
+            'reportRequests': report_requests
         }
 
-        # pylint: disable=no-member
-        return analytics.reports().batchGet(body=request_body).execute()
-        # pylint: enable=no-member
+        response_cache = self.get_response_cache()
+        if response_cache is not None:
+            response = response_cache.get(request_body)
+            if response is not None:
+                self.log.debug('Response cache hit, statistics %s',
+                               response_cache.get_statistics())
+                return response
 
-    def get_data(self,
-                 request_config: GoogleAnalyticsRequestConfig,
-                 filter_clause: GoogleAnalyticsFilterClause):
-        """get all data"""
-        results = []
-        page_token = filter_clause.page_dto.page_token
+        response = self.execute_batch_get(request_body)
+        if response_cache is not None:
+            response_cache.set(request_body, response,
+                               self.get_response_ttl_in_seconds(report_requests))
+        return response
 
-        view_id = ''
-        if filter_clause.api_version == GoogleApiVersion.VERSION_3:
-            view_id = self.settings_helper.get_google_analytics_view_id_v3()
-        elif filter_clause.api_version == GoogleApiVersion.VERSION_4:
-            view_id = self.settings_helper.get_google_analytics_view_id_v4()
-        else:
-            raise ValueError(f'GoogleApiVersion: {filter_clause.api_version} is not supported')
+    def get_batch_data(self,
+                       view_id: str,
+                       request_config: GoogleAnalyticsRequestConfig,
+                       filter_clause: GoogleAnalyticsFilterClause):
+        """get batch data"""
+        return self.get_batch_data_for_reports([
+            self.get_report_request(view_id,
+                                    request_config,
+                                    filter_clause,
+                                    filter_clause.page_dto.page_token)
+        ])
+
+    def get_view_id(self, api_version: GoogleApiVersion) -> str:
+        """get view id of the api version"""
+        if api_version == GoogleApiVersion.VERSION_3:
+            return self.settings_helper.get_google_analytics_view_id_v3()
+        if api_version == GoogleApiVersion.VERSION_4:
+            return self.settings_helper.get_google_analytics_view_id_v4()
+        raise ValueError(f'GoogleApiVersion: {api_version} is not supported')
+
+    def iter_reports_for_request_configs(self,
+                                         request_configs: list[GoogleAnalyticsRequestConfig],
+                                         filter_clause: GoogleAnalyticsFilterClause):
+        """get all reports for several request configs with batchGet requests.
+        Each batchGet carries up to 5 reports, every report keeps its own page token,
+        and only the reports which still have pages left are requested again.
+        Yields (index of request config, report) for each page of each report"""
+        view_id = self.get_view_id(filter_clause.api_version)
+        page_tokens = [filter_clause.page_dto.page_token for _ in request_configs]
+        pending_reports = list(range(len(request_configs)))
+
+        while len(pending_reports) > 0:
+            batch_reports = pending_reports[:self.max_reports_per_batch]
+            report_requests = [self.get_report_request(view_id,
+                                                       request_configs[i],
+                                                       filter_clause,
+                                                       page_tokens[i])
+                               for i in batch_reports]
+            response = self.get_batch_data_for_reports(report_requests)
+            self.log.debug('request_configs %s, date_range %s, page_tokens %s, response %s',
+                           [request_configs[i].to_dict() for i in batch_reports],
+                           filter_clause.date_range.to_dict(),
+                           [page_tokens[i] for i in batch_reports],
+                           response)
+
+            completed_reports = []
+            for i, report in zip(batch_reports, response.get('reports')):
+                page_tokens[i] = report.get('nextPageToken')
+                if page_tokens[i] is None:
+                    completed_reports.append(i)
+                yield i, report
+
+            pending_reports = [i for i in pending_reports if i not in completed_reports]
+
+        self.log.debug("All data has been retrieved")
+
+    def get_dfs_for_request_configs(self,
+                                    request_configs: list[GoogleAnalyticsRequestConfig],
+                                    filter_clause: GoogleAnalyticsFilterClause) \
+                                        -> list[pd.DataFrame]:
+        """get all data for several request configs in the same batch requests as dataframes.
+        Returns dataframe of each request config, in the order of request configs"""
+        pages = [[] for _ in request_configs]
+        for i, report in self.iter_reports_for_request_configs(request_configs, filter_clause):
+            pages[i].append(self.decode_report(report, filter_clause.date_range))
+
+        return [self.concat_data_dfs(report_pages) for report_pages in pages]
+
+    def iter_responses(self,
+                       request_config: GoogleAnalyticsRequestConfig,
+                       filter_clause: GoogleAnalyticsFilterClause):
+        """yields response one page at a time, so that only a page is kept in memory"""
+        page_token = filter_clause.page_dto.page_token
+        view_id = self.get_view_id(filter_clause.api_version)
 
         while True:
-            new_page_dto = PageDto(filter_clause.page_dto.page_size, page_token)
-            filter_clause.set_page_dto(new_page_dto)
-            response = self.get_batch_data(view_id=view_id,
-                                           request_config=request_config,
-                                           filter_clause=filter_clause)
+            response = self.get_batch_data_for_reports([
+                self.get_report_request(view_id, request_config, filter_clause, page_token)
+            ])
             self.log.debug('request_config %s, date_range %s,\
-                                        page_dto %s, filter_clause %s, response %s',
+                                        page_token %s, filter_clause %s, response %s',
                                        request_config.to_dict(),
                                        filter_clause.date_range.to_dict(),
-                                       filter_clause.page_dto.to_dict(),
+                                       page_token,
                                        filter_clause.to_dict(),
                                        response)
-            results.extend(self.extract_data_from_response(
-                response, filter_clause.date_range))
             page_token = response['reports'][0].get('nextPageToken')
 
-            total_rows = response.get('reports')[0].get(
-                'data').get('totals')[0]['values'][0]
-            self.log.debug(
-                "Retrieved %s of %s ", len(results), total_rows)
+            yield response
 
             if page_token is None:
                 self.log.debug("All data has been retrieved")
                 break
 
+    def iter_pages(self,
+                   request_config: GoogleAnalyticsRequestConfig,
+                   filter_clause: GoogleAnalyticsFilterClause):
+        """yields data one page at a time, so that only a page is kept in memory"""
+        total_retrieved = 0
+        for response in self.iter_responses(request_config, filter_clause):
+            page = self.extract_data_from_response(response, filter_clause.date_range)
+            total_retrieved += len(page)
+            total_rows = response.get('reports')[0].get(
+                'data').get('totals')[0]['values'][0]
+            self.log.debug(
+                "Retrieved %s of %s ", total_retrieved, total_rows)
+
+            yield page
+
+    def get_data(self,
+                 request_config: GoogleAnalyticsRequestConfig,
+                 filter_clause: GoogleAnalyticsFilterClause):
+        """get all data"""
+        results = []
+        for page in self.iter_pages(request_config, filter_clause):
+            results.extend(page)
+
         return results
-    
+
     def get_columns_to_rename(self, version: GoogleApiVersion):
         """returns columns to rename"""
         if version == GoogleApiVersion.VERSION_3:
@@ -219,7 +445,8 @@ class GoogleAnalyticsApiRetrieval():
                 "ga:customVarValue3": "state",
                 "ga:customVarValue4": "subject",
                 "ga:customVarValue5": "org_type",
-                "ga:pageviews": "page_views"
+                "ga:pageviews": "page_views",
+                "ga:date": "date"
             }
         elif version == GoogleApiVersion.VERSION_4:
             return {
@@ -235,21 +462,30 @@ class GoogleAnalyticsApiRetrieval():
        
         raise ValueError(f"google Api Version {version} is Invalid.")
 
-    def get_data_as_df(self,
-                 request_config: GoogleAnalyticsRequestConfig,
-                 filter_clause: GoogleAnalyticsFilterClause):
-        data = self.get_data(request_config, filter_clause)
-
-        data_df = pd.DataFrame(data)
+    def format_data_df(self, data_df: pd.DataFrame, version: GoogleApiVersion):
+        """rename columns and convert data types"""
         # rename columns
-
-        columns_to_rename = self.get_columns_to_rename(filter_clause.api_version)
+        columns_to_rename = self.get_columns_to_rename(version)
         for key, value in columns_to_rename.items():
             if key in data_df.columns:
                 data_df = data_df.rename(columns={key:value})
-        
+
         return self.convert_data_types(data_df)
 
+    def iter_pages_as_df(self,
+                         request_config: GoogleAnalyticsRequestConfig,
+                         filter_clause: GoogleAnalyticsFilterClause):
+        """yields formatted dataframe one page at a time"""
+        for response in self.iter_responses(request_config, filter_clause):
+            yield self.format_data_df(self.decode_response(response, filter_clause.date_range),
+                                      filter_clause.api_version)
+
+    def get_data_as_df(self,
+                 request_config: GoogleAnalyticsRequestConfig,
+                 filter_clause: GoogleAnalyticsFilterClause):
+        """get all data as dataframe"""
+        return self.concat_data_dfs(list(self.iter_pages_as_df(request_config, filter_clause)))
+
     def convert_data_types(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         """convert data types"""
         numeric_columns = ['sessions']
@@ -263,3 +499,4 @@ class GoogleAnalyticsApiRetrieval():
                 dataframe[date_col] = pd.to_datetime(dataframe[date_col])
 
         return dataframe
+# pylint: enable=too-many-instance-attributes, too-many-public-methods
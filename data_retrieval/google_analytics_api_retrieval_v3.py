@@ -1,93 +1,126 @@
-# """version 3 google api"""
-# import pandas as pd
-# from data_retrieval.google_analytics_api_retrieval import GoogleAnalyticsApiRetrieval
-# from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
-# from dtos.google_analytics_request_config_dto import GoogleAnalyticsRequestConfig
-
-# class GoogleAnalyticsApiRetrievalV3(GoogleAnalyticsApiRetrieval):
-#     """google api version 3"""
-#     def get_sessions_by_gender(self,
-#                                filter_clause: GoogleAnalyticsFilterClause):
-#         """get session data by gender"""
-#         dimensions = ['customVarValue1', 'userGender']
-#         metrics = ["sessions"]
-#         data = self.get_data(request_config=GoogleAnalyticsRequestConfig(
-#             dimensions, metrics),
-#             filter_clause=filter_clause)
-
-#         # create dataframe
-#         data_df = pd.DataFrame(data)
-#         # rename columns
-#         data_df = data_df.rename(columns={
-#             'ga:customVarValue1': 'dataset_id',
-#             'ga:sessions': 'sessions',
-#             'ga:userGender': 'gender'
-#         })
-
-#         return self.convert_data_types(data_df)
-
-#     def get_sessions_by_landing_page(self,
-#                                      filter_clause: GoogleAnalyticsFilterClause):
-#         """get session data with landing page"""
-#         dimensions = ['customVarValue1', 'landingPagePath',
-#                       'deviceCategory', 'sourceMedium']
-#         metrics = ["sessions"]
-#         data = self.get_data(request_config=GoogleAnalyticsRequestConfig(
-#                              dimensions, metrics),
-#                              filter_clause=filter_clause)
-
-#         # create dataframe
-#         data_df = pd.DataFrame(data)
-#         # rename columns
-#         data_df = data_df.rename(columns={
-#             'ga:customVarValue1': 'dataset_id',
-#             'ga:landingPagePath': 'landing_page',
-#             'ga:deviceCategory': 'device_category',
-#             'ga:sourceMedium': 'source_medium',
-#             'ga:sessions': 'sessions'
-#         })
-
-#         return self.convert_data_types(data_df)
-
-#     def get_sessions_by_age(self,
-#                             filter_clause: GoogleAnalyticsFilterClause):
-#         """get sessions data by age"""
-#         dimensions = ['customVarValue1', 'userAgeBracket']
-#         metrics = ["sessions"]
-#         data = self.get_data(request_config=GoogleAnalyticsRequestConfig(
-#             dimensions, metrics),
-#             filter_clause=filter_clause)
-
-#         # create dataframe
-#         data_df = pd.DataFrame(data)
-#         # rename columns
-#         data_df = data_df.rename(columns={
-#             'ga:customVarValue1': 'dataset_id',
-#             'ga:sessions': 'sessions',
-#             'ga:userAgeBracket': 'age_bracket'
-#         })
-
-#         return self.convert_data_types(data_df)
-
-#     def get_page_views_and_sessions(self, filter_clause: GoogleAnalyticsFilterClause):
-#         """get page views"""
-#         dimensions = ['customVarValue1', 'customVarValue2', 'customVarValue3',
-#                       'customVarValue4', 'customVarValue5', 'landingPagePath']
-#         metrics = ["pageviews", "sessions"]
-#         data = self.get_data(request_config=GoogleAnalyticsRequestConfig(
-#                              dimensions, metrics),
-#                              filter_clause=filter_clause)
-
-#         data_df = pd.DataFrame(data)
-#         # rename columns
-#         data_df = data_df.rename(columns={
-#             'ga:customVarValue1': 'dataset_id',
-#             'ga:customVarValue2': 'post_code',
-#             'ga:customVarValue3': 'state',
-#             'ga:customVarValue4': 'subject',
-#             'ga:customVarValue5': 'org_type',
-#             'ga:sessions': 'sessions',
-#             'ga:landingPagePath': 'landing_page',
-#             'ga:pageviews': 'page_views'
-#         })
-#         return data_df
+"""version 3 google api"""
+from datetime import date, timedelta
+import pandas as pd
+from data_retrieval.google_analytics_api_retrieval import GoogleAnalyticsApiRetrieval
+from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
+from dtos.google_analytics_request_config_dto import GoogleAnalyticsRequestConfig
+from helpers.enums import DataModule, GoogleApiVersion
+
+class GoogleAnalyticsApiRetrievalV3(GoogleAnalyticsApiRetrieval):
+    """google api version 3"""
+    def get_request_config(self, data_module: DataModule) -> GoogleAnalyticsRequestConfig:
+        """get dimensions and metrics of the data module"""
+        metrics = ["sessions"]
+        if data_module == DataModule.GENDER:
+            return GoogleAnalyticsRequestConfig(['customVarValue1', 'userGender'], metrics)
+        if data_module == DataModule.LANDING_PAGE:
+            return GoogleAnalyticsRequestConfig(['customVarValue1', 'landingPagePath',
+                                                 'deviceCategory', 'sourceMedium'], metrics)
+        if data_module == DataModule.AGE:
+            return GoogleAnalyticsRequestConfig(['customVarValue1', 'userAgeBracket'], metrics)
+
+        raise ValueError(f'Invalid data module {data_module.value}')
+
+    def get_sessions_by_modules(self,
+                                filter_clause: GoogleAnalyticsFilterClause,
+                                data_modules: list[DataModule]) -> dict[DataModule, pd.DataFrame]:
+        """get session data of several data modules in the same batch requests"""
+        request_configs = [self.get_request_config(m) for m in data_modules]
+        report_dfs = self.get_dfs_for_request_configs(request_configs, filter_clause)
+
+        data_dfs = {}
+        for data_module, report_df in zip(data_modules, report_dfs):
+            data_dfs[data_module] = self.format_data_df(report_df, GoogleApiVersion.VERSION_3)
+
+        return data_dfs
+
+    def get_sessions_by_date(self,
+                             filter_clause: GoogleAnalyticsFilterClause,
+                             data_module: DataModule) -> dict[date, pd.DataFrame]:
+        """get session data of the data module for the date range in the same query,
+        with ga:date dimension, and split it into the data of each day.
+        Data of each day has the same columns as the query of the single day"""
+        request_config = self.get_request_config(data_module)
+        request_config = GoogleAnalyticsRequestConfig(request_config.dimensions + ['date'],
+                                                      request_config.metrics)
+        data_df = self.format_data_df(
+            self.get_dfs_for_request_configs([request_config], filter_clause)[0],
+            GoogleApiVersion.VERSION_3)
+
+        # row positions of each date
+        date_rows = {}
+        if 'date' in data_df.columns:
+            dates = pd.to_datetime(data_df['date'].astype(str), format='%Y%m%d').dt.date
+            date_rows = data_df.groupby(dates.values).indices
+            data_df = data_df.drop(columns=['date'])
+
+        daily_data = {}
+        date_obj = filter_clause.date_range.start_date
+        while date_obj <= filter_clause.date_range.end_date:
+            day_df = data_df.iloc[date_rows.get(date_obj, [])].copy()
+            if 'start_date' in day_df.columns:
+                day_df['start_date'] = pd.Timestamp(date_obj)
+                day_df['end_date'] = pd.Timestamp(date_obj)
+            daily_data[date_obj] = day_df.reset_index(drop=True)
+            date_obj = date_obj + timedelta(days=1)
+
+        return daily_data
+
+    def iter_sessions_as_df(self,
+                            filter_clause: GoogleAnalyticsFilterClause,
+                            data_module: DataModule):
+        """yields session data of the data module one page at a time"""
+        request_config = self.get_request_config(data_module)
+        for response in self.iter_responses(request_config, filter_clause):
+            yield self.format_data_df(self.decode_response(response, filter_clause.date_range),
+                                      GoogleApiVersion.VERSION_3)
+
+    def save_sessions_to_file(self,
+                              filter_clause: GoogleAnalyticsFilterClause,
+                              data_module: DataModule,
+                              file_path: str) -> int:
+        """stream session data of the data module page by page to parquet or csv file,
+        by the extension of the file path, returns number of rows saved"""
+        return self.file_helper.save_dfs_to_file(
+            self.iter_sessions_as_df(filter_clause, data_module), file_path, data_module)
+
+    def get_sessions_by_gender(self,
+                               filter_clause: GoogleAnalyticsFilterClause):
+        """get session data by gender"""
+        return self.get_sessions_by_modules(filter_clause,
+                                            [DataModule.GENDER])[DataModule.GENDER]
+
+    def get_sessions_by_landing_page(self,
+                                     filter_clause: GoogleAnalyticsFilterClause):
+        """get session data with landing page"""
+        return self.get_sessions_by_modules(filter_clause,
+                                            [DataModule.LANDING_PAGE])[DataModule.LANDING_PAGE]
+
+    def get_sessions_by_age(self,
+                            filter_clause: GoogleAnalyticsFilterClause):
+        """get sessions data by age"""
+        return self.get_sessions_by_modules(filter_clause,
+                                            [DataModule.AGE])[DataModule.AGE]
+
+    def get_page_views_and_sessions(self, filter_clause: GoogleAnalyticsFilterClause):
+        """get page views"""
+        dimensions = ['customVarValue1', 'customVarValue2', 'customVarValue3',
+                      'customVarValue4', 'customVarValue5', 'landingPagePath']
+        metrics = ["pageviews", "sessions"]
+        data = self.get_data(request_config=GoogleAnalyticsRequestConfig(
+                             dimensions, metrics),
+                             filter_clause=filter_clause)
+
+        data_df = pd.DataFrame(data)
+        # rename columns
+        data_df = data_df.rename(columns={
+            'ga:customVarValue1': 'dataset_id',
+            'ga:customVarValue2': 'post_code',
+            'ga:customVarValue3': 'state',
+            'ga:customVarValue4': 'subject',
+            'ga:customVarValue5': 'org_type',
+            'ga:sessions': 'sessions',
+            'ga:landingPagePath': 'landing_page',
+            'ga:pageviews': 'page_views'
+        })
+        return data_df
@@ -16,7 +16,6 @@ from helpers.settings_helper import SettingsHelper
 from helpers.date_helper import DateHelper
 from helpers.enums import DataModule, GoogleAuthenticationMethod
 from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
-from dtos.page_dto import PageDto
 # pylint: enable=wrong-import-position
 
 class GoogleAnalyticsData():
@@ -34,7 +33,8 @@ class GoogleAnalyticsData():
                    grp_columns: list[str]) -> pd.DataFrame:
         """group data"""
         df_s = dataframe[select_columns]
-        df_grp = df_s.groupby(by=grp_columns, as_index=False).sum()
+        # observed: only the combinations of categorical values present in the data
+        df_grp = df_s.groupby(by=grp_columns, as_index=False, observed=True).sum()
         return df_grp
 
     def filter_data_by_dataset_id(self, dataframe: pd.DataFrame, data_set_id: str):
@@ -55,9 +55,13 @@ class GoogleAnalyticsData():
             oauth_credentials_filepath=self.oauth_credentials_filepath,
             oauth_token_filepath=self.oauth_token_filepath)
 
+        # landing page, age and gender are retrieved in the same batch requests
+        self.ga_data_log.info('Getting data for landing page, age and gender')
+        data_dfs = google_analytics_api.get_sessions_by_modules(
+            filter_clause, [DataModule.LANDING_PAGE, DataModule.AGE, DataModule.GENDER])
+
         # 1, 2, 3. Data for device category, source medium and landing page
-        self.ga_data_log.info('Getting data for landing page')
-        data_df = google_analytics_api.get_sessions_by_landing_page(filter_clause)
+        data_df = data_dfs[DataModule.LANDING_PAGE]
 
         # 1 device category
         device_category_df = self.group_data(data_df, ["dataset_id", "device_category","sessions"],
@@ -77,17 +81,11 @@ class GoogleAnalyticsData():
         self.file_helper.save_run_file_to_csv(landing_page_df, run_id, DataModule.LANDING_PAGE)
 
         # 4 Age
-        self.ga_data_log.info("Getting age data")
-        filter_clause.set_page_dto(PageDto(
-            self.settings_helper.get_google_analytics_page_size(), None))
-        age_df = google_analytics_api.get_sessions_by_age(filter_clause)
-        self.file_helper.save_run_file_to_csv(age_df, run_id, DataModule.AGE)
+        self.file_helper.save_run_file_to_csv(data_dfs[DataModule.AGE], run_id, DataModule.AGE)
 
         # 5 gender
-        self.ga_data_log.info("Getting gender data")
-        filter_clause.set_page_dto(PageDto(
-            self.settings_helper.get_google_analytics_page_size(), None))
-        gender_df = google_analytics_api.get_sessions_by_gender(filter_clause)
-        self.file_helper.save_run_file_to_csv(gender_df, run_id, DataModule.GENDER)
+        self.file_helper.save_run_file_to_csv(data_dfs[DataModule.GENDER],
+                                              run_id,
+                                              DataModule.GENDER)
 
         return run_id
@@ -0,0 +1,101 @@
+"""Long lived google analytics reporting service client"""
+import os
+import sys
+import logging
+import threading
+
+sys.path.insert(1, os.getcwd())
+
+# pylint: disable=wrong-import-position
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+# pylint: enable=wrong-import-position
+
+
+class GoogleAnalyticsServiceClient():
+    """Analytics reporting service, built once per credential and shared by all the callers.
+    The service is built from the discovery document bundled with google-api-python-client,
+    so no network call is made at build time.
+    httplib2 is not thread safe, so every thread executes requests with its own http object.
+    """
+    scopes = ['https://www.googleapis.com/auth/analytics.readonly']
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, oauth_credentials_filepath: str, oauth_token_filepath: str) -> None:
+        self.oauth_credentials_filepath = oauth_credentials_filepath
+        self.oauth_token_filepath = oauth_token_filepath
+        self.log = logging.getLogger(__name__)
+        self.creds = None
+        self.service = None
+        self.lock = threading.RLock()
+        self.thread_local = threading.local()
+
+    @classmethod
+    def get_instance(cls, oauth_credentials_filepath: str, oauth_token_filepath: str):
+        """returns the shared client for the credential"""
+        key = (os.path.abspath(oauth_credentials_filepath),
+               os.path.abspath(oauth_token_filepath))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(oauth_credentials_filepath, oauth_token_filepath)
+            return cls._instances[key]
+
+    def save_oauth_token(self):
+        """save oauth token to the token file"""
+        with open(self.oauth_token_filepath, 'w', encoding='UTF-8') as token:
+            token.write(self.creds.to_json())
+
+    def get_oauth_credentials(self):
+        """get oauth credentials"""
+        with self.lock:
+            if os.path.exists(self.oauth_token_filepath):
+                self.creds = Credentials.from_authorized_user_file(
+                    self.oauth_token_filepath, self.scopes)
+                if not self.creds or not self.creds.valid:
+                    self.refresh_oauth_token()
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.oauth_credentials_filepath, self.scopes)
+                self.creds = flow.run_local_server(port=0)
+                self.save_oauth_token()
+
+    def refresh_oauth_token(self):
+        """refresh oauth token if expired"""
+        with self.lock:
+            if self.creds is None:
+                self.get_oauth_credentials()
+            elif self.creds.expired:
+                self.log.debug('Refreshing oauth token')
+                self.creds.refresh(Request())
+                self.save_oauth_token()
+
+    def get_service(self):
+        """returns analytics reporting service, builds it on first call"""
+        with self.lock:
+            if self.service is None:
+                self.refresh_oauth_token()
+                self.service = build('analyticsreporting', 'v4',
+                                     credentials=self.creds,
+                                     static_discovery=True)
+            return self.service
+
+    def get_http(self):
+        """returns authorized http of the current thread"""
+        http = getattr(self.thread_local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=httplib2.Http())
+            self.thread_local.http = http
+        return http
+
+    def batch_get(self, request_body: dict):
+        """execute reports batchGet request"""
+        service = self.get_service()
+        self.refresh_oauth_token()
+        # pylint: disable=no-member
+        return service.reports().batchGet(body=request_body).execute(http=self.get_http())
+        # pylint: enable=no-member
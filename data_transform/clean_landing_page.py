@@ -1,13 +1,23 @@
 """clean landing page"""
-import math
+import re
 import pandas as pd
 
 from helpers.settings_helper import SettingsHelper
 
+SEARCH_CACHE_IDENTIFIER = "/search?q=cache:"
+SUFFIXES_TO_REMOVE = ["?fbclid=", "+&", "?_x_tr_", "?back="]
+# text from the first suffix found
+SUFFIXES_TO_REMOVE_PATTERN = re.compile(
+    '(?:' + '|'.join(re.escape(suffix) for suffix in SUFFIXES_TO_REMOVE) + ').*', re.DOTALL)
+# whitespaces removed by str.strip
+WHITESPACE_AROUND_PATTERN = re.compile(r'^\s+|\s+\Z')
+INTEGER_PATTERN = re.compile(r'\s*[+-]?[0-9]+\s*')
+
 class CleanLandingPage():
     """cleans the landing page"""
-    def __init__(self) -> None:
-        self.sacommunity_url = SettingsHelper().get_sacommunity_url()
+    def __init__(self, sacommunity_url: str = None) -> None:
+        self.sacommunity_url = sacommunity_url if sacommunity_url is not None \
+            else SettingsHelper().get_sacommunity_url()
 
     def get_organization_id(self, text: str) -> str:
         """get organization id"""
@@ -23,13 +33,11 @@ class CleanLandingPage():
 
     def clean_landing_page_text(self, text: str) -> str:
         """clean landing page"""
-        search_cache_identifier = "/search?q=cache:"
-        if search_cache_identifier in text:
+        if SEARCH_CACHE_IDENTIFIER in text:
             text = text[text.index(self.sacommunity_url):].replace(
                 self.sacommunity_url, "")
 
-        suffixes_to_remove = ["?fbclid=", "+&", "?_x_tr_", "?back="]
-        for suffix_to_remove in suffixes_to_remove:
+        for suffix_to_remove in SUFFIXES_TO_REMOVE:
             if suffix_to_remove in text:
                 text = text[:text.index(suffix_to_remove)]
 
@@ -40,61 +48,88 @@ class CleanLandingPage():
 
         return text.strip()
 
+    def clean_landing_page_texts(self, texts: pd.Series) -> pd.Series:
+        """clean landing pages, same as clean_landing_page_text of each text"""
+        is_search_cache = texts.str.contains(SEARCH_CACHE_IDENTIFIER, regex=False)
+        if is_search_cache.any():
+            search_cache_texts = texts[is_search_cache]
+            if (search_cache_texts.str.find(self.sacommunity_url) == -1).any():
+                raise ValueError('substring not found')
+            # text from the first sacommunity url, without the sacommunity urls
+            search_cache_texts = search_cache_texts.str.replace(
+                re.compile(f'^.*?(?={re.escape(self.sacommunity_url)})', re.DOTALL),
+                '', n=1, regex=True).str.replace(self.sacommunity_url, '', regex=False)
+            texts = texts.mask(is_search_cache, search_cache_texts)
+
+        texts = texts.str.replace(SUFFIXES_TO_REMOVE_PATTERN, '', regex=True)
+        texts = texts.str.replace('_', ' ', regex=False).str.replace('/org/', '', regex=False)
+        return texts.str.replace(WHITESPACE_AROUND_PATTERN, '', regex=True)
+
+    def get_organization_ids(self, texts: pd.Series) -> pd.Series:
+        """organization ids, same as get_organization_id of each text"""
+        id_texts = texts.str.partition('-')
+        id_texts = id_texts[0][id_texts[1] == '-']
+        is_integer = id_texts.str.fullmatch(INTEGER_PATTERN)
+        organization_ids = pd.concat([
+            pd.to_numeric(id_texts[is_integer]).astype('float64'),
+            # int parses more than digits, and raises the same error for invalid ids
+            id_texts[~is_integer].map(int).astype('float64')]).reindex(texts.index).rename(
+                texts.name)
+        if organization_ids.notna().all():
+            return organization_ids.astype('int64')
+        if organization_ids.isna().all():
+            return pd.Series(None, index=texts.index, dtype=object, name=texts.name)
+        return organization_ids
+
+    def get_organization_names(self, texts: pd.Series) -> pd.Series:
+        """organization names, same as get_organization_name of each text"""
+        name_texts = texts.str.partition('-')
+        return name_texts[2].where(name_texts[1] == '-').rename(texts.name)
+
     def get_sessions_by_organization(self, df_ga_orig: pd.DataFrame) -> pd.DataFrame:
-        """get sessions by organization"""
+        """get sessions by organization. Landing pages repeat for each device and source,
+        so each distinct landing page is cleaned once"""
         df_ga = df_ga_orig.dropna().copy()
-        df_ga['organization_id_name'] = df_ga['landing_page'].apply(
-            self.clean_landing_page_text)
-        df_ga['organization_id'] = df_ga['organization_id_name'].apply(
-            self.get_organization_id)
-        df_ga['organization_name'] = df_ga['organization_id_name'].apply(
-            self.get_organization_name)
+        codes, landing_pages = pd.factorize(df_ga['landing_page'])
+        organization_id_names = self.clean_landing_page_texts(pd.Series(landing_pages))
+        organizations_df = pd.DataFrame({
+            'organization_id_name': organization_id_names,
+            'organization_id': self.get_organization_ids(organization_id_names),
+            'organization_name': self.get_organization_names(organization_id_names)})
+        organizations_df = organizations_df.take(codes).set_axis(df_ga.index)
+        df_ga[organizations_df.columns] = organizations_df
         return df_ga[["landing_page", "organization_id_name", "organization_id",
                       "organization_name", "sessions"]]
 
     def process_data(self, landing_page_df, sa_community_df) -> pd.DataFrame:
-        """process data"""
+        """process data, one record for each landing page with a valid organization id.
+        Names and landing page are the first ones found for the organization id,
+        they are looked up with joins, instead of scanning the data for each record"""
         sessions_data_df = self.get_sessions_by_organization(landing_page_df)
-        results = []
-        for _, row in sessions_data_df.iterrows():
-            org_id_str = row["organization_id"]
-            if math.isnan(org_id_str):
-                print('org id is invalid, so skip it ', org_id_str)
-                continue
-            org_id = 0
-            if org_id_str is not None:
-                org_id = int(org_id_str)
-
-            session_count = row["sessions"]
-
-            # organization name from sa-community file
-            org_names_sa_community = sa_community_df[sa_community_df['ID_19']
-                                                     == org_id]["Org_name"].values
-            organization_name_sa_community = ''
-            is_record_available_in_sacommunity_db = False
-            if len(org_names_sa_community) > 0:
-                organization_name_sa_community = org_names_sa_community[0]
-                is_record_available_in_sacommunity_db = True
-
-            # organization name from google analytics file
-            org_names_google = sessions_data_df[sessions_data_df[
-                "organization_id"] == org_id]["organization_name"].values
-            # print('org_names_google ', org_names_google)
-            organization_name_google = ''
-            if len(org_names_google) > 0:
-                organization_name_google = org_names_google[0]
-
-            # print('org_names_google ', org_names_google)
-            landing_page = self.sacommunity_url + \
-                sessions_data_df[sessions_data_df["organization_id"]
-                                                  == org_id]["landing_page"].values[0]
-            results.append({
-                'org_id': org_id,
-                'landing_page': landing_page,
-                'sessions_count': session_count,
-                'organization_name_sa_community': organization_name_sa_community,
-                'organization_name_google': organization_name_google,
-                'is_record_available_in_sacommunity_db': is_record_available_in_sacommunity_db,
-            })
-
-        return pd.DataFrame(results)
+        is_valid_org_id = sessions_data_df["organization_id"].notna()
+        if not is_valid_org_id.all():
+            print('org id is invalid, so skip records ', (~is_valid_org_id).sum())
+        sessions_data_df = sessions_data_df[is_valid_org_id].astype({"organization_id": "int64"})
+
+        # first organization name and landing page in google analytics file
+        google_df = sessions_data_df.drop_duplicates("organization_id", keep="first")[
+            ["organization_id", "organization_name", "landing_page"]]
+        # first organization name in sa-community file
+        sa_community_first_df = sa_community_df.drop_duplicates("ID_19", keep="first")[
+            ["ID_19", "Org_name"]]
+
+        results_df = sessions_data_df[["organization_id", "sessions"]].merge(
+            google_df, on="organization_id", how="left").merge(
+            sa_community_first_df, left_on="organization_id", right_on="ID_19",
+            how="left", indicator=True)
+        is_record_available = results_df["_merge"] == "both"
+
+        return pd.DataFrame({
+            'org_id': results_df["organization_id"],
+            'landing_page': self.sacommunity_url + results_df["landing_page"],
+            'sessions_count': results_df["sessions"],
+            'organization_name_sa_community': results_df["Org_name"].where(
+                is_record_available, ''),
+            'organization_name_google': results_df["organization_name"],
+            'is_record_available_in_sacommunity_db': is_record_available,
+        })
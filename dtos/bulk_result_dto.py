@@ -0,0 +1,24 @@
+"""bulk result dto"""
+
+
+class BulkResultDto():
+    """result of an input of a bulk run, error is None if it succeeded"""
+    def __init__(self,
+                 index: int,
+                 input_value,
+                 value=None,
+                 error: Exception = None) -> None:
+        # position of the input in the inputs
+        self.index = index
+        self.input_value = input_value
+        self.value = value
+        self.error = error
+
+    def to_dict(self):
+        """returns dictionary representation of dto"""
+        return self.__dict__
+
+    @classmethod
+    def from_dict(cls, dict_obj):
+        """creates new instance from dictionary"""
+        return cls(**dict_obj)
@@ -3,20 +3,25 @@
 
 class GetDataFromUrlRequestDto():
     """request config page size and page token"""
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
     def __init__(self,
                  url: str,
                  is_headless: bool,
                  to_exclude: list,
                  timeout_in_seconds: int,
-                 xpath: str) -> None:
+                 xpath: str,
+                 stable_for_seconds: float = 1,
+                 poll_interval_in_seconds: float = 0.1) -> None:
         self.url = url
         self.is_headless = is_headless
         self.to_exclude = to_exclude
         self.timeout_in_seconds = timeout_in_seconds
         self.xpath = xpath
+        # text is ready when it has not changed for stable_for_seconds
+        self.stable_for_seconds = stable_for_seconds
+        self.poll_interval_in_seconds = poll_interval_in_seconds
 
-    # pylint: enable=too-many-arguments
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
 
     def to_dict(self):
         """returns dictionary representation of dto"""
@@ -0,0 +1,31 @@
+"""job plan dto"""
+from datetime import date
+
+
+class JobPlanDto():
+    """work planned for a job (data frequency, data module) within the quota"""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(self,
+                 job_config,
+                 start_date: date,
+                 end_date: date,
+                 pending_days: int,
+                 planned_days: int,
+                 estimated_requests: int) -> None:
+        self.job_config = job_config
+        self.start_date = start_date
+        # run the job till end date (exclusive) to stay within the quota
+        self.end_date = end_date
+        self.pending_days = pending_days
+        self.planned_days = planned_days
+        self.estimated_requests = estimated_requests
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def to_dict(self):
+        """returns dictionary representation of dto"""
+        return self.__dict__
+
+    @classmethod
+    def from_dict(cls, dict_obj):
+        """creates new instance from dictionary"""
+        return cls(**dict_obj)
@@ -0,0 +1,31 @@
+"""job run dto"""
+from datetime import datetime
+from helpers.enums import JobStatus
+
+
+class JobRunDto():
+    """result and timing of a job run by the job scheduler"""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(self,
+                 name: str,
+                 job_status: JobStatus,
+                 started_at: datetime = None,
+                 ended_at: datetime = None,
+                 elapsed_seconds: float = 0,
+                 failure_reason: str = '') -> None:
+        self.name = name
+        self.job_status = job_status
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.elapsed_seconds = elapsed_seconds
+        self.failure_reason = failure_reason
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def to_dict(self):
+        """returns dictionary representation of dto"""
+        return self.__dict__
+
+    @classmethod
+    def from_dict(cls, dict_obj):
+        """creates new instance from dictionary"""
+        return cls(**dict_obj)
@@ -0,0 +1,68 @@
+"""settings snapshot dto"""
+
+
+# pylint: disable=too-many-instance-attributes
+class SettingsSnapshotDto():
+    """settings of app_settings.json loaded at a point in time, with the defaults of
+    optional settings applied, so that they are read as plain attributes"""
+    def __init__(self, settings: dict | None) -> None:
+        # settings as loaded from file, None if the file is empty
+        self.settings = settings
+        settings = settings or {}
+
+        google_analytics = settings.get('GoogleAnalytics') or {}
+        self.google_analytics_view_id_v3 = google_analytics.get('ViewId_V3')
+        self.google_analytics_view_id_v4 = google_analytics.get('ViewId_V4')
+        self.google_analytics_page_size = google_analytics.get('PageSize')
+
+        file_storage = settings.get('FileStorage') or {}
+        self.file_storage_root_folder = file_storage.get('RootDir')
+        self.file_storage_format: str = file_storage.get('Format', 'CSV')
+
+        web_scraping = settings.get('WebScraping') or {}
+        self.web_scraping_maximum_concurrent_requests = \
+            web_scraping.get('MaximumConcurrentRequests')
+        self.web_scraping_timeout_in_seconds = web_scraping.get('DefaultTimeoutInSeconds')
+        self.web_scraping_maximum_pages_per_driver: int = \
+            web_scraping.get('MaximumPagesPerDriver', 50)
+
+        jobs = settings.get('Jobs') or {}
+        self.jobs_maximum_workers: int = jobs.get('MaximumWorkers', 1)
+        self.jobs_maximum_concurrent_jobs: int = jobs.get('MaximumConcurrentJobs', 1)
+        self.jobs_stream_to_file: bool = jobs.get('StreamToFile', False)
+        self.jobs_fetch_period: str = jobs.get('FetchPeriod', 'DAILY')
+
+        # None if disabled
+        self.response_cache: dict | None = self.get_enabled_settings(settings, 'ResponseCache')
+        self.rate_limit: dict | None = self.get_enabled_settings(settings, 'RateLimit')
+        self.council_cache: dict | None = self.get_enabled_settings(settings, 'CouncilCache')
+
+        # councils are looked up with the lookup web app in chrome, unless Backend is HTTP
+        self.council_lookup: dict = {'Backend': 'SELENIUM',
+                                     'GeocodeUrl': '',
+                                     'CouncilLayerUrl': '',
+                                     'CouncilNameField': '',
+                                     'WardLayerUrl': '',
+                                     'ElectoralWardField': '',
+                                     'MaximumConcurrentRequests': 50,
+                                     'TimeoutInSeconds': 10,
+                                     **(settings.get('CouncilLookup') or {})}
+
+        self.work_queue: dict = {'FilePath': './settings/work_queue.db',
+                                 'LeaseInSeconds': 300,
+                                 'MaximumAttempts': 3,
+                                 **(settings.get('WorkQueue') or {})}
+
+        self.sacommunity_url: str = settings.get('SACommunityUrl')
+
+    def get_enabled_settings(self, settings: dict, module: str) -> dict | None:
+        """settings of the module, None if the module is missing or not Enabled"""
+        module_settings = settings.get(module)
+        if module_settings is None or not module_settings.get('Enabled', False):
+            return None
+        return module_settings
+
+    def to_dict(self):
+        """returns dictionary representation of dto"""
+        return self.__dict__
+# pylint: enable=too-many-instance-attributes
@@ -0,0 +1,43 @@
+"""work unit dto"""
+from datetime import date
+from helpers.enums import WorkUnitStatus
+
+
+# pylint: disable=too-many-instance-attributes
+class WorkUnitDto():
+    """unit of work in the work queue: data of (data_frequency, module) for a date range,
+    claimed by a worker till the lease expires"""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(self,
+                 unit_id: int,
+                 data_frequency: int,
+                 module: int,
+                 start_date: date,
+                 end_date: date,
+                 status: WorkUnitStatus,
+                 worker_id: str = None,
+                 lease_expires_at: float = None,
+                 attempts: int = 0,
+                 failure_reason: str = '') -> None:
+        self.unit_id = unit_id
+        self.data_frequency = data_frequency
+        self.module = module
+        self.start_date = start_date
+        # inclusive
+        self.end_date = end_date
+        self.status = status
+        self.worker_id = worker_id
+        self.lease_expires_at = lease_expires_at
+        self.attempts = attempts
+        self.failure_reason = failure_reason
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def to_dict(self):
+        """returns dictionary representation of dto"""
+        return self.__dict__
+
+    @classmethod
+    def from_dict(cls, dict_obj):
+        """creates new instance from dictionary"""
+        return cls(**dict_obj)
+# pylint: enable=too-many-instance-attributes
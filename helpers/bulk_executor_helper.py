@@ -0,0 +1,65 @@
+"""Bulk executor helper"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dtos.bulk_result_dto import BulkResultDto
+
+
+class BulkExecutorHelper():
+    """Runs a function for many inputs on a fixed number of threads.
+    Inputs are submitted as threads get free, at most maximum_pending_per_worker inputs
+    per thread are in flight, so a large list of inputs doesn't create as many tasks.
+    Results are yielded as they finish, or in input order, with the error of the input
+    instead of raising it. In input order, at most maximum_buffered_per_worker results
+    per thread wait for the result of a slow input before submitting more inputs.
+    """
+    maximum_pending_per_worker = 2
+    maximum_buffered_per_worker = 8
+
+    def __init__(self, maximum_workers: int) -> None:
+        self.maximum_workers = max(1, maximum_workers or 1)
+
+    def run_input(self, func, index: int, input_value) -> BulkResultDto:
+        """result of the function for the input, with the exception if it raised one"""
+        # pylint: disable=broad-exception-caught
+        try:
+            return BulkResultDto(index, input_value, value=func(input_value))
+        except Exception as ex:
+            return BulkResultDto(index, input_value, error=ex)
+        # pylint: enable=broad-exception-caught
+
+    def iter_results(self, func, inputs, is_ordered: bool = False):
+        """yields BulkResultDto of each input, in input order if is_ordered
+        else as they finish"""
+        maximum_pending = self.maximum_workers * self.maximum_pending_per_worker
+        maximum_buffered = self.maximum_workers * self.maximum_buffered_per_worker
+        inputs = iter(enumerate(inputs))
+        # results finished before the results of previous inputs, when is_ordered
+        finished_results = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=self.maximum_workers) as executor:
+            pending = set()
+            is_input_left = True
+            while is_input_left or len(pending) > 0:
+                while is_input_left and len(pending) < maximum_pending \
+                        and len(pending) + len(finished_results) < maximum_buffered:
+                    index_input = next(inputs, None)
+                    if index_input is None:
+                        is_input_left = False
+                        break
+                    pending.add(executor.submit(self.run_input, func, *index_input))
+                if len(pending) == 0:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: f.result().index):
+                    result = future.result()
+                    if not is_ordered:
+                        yield result
+                        continue
+                    finished_results[result.index] = result
+                while next_index in finished_results:
+                    yield finished_results.pop(next_index)
+                    next_index += 1
+
+    def run(self, func, inputs) -> list[BulkResultDto]:
+        """BulkResultDto of each input in input order"""
+        return list(self.iter_results(func, inputs, is_ordered=True))
@@ -0,0 +1,195 @@
+"""Council lookup helper"""
+import atexit
+import logging
+import threading
+from abc import ABC, abstractmethod
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dtos.bulk_result_dto import BulkResultDto
+from helpers.bulk_executor_helper import BulkExecutorHelper
+
+
+class CouncilLookupBackend(ABC):
+    """Finds the council of an address, as {'address', 'council_name', 'electoral_ward'},
+    or '' if the address is not found"""
+    def __init__(self, maximum_concurrent_requests: int = 1) -> None:
+        self.log = logging.getLogger(__name__)
+        self.maximum_concurrent_requests = max(1, maximum_concurrent_requests or 1)
+
+    @abstractmethod
+    def find_council(self, address: str):
+        """council of the address, '' if the address is not found"""
+
+    def find_councils(self, addresses: list) -> list[BulkResultDto]:
+        """BulkResultDto of the council of each address in the order of addresses,
+        looked up maximum_concurrent_requests at a time"""
+        return BulkExecutorHelper(self.maximum_concurrent_requests) \
+            .run(self.find_council, addresses)
+
+
+class SeleniumCouncilLookup(CouncilLookupBackend):
+    """Reads the council from the results panel of the lookup web app rendered in chrome"""
+    def __init__(self, web_scraping, timeout_in_seconds=600, is_headless=True,
+                 maximum_concurrent_requests: int = 1) -> None:
+        super().__init__(maximum_concurrent_requests)
+        # WebScraping rendering the page with its pool of drivers
+        self.web_scraping = web_scraping
+        self.timeout_in_seconds = timeout_in_seconds
+        self.is_headless = is_headless
+
+    def find_council(self, address: str):
+        """council in the results panel of the address"""
+        return self.web_scraping.find_council_by_address_in_browser(
+            address, self.timeout_in_seconds, self.is_headless)
+
+
+class HttpCouncilLookup(CouncilLookupBackend):
+    """Finds the council with the json queries behind the lookup web app, without a browser:
+    the address is geocoded to a point, and the council and electoral ward are the
+    attributes of the features of the layers intersecting the point.
+    Connections are kept in a pooled session shared by the threads looking up councils
+    of many addresses, maximum_concurrent_requests at a time
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, lookup_settings: dict) -> None:
+        super().__init__(lookup_settings.get('MaximumConcurrentRequests'))
+        # findAddressCandidates url of the geocode service
+        self.geocode_url = lookup_settings.get('GeocodeUrl')
+        # feature layer urls, ward is read from the council layer if it has no layer
+        self.council_layer_url = lookup_settings.get('CouncilLayerUrl')
+        self.council_name_field = lookup_settings.get('CouncilNameField')
+        self.ward_layer_url = lookup_settings.get('WardLayerUrl') or self.council_layer_url
+        self.electoral_ward_field = lookup_settings.get('ElectoralWardField')
+        self.timeout_in_seconds = lookup_settings.get('TimeoutInSeconds')
+        self.session = self.get_session()
+
+    @classmethod
+    def get_instance(cls, lookup_settings: dict):
+        """returns the lookup shared by all the callers of the settings,
+        so that the connections of its session are reused. Session is closed at exit"""
+        key = tuple(sorted(lookup_settings.items()))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(lookup_settings)
+                atexit.register(cls._instances[key].close)
+            return cls._instances[key]
+
+    @classmethod
+    def is_configured(cls, lookup_settings: dict) -> bool:
+        """whether the settings have the urls and fields needed to look up councils"""
+        return all(lookup_settings.get(name) for name in
+                   ['GeocodeUrl', 'CouncilLayerUrl', 'CouncilNameField'])
+
+    def get_session(self) -> requests.Session:
+        """session keeping up to maximum_concurrent_requests connections per host,
+        retrying failed connections and busy servers"""
+        retry = Retry(total=2, backoff_factor=0.1, allowed_methods=['GET'],
+                      status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=self.maximum_concurrent_requests,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """close the connections of the session"""
+        self.session.close()
+
+    def get_json(self, url: str, params: dict) -> dict:
+        """json response of the url, raises the error returned by the service"""
+        response = self.session.get(url, params=params, timeout=self.timeout_in_seconds)
+        response.raise_for_status()
+        result = response.json()
+        # arcgis services return errors in the json with status 200
+        if 'error' in result:
+            raise ValueError(f"{url} failed: {result['error'].get('message')}")
+        return result
+
+    def geocode(self, address: str) -> dict | None:
+        """location {'x', 'y'} in WGS84 of the best candidate of the address,
+        None if the address is not found"""
+        result = self.get_json(self.geocode_url, {'SingleLine': address,
+                                                  'maxLocations': 1,
+                                                  'outSR': 4326,
+                                                  'f': 'json'})
+        candidates = result.get('candidates') or []
+        if len(candidates) == 0:
+            return None
+        return candidates[0]['location']
+
+    def query_attributes(self, layer_url: str, location: dict, fields: list[str]) -> dict:
+        """attributes of the first feature of the layer intersecting the location,
+        empty if no feature intersects it"""
+        result = self.get_json(f"{layer_url.rstrip('/')}/query", {
+            'geometry': f"{location['x']},{location['y']}",
+            'geometryType': 'esriGeometryPoint',
+            'inSR': 4326,
+            'spatialRel': 'esriSpatialRelIntersects',
+            'outFields': ','.join(fields),
+            'returnGeometry': 'false',
+            'f': 'json'})
+        features = result.get('features') or []
+        if len(features) == 0:
+            return {}
+        return features[0].get('attributes') or {}
+
+    def find_council(self, address: str):
+        """council of the features at the geocoded location of the address"""
+        location = self.geocode(address)
+        if location is None:
+            return ''
+
+        is_ward_in_council_layer = self.ward_layer_url == self.council_layer_url
+        fields = [self.council_name_field]
+        if self.electoral_ward_field and is_ward_in_council_layer:
+            fields.append(self.electoral_ward_field)
+        attributes = self.query_attributes(self.council_layer_url, location, fields)
+        if attributes.get(self.council_name_field) is None:
+            return ''
+        if self.electoral_ward_field and not is_ward_in_council_layer:
+            attributes = {**attributes, **self.query_attributes(
+                self.ward_layer_url, location, [self.electoral_ward_field])}
+
+        return {'address': address,
+                'council_name': str(attributes[self.council_name_field]).strip(),
+                'electoral_ward': str(attributes.get(self.electoral_ward_field) or '').strip()}
+
+
+class FallbackCouncilLookup(CouncilLookupBackend):
+    """Looks up the council with the first backend, and with the next backends
+    for the addresses it failed. Addresses not found are not looked up again"""
+    def __init__(self, backends: list[CouncilLookupBackend]) -> None:
+        super().__init__()
+        self.backends = backends
+
+    def find_council(self, address: str):
+        """council of the first backend which doesn't fail"""
+        for backend in self.backends[:-1]:
+            # pylint: disable=broad-exception-caught
+            try:
+                return backend.find_council(address)
+            except Exception:
+                self.log.warning('%s failed for %s, so fall back to the next lookup',
+                                 type(backend).__name__, address, exc_info=True)
+            # pylint: enable=broad-exception-caught
+        return self.backends[-1].find_council(address)
+
+    def find_councils(self, addresses: list) -> list[BulkResultDto]:
+        """results of the first backend, failed addresses are looked up by the next backends"""
+        results = self.backends[0].find_councils(addresses)
+        for backend in self.backends[1:]:
+            failed_results = [result for result in results if result.error is not None]
+            if len(failed_results) == 0:
+                break
+            self.log.warning('%s addresses failed, so fall back to %s',
+                             len(failed_results), type(backend).__name__)
+            fallback_results = backend.find_councils([r.input_value for r in failed_results])
+            for failed_result, fallback_result in zip(failed_results, fallback_results):
+                fallback_result.index = failed_result.index
+                results[failed_result.index] = fallback_result
+        return results
@@ -1,14 +1,98 @@
 """read CU dataset reader to identify council name and dataset id"""
 
+import os
+import re
+import json
+import bisect
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from PyPDF2 import PdfReader
 
 
+def extract_pages_lines(file_path: str, page_indexes: list[int]) -> list[list[str]]:
+    """lines of text of the pages, the pdf is opened in the process running it"""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text().splitlines() for i in page_indexes]
+
+
+class CouncilSearchIndex():
+    """In memory index of council names for exact, prefix, token and substring search.
+    Names are compared in lower case, and the first dataset of the pdf wins within a match
+    """
+    def __init__(self, datasets: list[dict]) -> None:
+        self.datasets = datasets
+        self.council_names = [d['council_name'].lower() for d in datasets]
+        self.exact_index = {}
+        self.token_index = {}
+        for i, council_name in enumerate(self.council_names):
+            self.exact_index.setdefault(council_name, i)
+            for token in self.get_tokens(council_name):
+                self.token_index.setdefault(token, []).append(i)
+        self.sorted_council_names = sorted((name, i) for i, name in enumerate(self.council_names))
+
+    def get_tokens(self, text: str) -> set[str]:
+        """words of the text"""
+        return set(re.findall(r'\w+', text.lower()))
+
+    def search_exact(self, council_name: str) -> int | None:
+        """position of the dataset with the council name"""
+        return self.exact_index.get(council_name)
+
+    def search_prefix(self, council_name: str) -> int | None:
+        """first position of the datasets whose council name starts with the text"""
+        start = bisect.bisect_left(self.sorted_council_names, (council_name, -1))
+        positions = []
+        for name, i in self.sorted_council_names[start:]:
+            if not name.startswith(council_name):
+                break
+            positions.append(i)
+        return min(positions, default=None)
+
+    def search_tokens(self, council_name: str) -> int | None:
+        """first position of the datasets having all the words of the text"""
+        tokens = self.get_tokens(council_name)
+        if len(tokens) == 0:
+            return None
+        positions = None
+        for token in tokens:
+            token_positions = set(self.token_index.get(token, []))
+            positions = token_positions if positions is None else positions & token_positions
+        return min(positions, default=None)
+
+    def search_substring(self, council_name: str) -> int | None:
+        """first position of the datasets whose council name contains the text"""
+        return next((i for i, name in enumerate(self.council_names) if council_name in name),
+                    None)
+
+    def search(self, council_name: str) -> dict | None:
+        """dataset of the best match: exact, then prefix, then all words, then substring"""
+        council_name = council_name.strip().lower()
+        for search in [self.search_exact, self.search_prefix, self.search_tokens,
+                       self.search_substring]:
+            position = search(council_name)
+            if position is not None:
+                return self.datasets[position]
+        return None
+
+
 class CuDatasetReader():
-    """read cu dataset pdf"""
+    """read cu dataset pdf.
+    Datasets parsed from the pdf are saved in a json file next to the pdf with the hash of
+    the pdf, and kept in memory with their search index, so the pdf is parsed again only
+    when it changes"""
+    # pdf path -> ((modified time, size), hash, search index), shared by all readers
+    _search_indexes = {}
+    _search_indexes_lock = threading.Lock()
+    # processes extracting text of pages, 1 extracts them in this process
+    maximum_workers = 1
+    pages_per_task = 8
 
     def __init__(self, file_path='./settings/cu_dataset.pdf') -> None:
         self.file_path = file_path
+        self.datasets_file_path = f'{os.path.splitext(file_path)[0]}.datasets.json'
         self.row_identifier = 'support@sacommu'
         self.page_header_identifier = 'https://sacommunity.org/admin/settings/datasets'
 
@@ -19,8 +103,43 @@ class CuDatasetReader():
 
         return text
 
-    def read_cu_dataset_settings_pdf(self, return_dataframe=False):
-        """read CU dataset: CU datasets settings _ SAcommunity - Connecting Up Australia.pdf"""
+    def iter_pages_lines(self, maximum_workers: int = None):
+        """yields (page index, total pages, lines of text of the page) in page order.
+        Text extraction is cpu bound, so with more than one worker the pages are split
+        in tasks of pages_per_task pages over a process pool. At most two tasks per worker
+        are in flight, so extracted pages are not all held in memory"""
+        maximum_workers = maximum_workers or self.maximum_workers
+        if maximum_workers <= 1:
+            reader = PdfReader(self.file_path)
+            total_pages = len(reader.pages)
+            for i, page in enumerate(reader.pages):
+                yield i, total_pages, page.extract_text().splitlines()
+            return
+
+        # the processes open the pdf, only the number of pages is read here
+        total_pages = len(PdfReader(self.file_path).pages)
+        tasks = [list(range(start, min(start + self.pages_per_task, total_pages)))
+                 for start in range(0, total_pages, self.pages_per_task)]
+        with ProcessPoolExecutor(max_workers=maximum_workers) as executor:
+            futures = deque()
+            for page_indexes in tasks:
+                futures.append((page_indexes, executor.submit(
+                    extract_pages_lines, self.file_path, page_indexes)))
+                if len(futures) < 2 * maximum_workers:
+                    continue
+                yield from self.get_task_pages(futures.popleft(), total_pages)
+            while len(futures) > 0:
+                yield from self.get_task_pages(futures.popleft(), total_pages)
+
+    def get_task_pages(self, task, total_pages: int):
+        """(page index, total pages, lines) of each page of the task, waits for the task"""
+        page_indexes, future = task
+        for i, page_lines in zip(page_indexes, future.result()):
+            yield i, total_pages, page_lines
+
+    def read_cu_dataset_settings_pdf(self, return_dataframe=False, maximum_workers: int = None):
+        """read CU dataset: CU datasets settings _ SAcommunity - Connecting Up Australia.pdf.
+        Pages are extracted by maximum_workers processes, rows are read in page order"""
         texts_to_remove = [
             self.row_identifier,
             self.page_header_identifier,
@@ -28,12 +147,8 @@ class CuDatasetReader():
             'support@sacommu'
         ]
 
-        reader = PdfReader(self.file_path)
-        total_pages = len(reader.pages)
         datasets = []
-        for i, page in enumerate(reader.pages):
-            page_lines = page.extract_text().splitlines()
-
+        for i, total_pages, page_lines in self.iter_pages_lines(maximum_workers):
             for page_line in page_lines:
                 if self.page_header_identifier in page_line:
                     page_number = f'{i+1}/{total_pages}'
@@ -52,13 +167,50 @@ class CuDatasetReader():
 
         return datasets
 
-    def search_dataset_id_from_council_name(self, council_name: str):
-        """search dataset pdf for council and returns dataset id"""
+    def get_file_hash(self) -> str:
+        """sha256 of the pdf"""
+        file_hash = hashlib.sha256()
+        with open(self.file_path, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def read_datasets(self, file_hash: str) -> list[dict]:
+        """datasets of the json file if it was saved from the pdf of the hash,
+        else parse the pdf and save them"""
+        try:
+            with open(self.datasets_file_path, 'r', encoding='UTF-8') as file_obj:
+                saved_datasets = json.load(file_obj)
+            if saved_datasets.get('pdf_hash') == file_hash:
+                return saved_datasets.get('datasets')
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
         datasets = self.read_cu_dataset_settings_pdf(return_dataframe=False)
-        # return datasets_df[datasets_df["council_name"].str.contains(council_name, case=False)]
-        datasets = [
-            d for d in datasets if council_name in d['council_name'].lower()]
-        if len(datasets) == 0:
-            return None
+        temp_datasets_file_path = \
+            f'{self.datasets_file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_datasets_file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump({'pdf_hash': file_hash, 'datasets': datasets}, file_obj)
+        os.replace(temp_datasets_file_path, self.datasets_file_path)
+        return datasets
+
+    def get_search_index(self) -> CouncilSearchIndex:
+        """search index of the datasets of the pdf"""
+        stat = os.stat(self.file_path)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        key = os.path.abspath(self.file_path)
+        with self._search_indexes_lock:
+            cached_stat, cached_hash, search_index = \
+                self._search_indexes.get(key, (None, None, None))
+            if file_stat == cached_stat:
+                return search_index
 
-        return datasets[0]
+            file_hash = self.get_file_hash()
+            if file_hash != cached_hash:
+                search_index = CouncilSearchIndex(self.read_datasets(file_hash))
+            self._search_indexes[key] = (file_stat, file_hash, search_index)
+            return search_index
+
+    def search_dataset_id_from_council_name(self, council_name: str):
+        """search datasets of pdf for council and returns dataset, None if not found"""
+        return self.get_search_index().search(council_name)
@@ -0,0 +1,168 @@
+"""Disk cache helper"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class DiskCacheHelper():
+    """Cache of json serializable values on disk.
+    Each entry is a json file named by the hash of its key, entries can expire after
+    a time to live, and the least recently used entries are evicted when the cache
+    grows over its maximum size. Hits and misses are counted per process.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_size_in_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_size_in_bytes = max_size_in_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.size_in_bytes = None
+
+    @classmethod
+    def get_instance(cls, cache_dir: str, max_size_in_bytes: int):
+        """returns the cache shared by all the callers of the cache directory"""
+        key = os.path.abspath(cache_dir)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(cache_dir, max_size_in_bytes)
+            cls._instances[key].max_size_in_bytes = max_size_in_bytes
+            return cls._instances[key]
+
+    @classmethod
+    def from_settings(cls, cache_settings: dict | None):
+        """returns the cache of the Directory and MaximumSizeInMegabytes of the settings,
+        None if the cache is disabled"""
+        if cache_settings is None:
+            return None
+        return cls.get_instance(cache_settings.get('Directory'),
+                                cache_settings.get('MaximumSizeInMegabytes') * 1024 * 1024)
+
+    def get_key(self, key_obj) -> str:
+        """hash of the json representation of the key object"""
+        key_json = json.dumps(key_obj, sort_keys=True, default=str)
+        return hashlib.sha256(key_json.encode('UTF-8')).hexdigest()
+
+    def get_entry_path(self, key_obj) -> str:
+        """file path of the entry, entries are spread over sub directories"""
+        key = self.get_key(key_obj)
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, key_obj):
+        """returns cached value, None if the key is not cached or is expired"""
+        entry_path = self.get_entry_path(key_obj)
+        entry = None
+        try:
+            with open(entry_path, 'r', encoding='UTF-8') as file_obj:
+                entry = json.load(file_obj)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = None
+
+        if entry is not None and entry.get('expires_at') is not None \
+            and entry.get('expires_at') < time.time():
+            self.remove_entry(entry_path)
+            entry = None
+
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        # modified time is the last used time of the entry, used for eviction.
+        # Entry may be evicted by another thread or process since it was read
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        return entry.get('value')
+
+    def set(self, key_obj, value, ttl_in_seconds: int = None):
+        """cache value, it never expires if ttl_in_seconds is None"""
+        entry_path = self.get_entry_path(key_obj)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        entry = {
+            'expires_at': None if ttl_in_seconds is None else time.time() + ttl_in_seconds,
+            'value': value
+        }
+        # unique per thread of each process sharing the cache directory
+        temp_entry_path = f'{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_entry_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump(entry, file_obj)
+        previous_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+        os.replace(temp_entry_path, entry_path)
+
+        with self.lock:
+            if self.size_in_bytes is None:
+                self.size_in_bytes = self.get_cache_size()
+            else:
+                self.size_in_bytes += os.path.getsize(entry_path) - previous_size
+            if self.size_in_bytes > self.max_size_in_bytes:
+                self.evict()
+
+    def invalidate(self, key_obj):
+        """remove the key from cache"""
+        self.remove_entry(self.get_entry_path(key_obj))
+
+    def clear(self):
+        """remove all the entries"""
+        for entry_path, _, _ in self.get_entries():
+            self.remove_entry(entry_path)
+
+    def remove_entry(self, entry_path: str):
+        """remove entry file"""
+        try:
+            size = os.path.getsize(entry_path)
+            os.remove(entry_path)
+        except FileNotFoundError:
+            return
+        with self.lock:
+            if self.size_in_bytes is not None:
+                self.size_in_bytes -= size
+
+    def get_entries(self) -> list:
+        """all the entries as (path, size, last used time)"""
+        entries = []
+        if not os.path.exists(self.cache_dir):
+            return entries
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if not file_name.endswith('.json'):
+                    continue
+                entry_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(entry_path)
+                except FileNotFoundError:
+                    continue
+                entries.append((entry_path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get_cache_size(self) -> int:
+        """total size of the entries in bytes"""
+        return sum(size for _, size, _ in self.get_entries())
+
+    def evict(self):
+        """remove least recently used entries until the cache fits in its maximum size.
+        Sizes are recounted from disk, as other processes may share the cache directory"""
+        entries = sorted(self.get_entries(), key=lambda e: e[2])
+        self.size_in_bytes = sum(size for _, size, _ in entries)
+        for entry_path, size, _ in entries:
+            if self.size_in_bytes <= self.max_size_in_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            self.size_in_bytes -= size
+
+    def get_statistics(self) -> dict:
+        """hits and misses of the cache in the current process"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_ratio': self.hits / total if total > 0 else 0}
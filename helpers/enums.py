@@ -9,6 +9,15 @@ class JobStatus(Enum):
     FAILED = 3
 
 
+class WorkUnitStatus(Enum):
+    """status of a unit of work in the work queue"""
+    DEFAULT = 0
+    PENDING = 1
+    CLAIMED = 2
+    DONE = 3
+    FAILED = 4
+
+
 class DataFrequency(Enum):
     """data frequency in which data are transformed / aggregated"""
     DEFAULT = 0
@@ -29,6 +38,12 @@ class DataModule(Enum):
     LANDING_PAGE_CLEANED = 6
     LANGING_PAGE_ERRORS = 7
 
+class StorageFormat(Enum):
+    """Format of the data files"""
+    DEFAULT = 0
+    CSV = 1
+    PARQUET = 2
+
 class GoogleAuthenticationMethod(Enum):
     """Authentication methods"""
     DEFAULT = 0
@@ -1,14 +1,52 @@
 """File helpers"""
 import os
 import shutil
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
-from helpers.enums import DataModule
+from dtos.date_range_dto import DateRangeDto
+from helpers.enums import DataFrequency, DataModule, StorageFormat
 from helpers.settings_helper import SettingsHelper
 
+# columns and types of the data saved by the jobs, same for every file of the data module
+DATA_MODULE_SCHEMAS = {
+    DataModule.AGE: pa.schema([('start_date', pa.date32()),
+                               ('end_date', pa.date32()),
+                               ('dataset_id', pa.string()),
+                               ('age_bracket', pa.string()),
+                               ('sessions', pa.int64())]),
+    DataModule.GENDER: pa.schema([('start_date', pa.date32()),
+                                  ('end_date', pa.date32()),
+                                  ('dataset_id', pa.string()),
+                                  ('gender', pa.string()),
+                                  ('sessions', pa.int64())]),
+    DataModule.LANDING_PAGE: pa.schema([('start_date', pa.date32()),
+                                        ('end_date', pa.date32()),
+                                        ('dataset_id', pa.string()),
+                                        ('landing_page', pa.string()),
+                                        ('device_category', pa.string()),
+                                        ('source_medium', pa.string()),
+                                        ('sessions', pa.int64())])
+}
+
+# pylint: disable=too-many-public-methods
 class FileHelper():
-    """helper methods for file handling"""
+    """helper methods for file handling
+    Data of the jobs is saved as csv, or as parquet partitioned hive style by
+    year=yyyy/month=mm/day=dd (FileStorage settings: Format), compressed by zstd.
+    Parquet rows are sorted by dataset_id and written in row groups of
+    parquet_row_group_size rows, so readers filtering on dataset_id skip row groups
+    by their statistics, instead of having a partition (and small files) per dataset.
+    """
+    parquet_compression = 'zstd'
+    parquet_row_group_size = 10000
+    read_maximum_workers = 8
+
     def __init__(self) -> None:
         self.settings_helper = SettingsHelper()
 
@@ -20,11 +58,239 @@ class FileHelper():
         """create directory excluding filename"""
         self.create_directory(os.path.dirname(file_path))
 
-    def save_list_to_csv(self, data : list, file_path):
-        """save list of data as csv"""
-        self.create_directory(os.path.dirname(file_path))
-        dataframe = pd.DataFrame(data)
-        dataframe.to_csv(file_path, index=False)
+    def save_dfs_to_csv(self, dataframes, file_path: str) -> int:
+        """save dataframes (e.g. pages of data) to a csv file as they arrive,
+        so that only one dataframe is kept in memory.
+        Data is written to a temporary file, which replaces the file once all are written.
+        Returns the number of rows saved"""
+        self.create_directory_excluding_filename(file_path)
+        temp_file_path = f'{file_path}.tmp'
+        total_rows = 0
+        is_header_written = False
+        try:
+            with open(temp_file_path, 'w', encoding='UTF-8', newline='') as file_obj:
+                for dataframe in dataframes:
+                    dataframe.to_csv(file_obj, index=False, header=not is_header_written)
+                    is_header_written = is_header_written or len(dataframe.columns) > 0
+                    total_rows += len(dataframe)
+            os.replace(temp_file_path, file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+        return total_rows
+
+    def get_storage_format(self) -> StorageFormat:
+        """format of the data files saved by the jobs, defaults to csv"""
+        return StorageFormat[self.settings_helper.get_file_storage_format()]
+
+    def get_data_file_path(self, root_dir, data_frequency_name: str, module_name: str,
+                           date_obj: date, storage_format: StorageFormat = None):
+        """get path of the data file of the day in the storage format"""
+        if storage_format is None:
+            storage_format = self.get_storage_format()
+        if storage_format == StorageFormat.PARQUET:
+            return self.get_parquet_data_path(root_dir, data_frequency_name, module_name,
+                                              date_obj)
+        return self.get_data_path(root_dir, data_frequency_name, module_name, date_obj)
+
+    def get_parquet_dataset_path(self, root_dir, data_frequency_name: str, module_name: str):
+        """get root path of the partitioned parquet files of the data module"""
+        return os.path.join(root_dir, "data", data_frequency_name, module_name)
+
+    def get_parquet_data_path(self, root_dir, data_frequency_name: str, module_name: str,
+                              date_obj: date):
+        """get path of the parquet file of the day, hive style partitioned by date"""
+        return os.path.join(self.get_parquet_dataset_path(root_dir, data_frequency_name,
+                                                          module_name),
+                            f'year={date_obj.year}',
+                            f'month={str(date_obj.month).zfill(2)}',
+                            f'day={str(date_obj.day).zfill(2)}',
+                            'part-0.parquet')
+
+    def get_schema(self, data_module: DataModule) -> pa.Schema:
+        """parquet schema of the data module"""
+        if data_module not in DATA_MODULE_SCHEMAS:
+            raise ValueError(f'Invalid data module {data_module.value}')
+        return DATA_MODULE_SCHEMAS[data_module]
+
+    def df_to_table(self, dataframe: pd.DataFrame, data_module: DataModule) -> pa.Table:
+        """arrow table of the dataframe in the schema of the data module"""
+        schema = self.get_schema(data_module)
+        if len(dataframe.columns) == 0:
+            return schema.empty_table()
+        missing_columns = [name for name in schema.names if name not in dataframe.columns]
+        if len(missing_columns) > 0:
+            raise ValueError(f'Columns {missing_columns} not found for {data_module.name}')
+        table = pa.Table.from_pandas(dataframe[schema.names], preserve_index=False)
+        return table.cast(schema)
+
+    def save_dfs_to_parquet(self, dataframes, file_path: str, data_module: DataModule) -> int:
+        """save dataframes (e.g. pages of data) to a parquet file as they arrive, each
+        sorted by dataset_id. Data is written to a temporary file, which replaces the file
+        once all are written. Returns the number of rows saved"""
+        self.create_directory_excluding_filename(file_path)
+        temp_file_path = f'{file_path}.tmp'
+        total_rows = 0
+        try:
+            with pq.ParquetWriter(temp_file_path, self.get_schema(data_module),
+                                  compression=self.parquet_compression,
+                                  write_statistics=True) as writer:
+                for dataframe in dataframes:
+                    table = self.df_to_table(dataframe, data_module)
+                    if table.num_rows == 0:
+                        continue
+                    writer.write_table(table.sort_by('dataset_id'),
+                                       row_group_size=self.parquet_row_group_size)
+                    total_rows += table.num_rows
+            os.replace(temp_file_path, file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+        return total_rows
+
+    def save_df_to_parquet(self, dataframe: pd.DataFrame, file_path: str,
+                           data_module: DataModule) -> int:
+        """save dataframe to parquet file, returns the number of rows saved"""
+        return self.save_dfs_to_parquet([dataframe], file_path, data_module)
+
+    def save_dfs_to_file(self, dataframes, file_path: str, data_module: DataModule) -> int:
+        """save dataframes as parquet or csv by the extension of the file path.
+        Dataframes without columns (days without data) are saved with the header of the
+        data module schema, so that the csv file can be read"""
+        if file_path.endswith('.parquet'):
+            return self.save_dfs_to_parquet(dataframes, file_path, data_module)
+        empty_df = self.get_schema(data_module).empty_table().to_pandas()
+        return self.save_dfs_to_csv((dataframe if len(dataframe.columns) > 0 else empty_df
+                                     for dataframe in dataframes), file_path)
+
+    def save_df_to_file(self, dataframe: pd.DataFrame, file_path: str,
+                        data_module: DataModule) -> int:
+        """save dataframe as parquet or csv by the extension of the file path"""
+        return self.save_dfs_to_file([dataframe], file_path, data_module)
+
+    def get_data_file_paths(self, root_dir, data_frequency_name: str, module_name: str,
+                            date_range: DateRangeDto,
+                            storage_format: StorageFormat) -> list[str]:
+        """paths of the existing data files dated from start date to end date (inclusive)"""
+        file_paths = []
+        for i in range((date_range.end_date - date_range.start_date).days + 1):
+            file_path = self.get_data_file_path(root_dir, data_frequency_name, module_name,
+                                                date_range.start_date + timedelta(days=i),
+                                                storage_format)
+            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+                file_paths.append(file_path)
+        return file_paths
+
+    def get_read_schema(self, data_module: DataModule, columns: list[str]) -> pa.Schema:
+        """schema of the columns as read: text columns are dictionary encoded,
+        so they become categorical in pandas without encoding them again"""
+        schema = self.get_schema(data_module)
+        return pa.schema([pa.field(column, pa.dictionary(pa.int32(), pa.string()))
+                          if pa.types.is_string(schema.field(column).type)
+                          else schema.field(column) for column in columns])
+
+    def is_row_group_of_datasets(self, row_group: pq.RowGroupMetaData,
+                                 dataset_ids: list[str]) -> bool:
+        """whether the min and max statistics of dataset_id of the row group allow
+        any of the dataset ids, True if there are no statistics"""
+        for i in range(row_group.num_columns):
+            column = row_group.column(i)
+            if column.path_in_schema != 'dataset_id':
+                continue
+            statistics = column.statistics
+            if statistics is None or not statistics.has_min_max:
+                return True
+            return any(statistics.min <= dataset_id <= statistics.max
+                       for dataset_id in dataset_ids)
+        return True
+
+    def read_data_file(self, file_path: str, data_module: DataModule, columns: list[str],
+                       dataset_ids: list[str] = None) -> pa.Table:
+        """read the columns of a parquet or csv data file in the types of the data module
+        schema, only the rows of the dataset ids if given"""
+        read_schema = self.get_read_schema(data_module, columns)
+        read_columns = columns if dataset_ids is None else \
+            list(dict.fromkeys(columns + ['dataset_id']))
+        if file_path.endswith('.parquet'):
+            parquet_file = pq.ParquetFile(file_path, read_dictionary=[
+                field.name for field in read_schema if pa.types.is_dictionary(field.type)])
+            if dataset_ids is None:
+                table = parquet_file.read(columns=read_columns, use_threads=False)
+            else:
+                # row groups without the dataset ids are skipped by their statistics
+                row_groups = [i for i in range(parquet_file.num_row_groups)
+                              if self.is_row_group_of_datasets(
+                                  parquet_file.metadata.row_group(i), dataset_ids)]
+                table = parquet_file.read_row_groups(row_groups, columns=read_columns,
+                                                     use_threads=False)
+        else:
+            # csv dates may have time, so they are parsed as timestamp and cast to date
+            column_types = {field.name: pa.timestamp('s') if pa.types.is_date(field.type)
+                            else field.type for field in self.get_schema(data_module)}
+            try:
+                table = pa_csv.read_csv(file_path,
+                                        read_options=pa_csv.ReadOptions(use_threads=False),
+                                        convert_options=pa_csv.ConvertOptions(
+                                            column_types=column_types,
+                                            include_columns=read_columns,
+                                            include_missing_columns=True))
+            except pa.ArrowInvalid:
+                # days without data used to be saved without header
+                if not self.is_blank_file(file_path):
+                    raise
+                return read_schema.empty_table()
+        if dataset_ids is not None:
+            table = table.filter(pc.field('dataset_id').isin(dataset_ids))
+        return table.select(columns).cast(read_schema)
+
+    def is_blank_file(self, file_path: str) -> bool:
+        """whether the file has only whitespace"""
+        with open(file_path, 'r', encoding='UTF-8') as file_obj:
+            return file_obj.read().strip() == ''
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+    def read_range(self, data_frequency: DataFrequency,
+                   data_module: DataModule,
+                   start_date: date,
+                   end_date: date,
+                   dataset_ids: list[str] = None,
+                   columns: list[str] = None,
+                   root_dir: str = None,
+                   storage_format: StorageFormat = None) -> pd.DataFrame:
+        """read the data files dated from start date to end date (inclusive) into one
+        dataframe. Rollup files are dated by the start of their week, month or year.
+        Files are read in parallel by read_maximum_workers threads, only the columns
+        (default: all the columns of the data module schema) and the rows of the dataset ids
+        are read. Dates are datetime64 and text columns are categorical, as in the
+        dataframes of google analytics api.
+        Root directory and storage format default to FileStorage settings"""
+        schema = self.get_schema(data_module)
+        columns = schema.names if columns is None else columns
+        invalid_columns = [column for column in columns if column not in schema.names]
+        if len(invalid_columns) > 0:
+            raise ValueError(f'Columns {invalid_columns} not found for {data_module.name}')
+        if dataset_ids is not None:
+            dataset_ids = [str(dataset_id) for dataset_id in dataset_ids]
+        if root_dir is None:
+            root_dir = self.settings_helper.get_file_storage_root_folder()
+        if storage_format is None:
+            storage_format = self.get_storage_format()
+
+        file_paths = self.get_data_file_paths(root_dir, data_frequency.name, data_module.name,
+                                              DateRangeDto(start_date, end_date),
+                                              storage_format)
+        # arrow reads and parses files without the GIL, so threads read them in parallel
+        with ThreadPoolExecutor(max_workers=self.read_maximum_workers) as executor:
+            tables = list(executor.map(
+                lambda file_path: self.read_data_file(file_path, data_module, columns,
+                                                      dataset_ids),
+                file_paths))
+        table = pa.concat_tables(tables) if len(tables) > 0 else \
+            self.get_read_schema(data_module, columns).empty_table()
+        return table.to_pandas(date_as_object=False)
+    # pylint: enable=too-many-arguments, too-many-positional-arguments, too-many-locals
 
     def get_data_path_in_current_directory(self, data_frequency_name, module_name, date_obj: date):
         """get data path in current directory"""
@@ -80,3 +346,4 @@ class FileHelper():
         """read run file"""
         file_path = self.get_run_file_path(run_id, module)
         return pd.read_csv(file_path)
+# pylint: enable=too-many-public-methods
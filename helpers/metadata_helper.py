@@ -2,11 +2,19 @@
 from datetime import datetime, date, timedelta
 import json
 import os
+import sqlite3
 
 # Comment these to run the methods from the current file as entry point
 from helpers.enums import DataFrequency, DataModule, JobStatus
 from helpers.file_helper import FileHelper
 from helpers.date_helper import DateHelper
+from helpers.sqlite_helper import SqliteHelper
+
+METADATA_COLUMNS = ('data_frequency INTEGER NOT NULL, data_frequency_name TEXT, '
+                    'module INTEGER NOT NULL, module_name TEXT, '
+                    'last_data_extraction_date TEXT, '
+                    'job_status INTEGER, job_status_name TEXT, failure_reason TEXT, '
+                    'created_date_local TEXT, created_date_utc TEXT')
 
 class JobConfig():
     """Job Config : data_frequency and data_module"""
@@ -51,11 +59,95 @@ class MetadataDto():
 
 
 class MetadataHelper():
-    """metadata helper class"""
+    """metadata helper class
+    Metadata is stored in a sqlite database next to file_path (metadata.db for
+    metadata.json), one row per (data_frequency, module), and every save is also appended
+    to the history table along with its duration. Each save is a single transaction.
+    An existing json metadata file is imported once, and renamed to *.migrated.
+    """
     def __init__(self, file_path = "./settings/metadata.json"):
         self.file_path = file_path
+        self.db_path = f'{os.path.splitext(file_path)[0]}.db'
         self.file_helper = FileHelper()
         self.date_helper = DateHelper()
+        self.sqlite_helper = SqliteHelper(self.db_path, self.create_schema, is_wal=True)
+
+    def create_schema(self, connection: sqlite3.Connection):
+        """create the tables and migrate the json file"""
+        connection.execute(f'CREATE TABLE IF NOT EXISTS metadata ({METADATA_COLUMNS}, '
+                           'PRIMARY KEY (data_frequency, module))')
+        connection.execute('CREATE TABLE IF NOT EXISTS metadata_history ('
+                           f'id INTEGER PRIMARY KEY AUTOINCREMENT, {METADATA_COLUMNS}, '
+                           'duration_in_seconds REAL)')
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_metadata_history_job '
+                           'ON metadata_history (data_frequency, module, id)')
+        connection.execute('CREATE TABLE IF NOT EXISTS watermarks ('
+                           'data_frequency INTEGER NOT NULL, module INTEGER NOT NULL, '
+                           'history_id INTEGER NOT NULL, '
+                           'PRIMARY KEY (data_frequency, module))')
+        self.migrate_json(connection)
+
+    def get_connection(self) -> sqlite3.Connection:
+        """returns the database connection of the current thread,
+        creates the tables and migrates the json file on first connection"""
+        return self.sqlite_helper.get_connection()
+
+    def migrate_json(self, connection: sqlite3.Connection):
+        """import the json metadata file, if any, and rename it so that it is imported once"""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, 'r', encoding='UTF-8') as file_obj:
+            file_data = file_obj.read()
+        for metadata in json.loads(file_data) if file_data != '' else []:
+            self.insert_metadata(connection, metadata)
+        os.replace(self.file_path, f'{self.file_path}.migrated')
+
+    def insert_metadata(self, connection: sqlite3.Connection, metadata: dict,
+                        duration_in_seconds: float = None):
+        """insert or replace the metadata of (data_frequency, module) and append it
+        to the history"""
+        row = {
+            'data_frequency': metadata['data_frequency']['value'],
+            'data_frequency_name': metadata['data_frequency']['name'],
+            'module': metadata['module']['value'],
+            'module_name': metadata['module']['name'],
+            'last_data_extraction_date': metadata['last_data_extraction_date'],
+            'job_status': metadata['job_status']['value'],
+            'job_status_name': metadata['job_status']['name'],
+            'failure_reason': metadata['failure_reason'],
+            'created_date_local': metadata['created_date']['date_local'],
+            'created_date_utc': metadata['created_date']['date_utc']
+        }
+        columns = ', '.join(row)
+        parameters = ', '.join(f':{column}' for column in row)
+        connection.execute(f'INSERT OR REPLACE INTO metadata ({columns}) '
+                           f'VALUES ({parameters})', row)
+        connection.execute(f'INSERT INTO metadata_history ({columns}, duration_in_seconds) '
+                           f'VALUES ({parameters}, :duration_in_seconds)',
+                           {**row, 'duration_in_seconds': duration_in_seconds})
+
+    def row_to_metadata(self, row: sqlite3.Row) -> dict:
+        """metadata dictionary, as created by new_metadata, of a database row"""
+        return {
+            'data_frequency': {
+                "value": row['data_frequency'],
+                "name": row['data_frequency_name']
+            },
+            "module": {
+                "value": row['module'],
+                "name": row['module_name']
+            },
+            'last_data_extraction_date': row['last_data_extraction_date'],
+            "job_status": {
+                "value": row['job_status'],
+                "name": row['job_status_name']
+            },
+            'failure_reason': row['failure_reason'],
+            "created_date": {
+                "date_local": row['created_date_local'],
+                "date_utc": row['created_date_utc']
+            }
+        }
 
     # pylint: disable=too-many-arguments
     def new_metadata(self,
@@ -97,29 +189,19 @@ class MetadataHelper():
 
     def load_all_metadata(self):
         """load all metadata"""
-        metadata = []
-
-        if not os.path.exists(self.file_path):
-            return metadata
-
-        with open(self.file_path, 'r', encoding='UTF-8') as file_obj:
-            metadata = file_obj.read()
-
-        if metadata is None or metadata == "":
-            return []
-
-        metadatas = json.loads(metadata)
-        # sort
-        return self.sort_metadatas(metadatas)
+        rows = self.get_connection().execute(
+            'SELECT * FROM metadata ORDER BY data_frequency_name, module_name').fetchall()
+        return [self.row_to_metadata(row) for row in rows]
 
 
     def load_metadata(self, data_frequency: DataFrequency,
                     module: DataModule,
                     default_date: date = date(2021, 1, 1)) -> MetadataDto:
         """Load metadata"""
-        all_metadata = self.load_all_metadata()
-        metadatas = [m for m in all_metadata if m['module']['value'] ==
-                    module.value and m['data_frequency']['value'] == data_frequency.value]
+        rows = self.get_connection().execute(
+            'SELECT * FROM metadata WHERE data_frequency = ? AND module = ?',
+            (data_frequency.value, module.value)).fetchall()
+        metadatas = [self.row_to_metadata(row) for row in rows]
 
         if len(metadatas) > 0:
             metadata = MetadataDto.from_dict(metadatas[0])
@@ -147,27 +229,60 @@ class MetadataHelper():
         return None
 
 
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
     def save_metadata(self, job_config: JobConfig,
                     last_date_extraction_date: date | datetime,
                     status: JobStatus,
-                    failure_reason=''):
-        """Save metadata"""
-        self.file_helper.create_directory_excluding_filename(self.file_path)
-        all_metadata = self.load_all_metadata()
-        other_metadata = [m for m in all_metadata if not
-                        (m['module'].get('value') == job_config.data_module.value and
-                        m['data_frequency'].get('value') == job_config.data_frequency.value)]
+                    failure_reason='',
+                    duration_in_seconds: float = None):
+        """Save metadata, duration_in_seconds is the time taken by the run, if known"""
         metadata = self.new_metadata(job_config.data_frequency,
                                 job_config.data_module,
                                 last_date_extraction_date,
                                 status,
                                 failure_reason)
-        other_metadata.append(metadata)
-        new_metadatas_json = json.dumps(self.sort_metadatas(other_metadata))
-
-        with open(self.file_path, 'w', encoding='UTF-8') as file_obj:
-            file_obj.write(new_metadatas_json)
-
+        connection = self.get_connection()
+        with self.sqlite_helper.transaction(connection):
+            self.insert_metadata(connection, metadata, duration_in_seconds)
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def load_history(self, data_frequency: DataFrequency, module: DataModule) -> list[dict]:
+        """all the saved metadata of (data_frequency, module), oldest first,
+        with duration_in_seconds"""
+        rows = self.get_connection().execute(
+            'SELECT * FROM metadata_history WHERE data_frequency = ? AND module = ? '
+            'ORDER BY id', (data_frequency.value, module.value)).fetchall()
+        return [{**self.row_to_metadata(row), 'duration_in_seconds': row['duration_in_seconds']}
+                for row in rows]
+
+    def get_changed_dates(self, data_frequency: DataFrequency, module: DataModule,
+                          after_history_id: int = 0) -> tuple[list[date], int]:
+        """dates saved as success after the history id, and the last history id"""
+        rows = self.get_connection().execute(
+            'SELECT last_data_extraction_date, MAX(id) AS history_id FROM metadata_history '
+            'WHERE data_frequency = ? AND module = ? AND job_status = ? AND id > ? '
+            'GROUP BY last_data_extraction_date ORDER BY last_data_extraction_date',
+            (data_frequency.value, module.value, JobStatus.SUCCESS.value,
+             after_history_id)).fetchall()
+        changed_dates = [self.date_helper.convert_yyyy_mm_dd_to_date(
+            row['last_data_extraction_date']) for row in rows]
+        return changed_dates, max((row['history_id'] for row in rows), default=after_history_id)
+
+    def load_watermark(self, data_frequency: DataFrequency, module: DataModule) -> int:
+        """history id of the source data processed by (data_frequency, module), 0 if none"""
+        row = self.get_connection().execute(
+            'SELECT history_id FROM watermarks WHERE data_frequency = ? AND module = ?',
+            (data_frequency.value, module.value)).fetchone()
+        return 0 if row is None else row['history_id']
+
+    def save_watermark(self, data_frequency: DataFrequency, module: DataModule,
+                       history_id: int):
+        """save history id of the source data processed by (data_frequency, module)"""
+        connection = self.get_connection()
+        with self.sqlite_helper.transaction(connection):
+            connection.execute('INSERT OR REPLACE INTO watermarks '
+                               '(data_frequency, module, history_id) VALUES (?, ?, ?)',
+                               (data_frequency.value, module.value, history_id))
 
     def get_start_date(self, last_data_extraction_date: date | datetime,
                        job_status: JobStatus):
@@ -0,0 +1,106 @@
+"""Organization index helper"""
+import os
+import hashlib
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class OrganizationIndexHelper():
+    """Index of the organizations of the SA Community export, keyed by organization id (ID_19).
+    Each entry keeps the columns of the export (name, council, ...) of the first record of
+    the organization. The index is saved as parquet next to the export with the hash of the
+    export, and it is rebuilt only when the hash of the export changes.
+    """
+    id_column = 'ID_19'
+    parquet_compression = 'zstd'
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, export_file_path: str, index_file_path: str = None) -> None:
+        self.export_file_path = export_file_path
+        self.index_file_path = index_file_path or \
+            f'{os.path.splitext(export_file_path)[0]}.index.parquet'
+        self.lock = threading.Lock()
+        self.organizations_df = None
+        self.export_hash = None
+        # (modified time, size) of the export when it was hashed, to skip hashing it again
+        self.export_stat = None
+
+    @classmethod
+    def get_instance(cls, export_file_path: str):
+        """returns the index shared by all the callers of the export file"""
+        key = os.path.abspath(export_file_path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(export_file_path)
+            return cls._instances[key]
+
+    def get_export_stat(self) -> tuple[int, int]:
+        """modified time and size of the export"""
+        stat = os.stat(self.export_file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_export_hash(self) -> str:
+        """sha256 of the export file"""
+        file_hash = hashlib.sha256()
+        with open(self.export_file_path, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def build(self, export_hash: str) -> pd.DataFrame:
+        """build the index from the export and save it with the hash of the export"""
+        export_df = pd.read_csv(self.export_file_path)
+        export_df = export_df[export_df[self.id_column].notna()]
+        organizations_df = export_df.drop_duplicates(self.id_column, keep='first') \
+            .astype({self.id_column: 'int64'}).set_index(self.id_column)
+
+        table = pa.Table.from_pandas(organizations_df)
+        table = table.replace_schema_metadata({**table.schema.metadata,
+                                               b'export_hash': export_hash.encode('UTF-8')})
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_file_path)), exist_ok=True)
+        temp_index_file_path = \
+            f'{self.index_file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        pq.write_table(table, temp_index_file_path, compression=self.parquet_compression)
+        os.replace(temp_index_file_path, self.index_file_path)
+        return organizations_df
+
+    def read_index(self, export_hash: str) -> pd.DataFrame | None:
+        """saved index, None if it is missing or was built from another export"""
+        try:
+            metadata = pq.read_schema(self.index_file_path).metadata or {}
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        if metadata.get(b'export_hash') != export_hash.encode('UTF-8'):
+            return None
+        return pq.read_table(self.index_file_path).to_pandas()
+
+    def load(self) -> pd.DataFrame:
+        """organizations indexed by organization id, rebuilt if the export has changed"""
+        with self.lock:
+            export_stat = self.get_export_stat()
+            if self.organizations_df is not None and export_stat == self.export_stat:
+                return self.organizations_df
+
+            export_hash = self.get_export_hash()
+            if self.organizations_df is None or export_hash != self.export_hash:
+                organizations_df = self.read_index(export_hash)
+                if organizations_df is None:
+                    organizations_df = self.build(export_hash)
+                self.organizations_df = organizations_df
+                self.export_hash = export_hash
+            self.export_stat = export_stat
+            return self.organizations_df
+
+    def get_organization(self, organization_id: int) -> dict | None:
+        """columns of the organization, None if it is not in the export"""
+        organizations_df = self.load()
+        if organization_id not in organizations_df.index:
+            return None
+        return organizations_df.loc[organization_id].to_dict()
+
+    def get_organizations(self, organization_ids) -> pd.DataFrame:
+        """columns of the organizations in the order of the ids, missing ones are empty"""
+        return self.load().reindex(organization_ids)
@@ -0,0 +1,155 @@
+"""Page readiness helper"""
+import bisect
+import logging
+import threading
+import time
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException as SeleniumTimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# pylint: disable=too-few-public-methods
+class TextNotExcluded():
+    """WebDriverWait predicate: text of the first visible element of the xpath,
+    once it is not one of the texts to exclude"""
+    def __init__(self, xpath: str, to_exclude: list) -> None:
+        self.xpath = xpath
+        self.to_exclude = to_exclude
+        # text seen in the last poll, returned by callers when the wait times out
+        self.last_text = ''
+
+    def __call__(self, driver):
+        elements = [e for e in driver.find_elements(By.XPATH, self.xpath) if e.is_displayed()]
+        if len(elements) == 0:
+            return False
+        self.last_text = elements[0].text
+        if self.last_text in self.to_exclude:
+            return False
+        return self.last_text
+
+
+class TextStable():
+    """WebDriverWait predicate: text of the text predicate, once it has not changed
+    for stable_for_seconds"""
+    def __init__(self, text_condition: TextNotExcluded, stable_for_seconds: float) -> None:
+        self.text_condition = text_condition
+        self.stable_for_seconds = stable_for_seconds
+        self.text = None
+        self.changed_at = None
+
+    @property
+    def last_text(self) -> str:
+        """text seen in the last poll"""
+        return self.text_condition.last_text
+
+    def __call__(self, driver):
+        text = self.text_condition(driver)
+        now = time.monotonic()
+        if text is False:
+            self.text = None
+            return False
+        if text != self.text:
+            self.text = text
+            self.changed_at = now
+        if now - self.changed_at < self.stable_for_seconds:
+            return False
+        return text
+# pylint: enable=too-few-public-methods
+
+
+class LatencyHistogram():
+    """Histogram of latencies in seconds by outcome, in buckets of upper bounds"""
+    bucket_upper_bounds = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600]
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # outcome -> count of each bucket, last bucket is above the last upper bound
+        self.counts = {}
+        self.sums = {}
+
+    @classmethod
+    def get_instance(cls, name: str):
+        """returns the histogram shared by all the callers of the name"""
+        with cls._instances_lock:
+            if name not in cls._instances:
+                cls._instances[name] = cls()
+            return cls._instances[name]
+
+    def record(self, seconds: float, outcome: str = 'ready'):
+        """count the latency in its bucket"""
+        bucket = bisect.bisect_left(self.bucket_upper_bounds, seconds)
+        with self.lock:
+            counts = self.counts.setdefault(outcome, [0] * (len(self.bucket_upper_bounds) + 1))
+            counts[bucket] += 1
+            self.sums[outcome] = self.sums.get(outcome, 0) + seconds
+
+    def get_percentile(self, counts: list[int], percentile: float) -> float:
+        """upper bound of the bucket of the percentile, infinite above the last bound"""
+        rank = percentile / 100 * sum(counts)
+        total = 0
+        for bucket, count in enumerate(counts):
+            total += count
+            if total >= rank and count > 0:
+                return self.bucket_upper_bounds[bucket] \
+                    if bucket < len(self.bucket_upper_bounds) else float('inf')
+        return 0
+
+    def get_statistics(self) -> dict:
+        """count, mean, p50, p90, p99 and bucket counts of each outcome"""
+        with self.lock:
+            counts = {outcome: list(c) for outcome, c in self.counts.items()}
+            sums = dict(self.sums)
+        statistics = {}
+        for outcome, outcome_counts in counts.items():
+            count = sum(outcome_counts)
+            statistics[outcome] = {
+                'count': count,
+                'mean': sums[outcome] / count,
+                'p50': self.get_percentile(outcome_counts, 50),
+                'p90': self.get_percentile(outcome_counts, 90),
+                'p99': self.get_percentile(outcome_counts, 99),
+                'buckets': dict(zip(self.bucket_upper_bounds + [float('inf')], outcome_counts))
+            }
+        return statistics
+
+    def log_report(self, log: logging.Logger):
+        """log statistics of each outcome"""
+        for outcome, statistics in self.get_statistics().items():
+            log.info('%s: count %s, mean %.2f, p50 <= %s, p90 <= %s, p99 <= %s seconds',
+                     outcome, statistics['count'], statistics['mean'], statistics['p50'],
+                     statistics['p90'], statistics['p99'])
+
+
+# pylint: disable=too-few-public-methods
+class PageReadinessHelper():
+    """Waits until the text of an element is ready: visible, not one of the texts to exclude
+    and not changed for stable_for_seconds. Text is polled every poll_interval_in_seconds,
+    and the latency of each wait is recorded in the histogram"""
+    def __init__(self, histogram: LatencyHistogram,
+                 poll_interval_in_seconds: float = 0.1) -> None:
+        self.histogram = histogram
+        self.poll_interval_in_seconds = poll_interval_in_seconds
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def wait_for_text(self, driver, xpath: str, to_exclude: list, timeout_in_seconds: float,
+                      stable_for_seconds: float = 0, started_at: float = None) -> tuple[str, bool]:
+        """(text, is_ready), the last text seen if it is not ready within the timeout.
+        started_at is the time.monotonic() of the request, latency is counted from it"""
+        started_at = started_at if started_at is not None else time.monotonic()
+        condition = TextStable(TextNotExcluded(xpath, to_exclude), stable_for_seconds)
+        wait = WebDriverWait(driver, max(0, timeout_in_seconds),
+                             poll_frequency=self.poll_interval_in_seconds,
+                             ignored_exceptions=[StaleElementReferenceException])
+        try:
+            text = wait.until(condition)
+            outcome = 'ready'
+        except SeleniumTimeoutException:
+            text = condition.last_text
+            outcome = 'timeout'
+        self.histogram.record(time.monotonic() - started_at, outcome)
+        return text, outcome == 'ready'
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+# pylint: enable=too-few-public-methods
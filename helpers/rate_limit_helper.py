@@ -0,0 +1,148 @@
+"""Rate limit helper"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # not available on windows, the state file is then used by one process at a time
+    fcntl = None
+
+
+class TokenBucket():
+    """Bucket of capacity tokens, refilled at capacity per period_in_seconds"""
+
+    def __init__(self, capacity: float, period_in_seconds: float) -> None:
+        self.capacity = capacity
+        self.period_in_seconds = period_in_seconds
+        self.tokens = capacity
+        self.updated_at = time.time()
+
+    def refill(self, now: float):
+        """add the tokens refilled since last update"""
+        refill_rate = self.capacity / self.period_in_seconds
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * refill_rate)
+        self.updated_at = now
+
+    def get_wait_time(self, tokens: float = 1) -> float:
+        """seconds until the tokens are available"""
+        if self.tokens >= tokens:
+            return 0
+        return (tokens - self.tokens) * self.period_in_seconds / self.capacity
+
+    def to_dict(self):
+        """returns dictionary representation of the bucket state"""
+        return {'tokens': self.tokens, 'updated_at': self.updated_at}
+
+    def load_dict(self, dict_obj):
+        """loads bucket state from dictionary"""
+        self.tokens = min(self.capacity, dict_obj.get('tokens', self.capacity))
+        self.updated_at = dict_obj.get('updated_at', self.updated_at)
+
+
+class RateLimitHelper():
+    """Token bucket rate limiter for several budgets at once,
+    e.g. requests per second, per 100 seconds and per day.
+    One limiter is shared by all the callers in the process. If a state file is given,
+    bucket states are kept in it under a file lock, so processes share the budgets.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, limits: dict, state_file_path: str = None) -> None:
+        """limits: name of the budget -> (capacity, period in seconds)"""
+        self.buckets = {name: TokenBucket(capacity, period)
+                        for name, (capacity, period) in limits.items()}
+        self.state_file_path = state_file_path
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, limits: dict, state_file_path: str = None):
+        """returns the limiter shared by all the callers with the same limits and state file"""
+        key = (tuple(sorted(limits.items())),
+               os.path.abspath(state_file_path) if state_file_path else None)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(limits, state_file_path)
+            return cls._instances[key]
+
+    @contextmanager
+    def shared_state(self):
+        """lock the state of the buckets, loading and saving the state file if any"""
+        with self.lock:
+            if self.state_file_path is None:
+                yield
+                return
+
+            directory = os.path.dirname(self.state_file_path)
+            if directory != '':
+                os.makedirs(directory, exist_ok=True)
+            with open(f'{self.state_file_path}.lock', 'w', encoding='UTF-8') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.load_state()
+                    yield
+                    self.save_state()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load_state(self):
+        """load bucket states from the state file"""
+        if not os.path.exists(self.state_file_path):
+            return
+        with open(self.state_file_path, 'r', encoding='UTF-8') as file_obj:
+            file_data = file_obj.read()
+        if file_data == '':
+            return
+        state = json.loads(file_data)
+        for name, bucket in self.buckets.items():
+            if name in state:
+                bucket.load_dict(state[name])
+
+    def save_state(self):
+        """save bucket states to the state file"""
+        state = {name: bucket.to_dict() for name, bucket in self.buckets.items()}
+        temp_file_path = f'{self.state_file_path}.{os.getpid()}.tmp'
+        with open(temp_file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump(state, file_obj)
+        os.replace(temp_file_path, self.state_file_path)
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """consume tokens from all the buckets if all of them have enough tokens.
+        Returns 0 if the tokens are consumed, else the seconds to wait before next try"""
+        with self.shared_state():
+            now = time.time()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            wait_time = max(bucket.get_wait_time(tokens) for bucket in self.buckets.values())
+            if wait_time == 0:
+                for bucket in self.buckets.values():
+                    bucket.tokens -= tokens
+            return wait_time
+
+    def acquire(self, tokens: float = 1):
+        """wait until tokens are available in all the buckets and consume them"""
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time == 0:
+                return
+            time.sleep(wait_time)
+
+    def drain(self, name: str):
+        """empty a bucket, e.g. when the server reports that its limit is exceeded"""
+        with self.shared_state():
+            self.buckets[name].refill(time.time())
+            self.buckets[name].tokens = 0
+
+    def get_remaining_tokens(self) -> dict:
+        """tokens available in each bucket"""
+        with self.shared_state():
+            now = time.time()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            return {name: bucket.tokens for name, bucket in self.buckets.items()}
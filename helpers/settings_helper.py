@@ -1,24 +1,88 @@
 """Settings helper to retrieve settings data from json file"""
+import os
 import json
+import time
+import threading
+from dtos.settings_snapshot_dto import SettingsSnapshotDto
 from helpers.string_helper import StringHelper
 
 
+# pylint: disable=too-many-public-methods
 class SettingsHelper():
-    """helper class for app_settings.json"""
+    """helper class for app_settings.json
+    Settings are loaded once per process into a snapshot shared by all the helpers of
+    the file. The snapshot is reloaded when the modified time or size of the file, or
+    the environment overrides, change. They are checked at most once per
+    reload_check_interval_in_seconds, so getters in hot paths don't do file I/O.
+
+    Environment variables APP_SETTINGS__<Module>__<Key> override the settings, e.g.
+    APP_SETTINGS__Jobs__MaximumWorkers=4. Values are parsed as json, else kept as text.
+    """
+    env_prefix = 'APP_SETTINGS__'
+    reload_check_interval_in_seconds = 1
+    _snapshots = {}
+    _snapshots_lock = threading.Lock()
+
     def __init__(self, file_path = './settings/app_settings.json') -> None:
         self.file_path = file_path
         self.str_helper = StringHelper()
 
-    def get_settings(self):
-        """Get all settings from settings json"""
+    def get_env_overrides(self) -> dict:
+        """settings overridden by environment variables, (module, key, ...) -> value"""
+        overrides = {}
+        for name, value in os.environ.items():
+            if not name.startswith(self.env_prefix):
+                continue
+            keys = tuple(name[len(self.env_prefix):].split('__'))
+            try:
+                overrides[keys] = json.loads(value)
+            except json.JSONDecodeError:
+                overrides[keys] = value
+        return overrides
+
+    def load_settings(self, overrides: dict):
+        """load settings from file and apply the overrides"""
         file_data = ''
         with open(self.file_path, 'r', encoding="UTF-8") as file_obj:
             file_data = file_obj.read()
 
-        if file_data is None or file_data == '':
-            return None
+        settings = None
+        if file_data is not None and file_data != '':
+            settings = json.loads(file_data)
+
+        for keys, value in sorted(overrides.items()):
+            settings = settings or {}
+            parent = settings
+            for key in keys[:-1]:
+                if not isinstance(parent.get(key), dict):
+                    parent[key] = {}
+                parent = parent[key]
+            parent[keys[-1]] = value
+        return settings
+
+    def get_snapshot(self) -> SettingsSnapshotDto:
+        """settings snapshot of the file, reloaded if the file or the overrides changed"""
+        key = os.path.abspath(self.file_path)
+        now = time.monotonic()
+        with self._snapshots_lock:
+            entry = self._snapshots.get(key)
+            if entry is not None and \
+                now - entry['checked_at'] < self.reload_check_interval_in_seconds:
+                return entry['snapshot']
+
+            stat = os.stat(self.file_path)
+            overrides = self.get_env_overrides()
+            version = (stat.st_mtime_ns, stat.st_size, sorted(overrides.items()))
+            if entry is None or entry['version'] != version:
+                entry = {'version': version,
+                         'snapshot': SettingsSnapshotDto(self.load_settings(overrides))}
+                self._snapshots[key] = entry
+            entry['checked_at'] = now
+            return entry['snapshot']
 
-        return json.loads(file_data)
+    def get_settings(self):
+        """Get all settings from settings json"""
+        return self.get_snapshot().settings
 
     def get_settings_for_a_module(self, module):
         """Get settings related to particular module"""
@@ -54,6 +118,10 @@ class SettingsHelper():
         """Get RootDir"""
         return self.get_value_by_key('FileStorage', 'RootDir')
 
+    def get_file_storage_format(self) -> str:
+        """Get format of the data files: CSV or PARQUET, defaults to CSV"""
+        return self.get_snapshot().file_storage_format
+
     def get_web_scraping_maximum_concurrent_requests(self):
         """Get value for MaximumConcurrentRequests"""
         return self.get_value_by_key('WebScraping', 'MaximumConcurrentRequests')
@@ -62,6 +130,47 @@ class SettingsHelper():
         """Get value for DefaultTimeoutInSeconds"""
         return self.get_value_by_key("WebScraping", "DefaultTimeoutInSeconds")
 
+    def get_web_scraping_maximum_pages_per_driver(self) -> int:
+        """Get number of pages a browser loads before it is restarted, defaults to 50"""
+        return self.get_snapshot().web_scraping_maximum_pages_per_driver
+
+    def get_jobs_maximum_workers(self) -> int:
+        """Get number of days a job extracts in parallel, defaults to 1 (serial)"""
+        return self.get_snapshot().jobs_maximum_workers
+
+    def get_jobs_maximum_concurrent_jobs(self) -> int:
+        """Get number of jobs (data modules) run at the same time, defaults to 1 (serial)"""
+        return self.get_snapshot().jobs_maximum_concurrent_jobs
+
+    def get_jobs_stream_to_file(self) -> bool:
+        """Get whether jobs write data to file page by page, defaults to False"""
+        return self.get_snapshot().jobs_stream_to_file
+
+    def get_jobs_fetch_period(self) -> str:
+        """Get period of days fetched in one query by jobs: DAILY, WEEKLY or MONTHLY"""
+        return self.get_snapshot().jobs_fetch_period
+
+    def get_response_cache_settings(self) -> dict:
+        """Get settings of google analytics response cache, None if the cache is disabled"""
+        return self.get_snapshot().response_cache
+
+    def get_rate_limit_settings(self) -> dict:
+        """Get settings of google analytics rate limit, None if the rate limit is disabled"""
+        return self.get_snapshot().rate_limit
+
+    def get_council_cache_settings(self) -> dict:
+        """Get settings of address to council cache, None if the cache is disabled"""
+        return self.get_snapshot().council_cache
+
+    def get_council_lookup_settings(self) -> dict:
+        """Get settings of the backend looking up the council of an address"""
+        return self.get_snapshot().council_lookup
+
+    def get_work_queue_settings(self) -> dict:
+        """Get settings of the work queue shared by the workers"""
+        return self.get_snapshot().work_queue
+
     def get_sacommunity_url(self) -> str:
         """get sacommunity url from settings"""
-        return self.get_settings_for_a_module('SACommunityUrl')
+        return self.get_snapshot().sacommunity_url
+# pylint: enable=too-many-public-methods
@@ -0,0 +1,53 @@
+"""Sqlite helper"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SqliteHelper():
+    """Connections and write transactions of a sqlite database shared by threads and
+    processes. Each thread has its own connection, as sqlite connections can't be shared
+    between threads, and create_schema(connection) is run in a transaction on the first
+    connection of each thread. is_wal turns on write ahead logging, which doesn't work
+    on network filesystems
+    """
+    def __init__(self, db_path: str, create_schema=None, is_wal: bool = False) -> None:
+        self.db_path = db_path
+        self.create_schema = create_schema
+        self.is_wal = is_wal
+        self.local = threading.local()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """returns the database connection of the current thread, creates the database
+        directory and schema on first connection"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            return connection
+
+        directory = os.path.dirname(self.db_path)
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+        # transactions are handled explicitly, timeout waits for the lock of other writers
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        if self.is_wal:
+            connection.execute('PRAGMA journal_mode=WAL')
+        if self.create_schema is not None:
+            with self.transaction(connection):
+                self.create_schema(connection)
+        self.local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self, connection: sqlite3.Connection = None):
+        """write transaction, committed if the block succeeds else rolled back.
+        It locks the database, so the block runs in one writer at a time"""
+        connection = connection or self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
@@ -1,4 +1,14 @@
 """Helper methods for string"""
+import re
+
+# street types and words written in short in addresses
+ADDRESS_ABBREVIATIONS = {
+    'st': 'street', 'rd': 'road', 'ave': 'avenue', 'av': 'avenue', 'tce': 'terrace',
+    'dr': 'drive', 'pde': 'parade', 'hwy': 'highway', 'cres': 'crescent', 'ct': 'court',
+    'pl': 'place', 'ln': 'lane', 'bvd': 'boulevard', 'blvd': 'boulevard', 'cct': 'circuit',
+    'cl': 'close', 'gr': 'grove', 'sq': 'square', 'mt': 'mount', 'nth': 'north',
+    'sth': 'south', 'stn': 'station'
+}
 
 # pylint: disable=too-few-public-methods
 class StringHelper():
@@ -8,4 +18,10 @@ class StringHelper():
         """Check if the input string is null or whitespace"""
         return not input_str or input_str.isspace()
 
+    def normalize_address(self, address: str) -> str:
+        """address in lower case, with words separated by a space, without punctuation
+        other than ' - and /, and abbreviations written in full"""
+        words = re.sub(r"[^\w'/-]+", ' ', address.lower()).split()
+        return ' '.join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
 # pylint: enable=too-few-public-methods
@@ -0,0 +1,140 @@
+"""Web driver pool helper"""
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from selenium.common.exceptions import TimeoutException as SeleniumTimeoutException
+from selenium.common.exceptions import WebDriverException
+
+
+# pylint: disable=too-many-instance-attributes
+class WebDriverPoolHelper():
+    """Pool of warm web drivers, so that a browser is not started for every page.
+    At most maximum_drivers drivers are open, callers wait for a free driver.
+    Cookies and storage are cleared when a driver is returned, and a driver is quit
+    after maximum_pages_per_driver uses or when it fails with anything else than a timeout.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, driver_factory, maximum_drivers: int,
+                 maximum_pages_per_driver: int = 50) -> None:
+        self.log = logging.getLogger(__name__)
+        # creates a new driver, called without arguments
+        self.driver_factory = driver_factory
+        self.maximum_drivers = max(1, maximum_drivers)
+        self.maximum_pages_per_driver = maximum_pages_per_driver
+        self.condition = threading.Condition()
+        # idle drivers as [driver, pages], last returned is handed out first
+        self.idle_drivers = []
+        self.driver_count = 0
+        self.created_count = 0
+        self.is_closed = False
+
+    @classmethod
+    def get_instance(cls, key, driver_factory, maximum_drivers: int,
+                     maximum_pages_per_driver: int = 50):
+        """returns the pool shared by all the callers of the key, closed at exit"""
+        with cls._instances_lock:
+            if key not in cls._instances or cls._instances[key].is_closed:
+                cls._instances[key] = cls(driver_factory, maximum_drivers,
+                                          maximum_pages_per_driver)
+                atexit.register(cls._instances[key].close)
+            return cls._instances[key]
+
+    def acquire(self) -> list:
+        """[driver, pages] of an idle driver or a new one, waits if all the drivers are used"""
+        with self.condition:
+            while True:
+                if self.is_closed:
+                    raise RuntimeError('Web driver pool is closed')
+                if len(self.idle_drivers) > 0:
+                    return self.idle_drivers.pop()
+                if self.driver_count < self.maximum_drivers:
+                    self.driver_count += 1
+                    break
+                self.condition.wait()
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            self.remove_driver()
+            raise
+        with self.condition:
+            self.created_count += 1
+        return [driver, 0]
+
+    def release(self, pooled_driver: list, is_broken: bool = False):
+        """return the driver to the pool after clearing its state,
+        or quit it if it is broken, used for maximum pages or the pool is closed"""
+        driver = pooled_driver[0]
+        pooled_driver[1] += 1
+        if not is_broken and not self.is_closed \
+            and pooled_driver[1] < self.maximum_pages_per_driver:
+            is_broken = not self.clear_driver(driver)
+        if is_broken or self.is_closed or pooled_driver[1] >= self.maximum_pages_per_driver:
+            self.quit_driver(driver)
+            self.remove_driver()
+            return
+
+        with self.condition:
+            self.idle_drivers.append(pooled_driver)
+            self.condition.notify()
+
+    def remove_driver(self):
+        """free the place of a driver which is quit"""
+        with self.condition:
+            self.driver_count -= 1
+            self.condition.notify()
+
+    def clear_driver(self, driver) -> bool:
+        """clear cookies and storage of the driver, False if the driver fails"""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+            driver.get('about:blank')
+            return True
+        except WebDriverException:
+            self.log.warning('Web driver failed to clear its state, so quit it', exc_info=True)
+            return False
+
+    def quit_driver(self, driver):
+        """quit the driver, errors are logged, as the browser may have crashed"""
+        try:
+            driver.quit()
+        except WebDriverException:
+            self.log.warning('Web driver failed to quit', exc_info=True)
+
+    @contextmanager
+    def driver(self):
+        """context manager handing out a driver of the pool"""
+        pooled_driver = self.acquire()
+        is_broken = False
+        try:
+            yield pooled_driver[0]
+        except SeleniumTimeoutException:
+            raise
+        except Exception:
+            is_broken = True
+            raise
+        finally:
+            self.release(pooled_driver, is_broken)
+
+    def close(self):
+        """quit the idle drivers, drivers in use are quit when they are returned"""
+        with self.condition:
+            self.is_closed = True
+            idle_drivers = self.idle_drivers
+            self.idle_drivers = []
+            self.condition.notify_all()
+        for driver, _ in idle_drivers:
+            self.quit_driver(driver)
+            self.remove_driver()
+
+    def get_statistics(self) -> dict:
+        """open, idle and created drivers"""
+        with self.condition:
+            return {'open': self.driver_count,
+                    'idle': len(self.idle_drivers),
+                    'created': self.created_count}
+# pylint: enable=too-many-instance-attributes
@@ -0,0 +1,176 @@
+"""Work queue helper"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from dtos.work_unit_dto import WorkUnitDto
+from helpers.enums import DataFrequency, DataModule, WorkUnitStatus
+from helpers.sqlite_helper import SqliteHelper
+
+
+class WorkQueueHelper():
+    """Durable queue of work units, (data_frequency, module, date range), in a sqlite
+    database, shared by worker threads, processes, or hosts if the database is on a
+    shared filesystem with working file locks.
+    A worker claims a unit with a lease, renews the lease by heartbeats while it works,
+    and completes or fails the unit. Units whose lease expired are claimed again by other
+    workers, and failed units are retried till maximum_attempts.
+    """
+    def __init__(self, db_path: str = './settings/work_queue.db',
+                 lease_in_seconds: float = 300,
+                 maximum_attempts: int = 3) -> None:
+        self.db_path = db_path
+        self.lease_in_seconds = lease_in_seconds
+        self.maximum_attempts = maximum_attempts
+        self.sqlite_helper = SqliteHelper(db_path, self.create_schema)
+
+    def create_schema(self, connection: sqlite3.Connection):
+        """create the table of the work units"""
+        connection.execute('CREATE TABLE IF NOT EXISTS work_units ('
+                           'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                           'data_frequency INTEGER NOT NULL, module INTEGER NOT NULL, '
+                           'start_date TEXT NOT NULL, end_date TEXT NOT NULL, '
+                           'status INTEGER NOT NULL, worker_id TEXT, '
+                           'lease_expires_at REAL, attempts INTEGER NOT NULL DEFAULT 0, '
+                           'failure_reason TEXT, updated_at REAL, '
+                           'UNIQUE (data_frequency, module, start_date, end_date))')
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_work_units_status '
+                           'ON work_units (status, start_date)')
+
+    def get_connection(self) -> sqlite3.Connection:
+        """returns the database connection of the current thread"""
+        return self.sqlite_helper.get_connection()
+
+    def transaction(self):
+        """write transaction of the queue database, committed if the block succeeds
+        else rolled back. It locks the database, so the block runs in one worker at a time"""
+        return self.sqlite_helper.transaction()
+
+    def row_to_work_unit(self, row: sqlite3.Row) -> WorkUnitDto:
+        """work unit of a database row"""
+        return WorkUnitDto(row['id'],
+                           row['data_frequency'],
+                           row['module'],
+                           date.fromisoformat(row['start_date']),
+                           date.fromisoformat(row['end_date']),
+                           WorkUnitStatus(row['status']),
+                           row['worker_id'],
+                           row['lease_expires_at'],
+                           row['attempts'],
+                           row['failure_reason'])
+
+    def enqueue(self, data_frequency: DataFrequency, module: DataModule,
+                date_ranges: list) -> int:
+        """add the date ranges as pending units. Ranges already in the queue are skipped,
+        except failed ones which are pending again. Returns the number of units added"""
+        with self.transaction() as connection:
+            added = 0
+            for date_range in date_ranges:
+                cursor = connection.execute(
+                    'INSERT INTO work_units '
+                    '(data_frequency, module, start_date, end_date, status, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (data_frequency, module, start_date, end_date) DO UPDATE '
+                    'SET status = excluded.status, attempts = 0, '
+                    'updated_at = excluded.updated_at WHERE status = ?',
+                    (data_frequency.value, module.value, date_range.start_date.isoformat(),
+                     date_range.end_date.isoformat(), WorkUnitStatus.PENDING.value,
+                     time.time(), WorkUnitStatus.FAILED.value))
+                added += cursor.rowcount
+            return added
+
+    def claim(self, worker_id: str, data_frequency: DataFrequency = None,
+              module: DataModule = None) -> WorkUnitDto | None:
+        """claim the oldest pending unit, or a claimed unit whose lease expired,
+        optionally of the data_frequency and module. None if there is no unit to claim"""
+        now = time.time()
+        query = ('SELECT * FROM work_units WHERE (status = ? OR (status = ? AND '
+                 'lease_expires_at < ?))')
+        parameters = [WorkUnitStatus.PENDING.value, WorkUnitStatus.CLAIMED.value, now]
+        if data_frequency is not None:
+            query += ' AND data_frequency = ?'
+            parameters.append(data_frequency.value)
+        if module is not None:
+            query += ' AND module = ?'
+            parameters.append(module.value)
+        query += ' ORDER BY start_date, id LIMIT 1'
+
+        with self.transaction() as connection:
+            row = connection.execute(query, parameters).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE work_units SET status = ?, worker_id = ?, '
+                               'lease_expires_at = ?, attempts = attempts + 1, updated_at = ? '
+                               'WHERE id = ?',
+                               (WorkUnitStatus.CLAIMED.value, worker_id,
+                                now + self.lease_in_seconds, now, row['id']))
+            return self.row_to_work_unit(
+                connection.execute('SELECT * FROM work_units WHERE id = ?',
+                                   (row['id'],)).fetchone())
+
+    def update_claimed(self, work_unit: WorkUnitDto, worker_id: str,
+                       assignments: str, parameters: tuple) -> bool:
+        """update the unit if it is still claimed by the worker, returns False if the lease
+        is lost, i.e. it expired and the unit is claimed by another worker or completed"""
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                f'UPDATE work_units SET {assignments}, updated_at = ? '
+                'WHERE id = ? AND worker_id = ? AND status = ?',
+                (*parameters, time.time(), work_unit.unit_id, worker_id,
+                 WorkUnitStatus.CLAIMED.value))
+            return cursor.rowcount == 1
+
+    def heartbeat(self, work_unit: WorkUnitDto, worker_id: str) -> bool:
+        """renew the lease of the unit, returns False if the lease is lost"""
+        return self.update_claimed(work_unit, worker_id, 'lease_expires_at = ?',
+                                   (time.time() + self.lease_in_seconds,))
+
+    def complete(self, work_unit: WorkUnitDto, worker_id: str) -> bool:
+        """mark the unit done, returns False if the lease is lost"""
+        return self.update_claimed(work_unit, worker_id,
+                                   'status = ?, lease_expires_at = NULL',
+                                   (WorkUnitStatus.DONE.value,))
+
+    def fail(self, work_unit: WorkUnitDto, worker_id: str, failure_reason: str) -> bool:
+        """release the unit to be retried, or mark it failed after maximum_attempts.
+        Returns False if the lease is lost"""
+        status = WorkUnitStatus.FAILED if work_unit.attempts >= self.maximum_attempts \
+            else WorkUnitStatus.PENDING
+        return self.update_claimed(work_unit, worker_id,
+                                   'status = ?, lease_expires_at = NULL, failure_reason = ?',
+                                   (status.value, failure_reason))
+
+    def get_units(self, data_frequency: DataFrequency, module: DataModule,
+                  start_date: date = None) -> list[WorkUnitDto]:
+        """units of data_frequency and module from start date, in date order"""
+        rows = self.get_connection().execute(
+            'SELECT * FROM work_units WHERE data_frequency = ? AND module = ? '
+            'AND end_date >= ? ORDER BY start_date, id',
+            (data_frequency.value, module.value,
+             (start_date or date.min).isoformat())).fetchall()
+        return [self.row_to_work_unit(row) for row in rows]
+
+    @contextmanager
+    def heartbeats(self, work_unit: WorkUnitDto, worker_id: str):
+        """renew the lease of the unit in a background thread while the block runs"""
+        stopped = threading.Event()
+
+        def renew():
+            while not stopped.wait(self.lease_in_seconds / 3):
+                if not self.heartbeat(work_unit, worker_id):
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def get_counts(self) -> dict:
+        """number of units by status name"""
+        rows = self.get_connection().execute(
+            'SELECT status, COUNT(*) AS count FROM work_units GROUP BY status').fetchall()
+        return {WorkUnitStatus(row['status']).name: row['count'] for row in rows}
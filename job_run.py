@@ -1,6 +1,7 @@
 """Main Entry point for job run"""
 
 from datetime import datetime
+import functools
 from logging.handlers import TimedRotatingFileHandler
 import sys
 import os
@@ -8,16 +9,15 @@ import logging
 # insert current path to system path, so that we can import python file
 sys.path.insert(1, os.getcwd())
 # pylint: disable=wrong-import-position
+from helpers.enums import DataFrequency, DataModule, JobStatus
 from helpers.file_helper import FileHelper
+from helpers.metadata_helper import JobConfig
 from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+from jobs.google_analytics_job_planner import GoogleAnalyticsJobPlanner
+from jobs.job_scheduler import JobScheduler
 # pylint: enable=wrong-import-position
 
 
-def time_elapsed_seconds(start_date: datetime, end_date: datetime):
-    """reurns time elapsed in seconds"""
-    return (end_date - start_date).total_seconds()
-
-
 def setup_logging():
     """setup logging"""
     file_helper = FileHelper()
@@ -39,32 +39,48 @@ def main():
     job_start_date = datetime.now()
     # end_date = date(2022, 5, 1)
     end_date = datetime.now().date()
-    logger.info("Job Started at %s", datetime.now())
+    logger.info("Job Started at %s", job_start_date)
     logger.info("Running google analytics jobs till end date: %s", end_date)
 
-    job_start_date = datetime.now()
-    logger.info("Started running job AGE Daily %s", job_start_date)
-    google_analytics_jobs.age_daily(end_date)
-    job_end_date = datetime.now()
-    logger.info("Completed running job AGE Daily %s . Time Elapsed %s",
-                job_end_date,
-                time_elapsed_seconds(job_start_date, job_end_date))
+    # spread the pending days of the jobs over the remaining daily quota
+    planner = GoogleAnalyticsJobPlanner(google_analytics_jobs)
+    job_plans = planner.plan([JobConfig(DataFrequency.DAILY, DataModule.AGE),
+                              JobConfig(DataFrequency.DAILY, DataModule.GENDER),
+                              JobConfig(DataFrequency.DAILY, DataModule.LANDING_PAGE)],
+                             end_date)
 
-    job_start_date = datetime.now()
-    logger.info("Started running job GENDER Daily %s", job_start_date)
-    google_analytics_jobs.gender_daily(end_date)
-    job_end_date = datetime.now()
-    logger.info("Completed running job GENDER Daily %s . Time Elapsed %s",
-                job_end_date,
-                time_elapsed_seconds(job_start_date, job_end_date))
+    # modules are independent, so they run at the same time and share the workers
+    # sized to the rate limit
+    maximum_concurrent_jobs = google_analytics_jobs.settings_helper \
+        .get_jobs_maximum_concurrent_jobs()
+    maximum_workers = max(1, planner.get_maximum_workers() // maximum_concurrent_jobs)
+    scheduler = JobScheduler(maximum_concurrent_jobs)
+    for job_plan in job_plans:
+        job_config = job_plan.job_config
+        job_name = f'{job_config.data_module.name} {job_config.data_frequency.name}'
+        # a job with more days to backfill starts after the jobs which are up to date
+        scheduler.register(job_name,
+                           functools.partial(google_analytics_jobs.run_job,
+                                             job_config.data_frequency,
+                                             job_config.data_module,
+                                             job_plan.end_date,
+                                             maximum_workers),
+                           priority=job_plan.planned_days)
+        # rollups read the daily files, so they run once the daily job is completed
+        for data_frequency in [DataFrequency.WEEKLY, DataFrequency.MONTHLY,
+                               DataFrequency.YEARLY]:
+            scheduler.register(f'{job_config.data_module.name} {data_frequency.name}',
+                               functools.partial(google_analytics_jobs.rollup_job,
+                                                 data_frequency,
+                                                 job_config.data_module),
+                               depends_on=[job_name])
+    job_runs = scheduler.run()
 
-    job_start_date = datetime.now()
-    logger.info("Started running job Landing Page Daily %s", job_start_date)
-    google_analytics_jobs.landing_page_daily(end_date)
     job_end_date = datetime.now()
-    logger.info("Completed running job Landing Page %s . Time Elapsed %s",
-                job_end_date,
-                time_elapsed_seconds(job_start_date, job_end_date))
+    scheduler.log_report(job_runs, (job_end_date - job_start_date).total_seconds())
+    logger.info("Job Completed at %s", job_end_date)
+    if any(job_run.job_status != JobStatus.SUCCESS for job_run in job_runs):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
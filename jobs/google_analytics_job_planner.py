@@ -0,0 +1,95 @@
+"""Plan google analytics jobs within the quota"""
+import math
+import logging
+from datetime import date, timedelta
+from dtos.job_plan_dto import JobPlanDto
+from helpers.enums import DataFrequency, JobStatus
+from helpers.metadata_helper import JobConfig
+from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+
+planner_log = logging.getLogger(__name__)
+
+class GoogleAnalyticsJobPlanner():
+    """Spreads pending run_job work of several jobs over the remaining daily quota,
+    and sizes the worker pool to the rate limit"""
+    def __init__(self, google_analytics_jobs: GoogleAnalyticsJobs) -> None:
+        self.google_analytics_jobs = google_analytics_jobs
+        self.settings_helper = google_analytics_jobs.settings_helper
+        self.metadata_helper = google_analytics_jobs.metadata_helper
+
+    def get_remaining_daily_requests(self) -> float:
+        """requests left in the daily budget, infinite if rate limit is disabled"""
+        rate_limiter = self.google_analytics_jobs.get_google_analytics_api().get_rate_limiter()
+        if rate_limiter is None:
+            return math.inf
+        return rate_limiter.get_remaining_tokens().get('day')
+
+    def get_maximum_workers(self) -> int:
+        """workers needed to reach the sustained rate limit (requests in flight =
+        requests per second x seconds per request), but not more than MaximumWorkers"""
+        maximum_workers = max(1, self.settings_helper.get_jobs_maximum_workers())
+        rate_limit_settings = self.settings_helper.get_rate_limit_settings()
+        if rate_limit_settings is None:
+            return maximum_workers
+        requests_per_second = min(rate_limit_settings.get('RequestsPerSecond'),
+                                  rate_limit_settings.get('RequestsPer100Seconds') / 100)
+        workers = math.ceil(requests_per_second *
+                            rate_limit_settings.get('EstimatedSecondsPerRequest', 1))
+        return max(1, min(maximum_workers, workers))
+
+    def get_requests_per_period(self) -> int:
+        """estimated requests to fetch a period (pages per query)"""
+        rate_limit_settings = self.settings_helper.get_rate_limit_settings() or {}
+        return rate_limit_settings.get('EstimatedPagesPerQuery', 1)
+
+    # pylint: disable=too-many-locals
+    def plan(self, job_configs: list[JobConfig], end_date: date) -> list[JobPlanDto]:
+        """plan the jobs till end date (exclusive). The remaining daily requests are given
+        to the jobs in turns, one period at a time and oldest period first, so every job
+        moves forward and the jobs together don't go over the quota"""
+        fetch_frequency = DataFrequency[self.settings_helper.get_jobs_fetch_period()]
+        requests_per_period = self.get_requests_per_period()
+        budget = self.get_remaining_daily_requests()
+
+        pending_periods = []
+        for job_config in job_configs:
+            metadata = self.metadata_helper.load_metadata(job_config.data_frequency,
+                                                          job_config.data_module)
+            start_date = self.metadata_helper.get_start_date(
+                metadata.last_data_extraction_date, metadata.job_status)
+            periods = []
+            if metadata.job_status.get('value') != JobStatus.IN_PROGRESS.value:
+                periods = self.google_analytics_jobs.get_extraction_periods(
+                    start_date, end_date, fetch_frequency)
+            pending_periods.append((start_date, periods))
+
+        planned_periods = [0] * len(job_configs)
+        is_budget_left = True
+        while is_budget_left:
+            is_budget_left = False
+            for i, (_, periods) in enumerate(pending_periods):
+                if planned_periods[i] < len(periods) and budget >= requests_per_period:
+                    planned_periods[i] += 1
+                    budget -= requests_per_period
+                    is_budget_left = True
+
+        job_plans = []
+        for job_config, (start_date, periods), planned in zip(job_configs,
+                                                               pending_periods,
+                                                               planned_periods):
+            planned_end_date = periods[planned - 1].end_date + timedelta(days=1) \
+                if planned > 0 else start_date
+            job_plan = JobPlanDto(job_config,
+                                  start_date,
+                                  planned_end_date,
+                                  max(0, (end_date - start_date).days) if len(periods) > 0 else 0,
+                                  (planned_end_date - start_date).days,
+                                  planned * requests_per_period)
+            planner_log.info('Planned %s %s: %s of %s pending days, till %s, %s requests',
+                             job_config.data_frequency.name, job_config.data_module.name,
+                             job_plan.planned_days, job_plan.pending_days,
+                             job_plan.end_date, job_plan.estimated_requests)
+            job_plans.append(job_plan)
+
+        return job_plans
+    # pylint: enable=too-many-locals
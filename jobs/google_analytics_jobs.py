@@ -1,15 +1,20 @@
 """Google Analytics Jobs Module"""
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+import pandas as pd
 from data_retrieval.google_analytics_api_retrieval_v3 import GoogleAnalyticsApiRetrievalV3
 from dtos.date_range_dto import DateRangeDto
 
 from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
 from dtos.page_dto import PageDto
-from helpers.enums import DataFrequency, DataModule, GoogleAuthenticationMethod, JobStatus
+from helpers.enums import DataFrequency, DataModule, GoogleApiVersion, \
+    GoogleAuthenticationMethod, JobStatus, StorageFormat, WorkUnitStatus
 from helpers.metadata_helper import JobConfig, MetadataHelper
 from helpers.file_helper import FileHelper
 from helpers.settings_helper import SettingsHelper
+from helpers.work_queue_helper import WorkQueueHelper
 
 ga_jobs_log = logging.getLogger(__name__)
 
@@ -23,58 +28,186 @@ class GoogleAnalyticsJobs():
         self.settings_helper = SettingsHelper()
         self.file_helper = FileHelper()
 
+    def get_google_analytics_api(self):
+        """google analytics api used to extract data"""
+        return GoogleAnalyticsApiRetrievalV3(
+            GoogleAuthenticationMethod.OAUTH,
+            self.credentials_file_path,
+            self.token_file_path)
+
+    def get_extraction_dates(self, start_date: date, end_date: date) -> list[date]:
+        """days from start date (inclusive) to end date (exclusive)"""
+        return [start_date + timedelta(days=i) for i in range((end_date - start_date).days)]
+
+    def get_period_start_date(self, date_obj: date, fetch_frequency: DataFrequency) -> date:
+        """start of the calendar week (monday), month or year of the date"""
+        if fetch_frequency == DataFrequency.WEEKLY:
+            return date_obj - timedelta(days=date_obj.weekday())
+        if fetch_frequency == DataFrequency.MONTHLY:
+            return date_obj.replace(day=1)
+        if fetch_frequency == DataFrequency.YEARLY:
+            return date_obj.replace(month=1, day=1)
+        return date_obj
+
+    def get_period_end_date(self, date_obj: date, fetch_frequency: DataFrequency) -> date:
+        """end of the calendar week (sunday), month or year of the date"""
+        if fetch_frequency == DataFrequency.WEEKLY:
+            return self.get_period_start_date(date_obj, fetch_frequency) + timedelta(days=6)
+        if fetch_frequency == DataFrequency.MONTHLY:
+            next_month_date = date_obj.replace(day=28) + timedelta(days=4)
+            return next_month_date - timedelta(days=next_month_date.day)
+        if fetch_frequency == DataFrequency.YEARLY:
+            return date_obj.replace(month=12, day=31)
+        return date_obj
+
+    def get_extraction_periods(self, start_date: date, end_date: date,
+                               fetch_frequency: DataFrequency) -> list[DateRangeDto]:
+        """days from start date (inclusive) to end date (exclusive) grouped by calendar
+        week or month of the fetch frequency, each day is a period for daily fetch"""
+        periods = []
+        for extraction_date in self.get_extraction_dates(start_date, end_date):
+            if len(periods) > 0 and \
+                self.get_period_start_date(periods[-1].start_date, fetch_frequency) == \
+                    self.get_period_start_date(extraction_date, fetch_frequency):
+                periods[-1].end_date = extraction_date
+            else:
+                periods.append(DateRangeDto(extraction_date, extraction_date))
+        return periods
+
+    def get_data_file_path(self, data_frequency: DataFrequency,
+                           data_module: DataModule,
+                           extraction_date: date) -> str:
+        """path of the data file of the day, in the storage format of FileStorage settings"""
+        return self.file_helper.get_data_file_path(
+            self.settings_helper.get_file_storage_root_folder(),
+            data_frequency.name,
+            data_module.name,
+            extraction_date,
+            StorageFormat[self.settings_helper.get_file_storage_format()])
+
+    def extract_data(self, google_analytics_api: GoogleAnalyticsApiRetrievalV3,
+                     data_frequency: DataFrequency,
+                     data_module: DataModule,
+                     extraction_date: date):
+        """Extract data of a day and save it to file"""
+        filter_clause = GoogleAnalyticsFilterClause()
+        filter_clause.set_api_version(GoogleApiVersion.VERSION_3)
+        filter_clause.set_date_range(DateRangeDto(extraction_date, extraction_date))
+        filter_clause.set_page_dto(PageDto(
+            self.settings_helper.get_google_analytics_page_size(),
+            None))
+        file_path = self.get_data_file_path(data_frequency, data_module, extraction_date)
+
+        if self.settings_helper.get_jobs_stream_to_file():
+            # pages are written to file as they arrive, so memory doesn't grow with data
+            ga_jobs_log.debug('streaming data to file %s', file_path)
+            google_analytics_api.save_sessions_to_file(filter_clause, data_module, file_path)
+            return file_path
+
+        data = None
+        if data_module.value == DataModule.AGE.value:
+            data = google_analytics_api.get_sessions_by_age(filter_clause)
+        elif data_module.value == DataModule.GENDER.value:
+            data = google_analytics_api.get_sessions_by_gender(filter_clause)
+        elif data_module.value == DataModule.LANDING_PAGE.value:
+            data = google_analytics_api.get_sessions_by_landing_page(filter_clause)
+        else:
+            raise ValueError(f'Invalid data module {data_module.value}')
+
+        ga_jobs_log.debug('saving file to %s', file_path)
+        self.file_helper.save_df_to_file(data, file_path, data_module)
+        return file_path
+
+    def extract_period_data(self, google_analytics_api: GoogleAnalyticsApiRetrievalV3,
+                            data_frequency: DataFrequency,
+                            data_module: DataModule,
+                            date_range: DateRangeDto):
+        """Extract data of a period (week or month) with ga:date dimension in the same
+        query, and save it to the file of each day"""
+        if date_range.start_date == date_range.end_date:
+            return [self.extract_data(google_analytics_api, data_frequency,
+                                      data_module, date_range.start_date)]
+
+        filter_clause = GoogleAnalyticsFilterClause()
+        filter_clause.set_api_version(GoogleApiVersion.VERSION_3)
+        filter_clause.set_date_range(date_range)
+        filter_clause.set_page_dto(PageDto(
+            self.settings_helper.get_google_analytics_page_size(),
+            None))
+        daily_data = google_analytics_api.get_sessions_by_date(filter_clause, data_module)
+
+        file_paths = []
+        for extraction_date in self.get_extraction_dates(
+                date_range.start_date, date_range.end_date + timedelta(days=1)):
+            file_path = self.get_data_file_path(data_frequency, data_module, extraction_date)
+            ga_jobs_log.debug('saving file to %s', file_path)
+            self.file_helper.save_df_to_file(daily_data[extraction_date], file_path,
+                                              data_module)
+            file_paths.append(file_path)
+        return file_paths
+
+    def extract_period_data_timed(self, google_analytics_api: GoogleAnalyticsApiRetrievalV3,
+                                  data_frequency: DataFrequency,
+                                  data_module: DataModule,
+                                  date_range: DateRangeDto) -> float:
+        """Extract data of a period, and return the seconds it took"""
+        started_at = time.perf_counter()
+        self.extract_period_data(google_analytics_api, data_frequency, data_module, date_range)
+        return time.perf_counter() - started_at
+
+    # pylint: disable=too-many-locals
     def run_job(self, data_frequency: DataFrequency,
                 data_module: DataModule,
-                end_date: date):
-        """Run Job"""
+                end_date: date,
+                maximum_workers: int = None):
+        """Run Job
+        Days are fetched one query per FetchPeriod (Jobs settings: DAILY, WEEKLY or MONTHLY),
+        and periods are extracted by a pool of MaximumWorkers (Jobs settings) threads,
+        but the metadata is saved in date order, so that last_data_extraction_date
+        only moves over days which are completed along with all the days before them.
+        """
         job_log = f'data frequency: {data_frequency.name}, data module: {data_module.name}'
         metadata = self.metadata_helper.load_metadata(data_frequency, data_module)
+        # of the current job is in progress, then don't run another job
         if metadata.job_status.get('value') == JobStatus.IN_PROGRESS.value:
             ga_jobs_log.info("Another job is in progress for %s", job_log)
             return
         start_date = self.metadata_helper.get_start_date(
             metadata.last_data_extraction_date, metadata.job_status)
+        fetch_frequency = DataFrequency[self.settings_helper.get_jobs_fetch_period()]
+        extraction_periods = self.get_extraction_periods(start_date, end_date, fetch_frequency)
+        if maximum_workers is None:
+            maximum_workers = self.settings_helper.get_jobs_maximum_workers()
+        maximum_workers = max(1, maximum_workers)
+        ga_jobs_log.info("Running job %s from %s to %s with %s workers, fetch period %s",
+                         job_log, start_date, end_date, maximum_workers, fetch_frequency.name)
+
+        # api, and the service client behind it, is shared by all the days and workers
+        google_analytics_api = self.get_google_analytics_api()
+        executor = ThreadPoolExecutor(max_workers=maximum_workers)
         try:
-            # of the current job is in progress, then don't run another job
-            while start_date < end_date:
-                google_analytics_api = GoogleAnalyticsApiRetrievalV3(
-                    GoogleAuthenticationMethod.OAUTH,
-                    self.credentials_file_path,
-                    self.token_file_path)
+            futures = [executor.submit(self.extract_period_data_timed, google_analytics_api,
+                                       data_frequency, data_module, extraction_period)
+                       for extraction_period in extraction_periods]
+            for extraction_period, future in zip(extraction_periods, futures):
+                start_date = extraction_period.start_date
                 ga_jobs_log.info("Running job %s for start date %s", job_log, start_date)
                 self.metadata_helper.save_metadata(JobConfig(data_frequency, data_module),
                               start_date,
                               JobStatus.IN_PROGRESS)
-                filter_clause = GoogleAnalyticsFilterClause()
-                filter_clause.set_date_range(DateRangeDto(start_date, start_date))
-                filter_clause.set_page_dto(PageDto(
-                    self.settings_helper.get_google_analytics_page_size(),
-                    None))
-                data = None
-                if data_module.value == DataModule.AGE.value:
-                    data = google_analytics_api.get_sessions_by_age(filter_clause)
-                elif data_module.value == DataModule.GENDER.value:
-                    data = google_analytics_api.get_sessions_by_gender(filter_clause)
-                elif data_module.value == DataModule.LANDING_PAGE.value:
-                    data = google_analytics_api.get_sessions_by_landing_page(filter_clause)
-                else:
-                    raise ValueError(f'Invalid data module {data_module.value}')
-
-                file_path = self.file_helper.get_data_path(
-                    self.settings_helper.get_file_storage_root_folder(),
-                    data_frequency.name,
-                    data_module.name,
-                    start_date)
-                print('saving file to ', file_path)
-                self.file_helper.save_list_to_csv(data, file_path)
-
-                self.metadata_helper.save_metadata(
-                    JobConfig(data_frequency, data_module),
-                    start_date,
-                    JobStatus.SUCCESS)
-
-                start_date = start_date + timedelta(days=1)
+                duration_in_seconds = future.result()
+                extraction_dates = self.get_extraction_dates(
+                    start_date, extraction_period.end_date + timedelta(days=1))
+                for extraction_date in extraction_dates:
+                    # days of a period are fetched together, so they share its duration
+                    self.metadata_helper.save_metadata(
+                        JobConfig(data_frequency, data_module),
+                        extraction_date,
+                        JobStatus.SUCCESS,
+                        duration_in_seconds=duration_in_seconds / len(extraction_dates))
         except Exception as ex:
+            # don't start the pending days, the next run starts again from the failed day
+            executor.shutdown(wait=True, cancel_futures=True)
             failure_reason = str(ex)
             ga_jobs_log.error(ex)
             self.metadata_helper.save_metadata(
@@ -83,15 +216,182 @@ class GoogleAnalyticsJobs():
                 JobStatus.FAILED,
                 failure_reason=failure_reason)
             raise ex
+        finally:
+            executor.shutdown(wait=True)
+    # pylint: enable=too-many-locals
+
+    def get_work_queue(self) -> WorkQueueHelper:
+        """work queue shared by the workers"""
+        work_queue_settings = self.settings_helper.get_work_queue_settings()
+        return WorkQueueHelper(work_queue_settings.get('FilePath'),
+                               work_queue_settings.get('LeaseInSeconds'),
+                               work_queue_settings.get('MaximumAttempts'))
+
+    def enqueue_job(self, data_frequency: DataFrequency,
+                    data_module: DataModule,
+                    end_date: date) -> int:
+        """add the periods from the last extraction date till end date (exclusive) to the
+        work queue, returns the number of units added"""
+        metadata = self.metadata_helper.load_metadata(data_frequency, data_module)
+        start_date = self.metadata_helper.get_start_date(
+            metadata.last_data_extraction_date, metadata.job_status)
+        fetch_frequency = DataFrequency[self.settings_helper.get_jobs_fetch_period()]
+        extraction_periods = self.get_extraction_periods(start_date, end_date, fetch_frequency)
+        added = self.get_work_queue().enqueue(data_frequency, data_module, extraction_periods)
+        ga_jobs_log.info("Enqueued %s of %s periods of %s %s from %s to %s", added,
+                         len(extraction_periods), data_frequency.name, data_module.name,
+                         start_date, end_date)
+        return added
+
+    def advance_metadata(self, work_queue: WorkQueueHelper,
+                         data_frequency: DataFrequency,
+                         data_module: DataModule):
+        """move last_data_extraction_date over the done units which follow it without gap,
+        as units complete out of order. It runs in a queue transaction, so workers
+        don't overwrite each other's progress"""
+        with work_queue.transaction():
+            metadata = self.metadata_helper.load_metadata(data_frequency, data_module)
+            next_date = self.metadata_helper.get_start_date(
+                metadata.last_data_extraction_date, metadata.job_status)
+            done_dates = []
+            for work_unit in work_queue.get_units(data_frequency, data_module, next_date):
+                if work_unit.start_date > next_date:
+                    break
+                if work_unit.status == WorkUnitStatus.FAILED:
+                    self.metadata_helper.save_metadata(
+                        JobConfig(data_frequency, data_module),
+                        work_unit.start_date,
+                        JobStatus.FAILED,
+                        failure_reason=work_unit.failure_reason)
+                    break
+                if work_unit.status != WorkUnitStatus.DONE:
+                    break
+                done_dates.extend(self.get_extraction_dates(
+                    next_date, work_unit.end_date + timedelta(days=1)))
+                next_date = work_unit.end_date + timedelta(days=1)
+
+            # every day is saved, as in run_job, so that rollups find the changed days
+            for done_date in done_dates:
+                self.metadata_helper.save_metadata(JobConfig(data_frequency, data_module),
+                                                   done_date,
+                                                   JobStatus.SUCCESS)
+
+    def run_worker(self, worker_id: str,
+                   data_frequency: DataFrequency = None,
+                   data_module: DataModule = None,
+                   maximum_units: int = None) -> int:
+        """claim units from the work queue and extract them till the queue is empty.
+        Lease of the unit is renewed while it is extracted, so if the worker dies the unit
+        is claimed again by another worker after the lease expires.
+        Returns the number of units processed"""
+        work_queue = self.get_work_queue()
+        google_analytics_api = self.get_google_analytics_api()
+        processed = 0
+        while maximum_units is None or processed < maximum_units:
+            work_unit = work_queue.claim(worker_id, data_frequency, data_module)
+            if work_unit is None:
+                break
+            unit_data_frequency = DataFrequency(work_unit.data_frequency)
+            unit_data_module = DataModule(work_unit.module)
+            unit_log = f'{unit_data_frequency.name} {unit_data_module.name} ' \
+                f'{work_unit.start_date} to {work_unit.end_date}, attempt {work_unit.attempts}'
+            ga_jobs_log.info("Worker %s claimed %s", worker_id, unit_log)
+            # pylint: disable=broad-exception-caught
+            try:
+                with work_queue.heartbeats(work_unit, worker_id):
+                    duration_in_seconds = self.extract_period_data_timed(
+                        google_analytics_api, unit_data_frequency, unit_data_module,
+                        DateRangeDto(work_unit.start_date, work_unit.end_date))
+                is_completed = work_queue.complete(work_unit, worker_id)
+                ga_jobs_log.info("Worker %s extracted %s in %.2f seconds", worker_id,
+                                 unit_log, duration_in_seconds)
+            except Exception as ex:
+                ga_jobs_log.error("Worker %s failed %s: %s", worker_id, unit_log, ex)
+                is_completed = work_queue.fail(work_unit, worker_id, str(ex))
+            # pylint: enable=broad-exception-caught
+            if not is_completed:
+                ga_jobs_log.warning("Worker %s lost the lease of %s", worker_id, unit_log)
+            self.advance_metadata(work_queue, unit_data_frequency, unit_data_module)
+            processed += 1
+        return processed
+
+    def aggregate_data(self, data_df: pd.DataFrame, data_module: DataModule,
+                       date_range: DateRangeDto) -> pd.DataFrame:
+        """sum of sessions of the date range by the dimensions of the data module"""
+        schema_columns = self.file_helper.get_schema(data_module).names
+        if len(data_df) == 0:
+            return pd.DataFrame(columns=schema_columns)
+        dimension_columns = [c for c in schema_columns
+                             if c not in ['start_date', 'end_date', 'sessions']]
+        rollup_df = data_df.groupby(dimension_columns, observed=True, dropna=False)['sessions'] \
+            .sum().reset_index()
+        rollup_df['start_date'] = pd.Timestamp(date_range.start_date)
+        rollup_df['end_date'] = pd.Timestamp(date_range.end_date)
+        return rollup_df[schema_columns]
+
+    def rollup_job(self, data_frequency: DataFrequency, data_module: DataModule) -> int:
+        """Roll up the daily data into a file per week, month or year (data_frequency).
+        Only the periods of the days saved by the daily job since the last rollup are
+        recomputed: the watermark of the rollup is the last daily metadata history id it
+        processed. Files are replaced, so a rollup interrupted before saving its watermark
+        is recomputed by the next run. Returns the number of periods rolled up"""
+        if data_frequency not in [DataFrequency.WEEKLY, DataFrequency.MONTHLY,
+                                  DataFrequency.YEARLY]:
+            raise ValueError(f'Invalid rollup data frequency {data_frequency.name}')
+        job_log = f'data frequency: {data_frequency.name}, data module: {data_module.name}'
+        started_at = time.perf_counter()
+        watermark = self.metadata_helper.load_watermark(data_frequency, data_module)
+        changed_dates, history_id = self.metadata_helper.get_changed_dates(
+            DataFrequency.DAILY, data_module, watermark)
+        if len(changed_dates) == 0:
+            ga_jobs_log.info("No daily data changed to roll up for %s", job_log)
+            return 0
+
+        period_start_dates = sorted({self.get_period_start_date(d, data_frequency)
+                                     for d in changed_dates})
+        ga_jobs_log.info("Rolling up %s periods for %s", len(period_start_dates), job_log)
+        try:
+            for period_start_date in period_start_dates:
+                date_range = DateRangeDto(period_start_date, self.get_period_end_date(
+                    period_start_date, data_frequency))
+                daily_df = self.file_helper.read_range(
+                    DataFrequency.DAILY,
+                    data_module,
+                    date_range.start_date,
+                    date_range.end_date,
+                    root_dir=self.settings_helper.get_file_storage_root_folder(),
+                    storage_format=StorageFormat[
+                        self.settings_helper.get_file_storage_format()])
+                file_path = self.get_data_file_path(data_frequency, data_module,
+                                                    period_start_date)
+                ga_jobs_log.debug('saving file to %s', file_path)
+                self.file_helper.save_df_to_file(
+                    self.aggregate_data(daily_df, data_module, date_range),
+                    file_path, data_module)
+        except Exception as ex:
+            ga_jobs_log.error(ex)
+            metadata = self.metadata_helper.load_metadata(data_frequency, data_module)
+            self.metadata_helper.save_metadata(JobConfig(data_frequency, data_module),
+                                               metadata.last_data_extraction_date,
+                                               JobStatus.FAILED,
+                                               failure_reason=str(ex))
+            raise ex
+
+        self.metadata_helper.save_watermark(data_frequency, data_module, history_id)
+        self.metadata_helper.save_metadata(JobConfig(data_frequency, data_module),
+                                           max(changed_dates),
+                                           JobStatus.SUCCESS,
+                                           duration_in_seconds=time.perf_counter() - started_at)
+        return len(period_start_dates)
 
-    def age_daily(self, end_date: date):
+    def age_daily(self, end_date: date, maximum_workers: int = None):
         """Job: Age, Daily Data"""
-        self.run_job(DataFrequency.DAILY, DataModule.AGE, end_date)
+        self.run_job(DataFrequency.DAILY, DataModule.AGE, end_date, maximum_workers)
 
-    def gender_daily(self, end_date: date):
+    def gender_daily(self, end_date: date, maximum_workers: int = None):
         """Job: Gender, Daily Data"""
-        self.run_job(DataFrequency.DAILY, DataModule.GENDER, end_date)
+        self.run_job(DataFrequency.DAILY, DataModule.GENDER, end_date, maximum_workers)
 
-    def landing_page_daily(self, end_date: date):
+    def landing_page_daily(self, end_date: date, maximum_workers: int = None):
         """Job: Landing Page, Daily Data"""
-        self.run_job(DataFrequency.DAILY, DataModule.LANDING_PAGE, end_date)
+        self.run_job(DataFrequency.DAILY, DataModule.LANDING_PAGE, end_date, maximum_workers)
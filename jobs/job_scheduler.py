@@ -0,0 +1,144 @@
+"""Job scheduler module"""
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from dtos.job_run_dto import JobRunDto
+from helpers.enums import JobStatus
+
+scheduler_log = logging.getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class ScheduledJob():
+    """job registered in the scheduler"""
+    def __init__(self, name: str, func, depends_on: list[str], priority: int,
+                 order: int) -> None:
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on
+        self.priority = priority
+        # registration order, breaks the ties of priority
+        self.order = order
+# pylint: enable=too-few-public-methods
+
+
+class JobScheduler():
+    """Runs registered jobs as a dependency graph (DAG) on a pool of threads.
+    A job starts when all the jobs it depends on have succeeded, and at most
+    maximum_concurrent_jobs jobs run at a time. When more jobs are ready than
+    free threads, the job with the lowest priority value starts first.
+    Jobs depending on a failed job are not run, and are reported as failed.
+    """
+    def __init__(self, maximum_concurrent_jobs: int = 1) -> None:
+        self.maximum_concurrent_jobs = max(1, maximum_concurrent_jobs)
+        self.jobs: dict[str, ScheduledJob] = {}
+
+    def register(self, name: str, func, depends_on: list[str] = None, priority: int = 0):
+        """register a job, func is called without arguments"""
+        if name in self.jobs:
+            raise ValueError(f'Job {name} is already registered')
+        self.jobs[name] = ScheduledJob(name, func, depends_on or [], priority, len(self.jobs))
+
+    def validate(self):
+        """raise ValueError if a job depends on an unknown job or the dependencies have a cycle"""
+        for job in self.jobs.values():
+            for dependency in job.depends_on:
+                if dependency not in self.jobs:
+                    raise ValueError(f'Job {job.name} depends on unknown job {dependency}')
+
+        visited = set()
+        visiting = set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f'Job {name} has cyclic dependencies')
+            visiting.add(name)
+            for dependency in self.jobs[name].depends_on:
+                visit(dependency)
+            visiting.remove(name)
+            visited.add(name)
+
+        for name in self.jobs:
+            visit(name)
+
+    def run_job(self, job: ScheduledJob) -> JobRunDto:
+        """run the job and time it, exceptions are logged and reported as failure"""
+        started_at = datetime.now()
+        timer_start = time.perf_counter()
+        scheduler_log.info("Started running job %s at %s", job.name, started_at)
+        job_status = JobStatus.SUCCESS
+        failure_reason = ''
+        # pylint: disable=broad-exception-caught
+        try:
+            job.func()
+        except Exception as ex:
+            job_status = JobStatus.FAILED
+            failure_reason = str(ex)
+            scheduler_log.exception("Job %s failed", job.name)
+        # pylint: enable=broad-exception-caught
+        job_run = JobRunDto(job.name, job_status, started_at, datetime.now(),
+                            time.perf_counter() - timer_start, failure_reason)
+        scheduler_log.info("Completed running job %s at %s with status %s. Time Elapsed %.2f",
+                           job.name, job_run.ended_at, job_status.name,
+                           job_run.elapsed_seconds)
+        return job_run
+
+    def run(self) -> list[JobRunDto]:
+        """run all the registered jobs, returns the job runs in registration order"""
+        self.validate()
+        dependents = {name: [] for name in self.jobs}
+        pending_dependencies = {}
+        for job in self.jobs.values():
+            pending_dependencies[job.name] = len(job.depends_on)
+            for dependency in job.depends_on:
+                dependents[dependency].append(job.name)
+
+        job_runs = {}
+        ready = [(job.priority, job.order, job.name) for job in self.jobs.values()
+                 if len(job.depends_on) == 0]
+        heapq.heapify(ready)
+
+        def complete(job_run: JobRunDto):
+            job_runs[job_run.name] = job_run
+            for dependent in dependents[job_run.name]:
+                if dependent in job_runs:
+                    continue
+                if job_run.job_status != JobStatus.SUCCESS:
+                    complete(JobRunDto(dependent, JobStatus.FAILED,
+                                       failure_reason=f'Dependency {job_run.name} failed'))
+                    continue
+                pending_dependencies[dependent] -= 1
+                if pending_dependencies[dependent] == 0:
+                    job = self.jobs[dependent]
+                    heapq.heappush(ready, (job.priority, job.order, job.name))
+
+        with ThreadPoolExecutor(max_workers=self.maximum_concurrent_jobs) as executor:
+            running = {}
+            while len(ready) > 0 or len(running) > 0:
+                # submit only to free threads, so that the priority decides the next job
+                while len(ready) > 0 and len(running) < self.maximum_concurrent_jobs:
+                    _, _, name = heapq.heappop(ready)
+                    # a job which failed dependency is already completed
+                    if name not in job_runs:
+                        running[executor.submit(self.run_job, self.jobs[name])] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    complete(future.result())
+
+        return [job_runs[name] for name in self.jobs]
+
+    def log_report(self, job_runs: list[JobRunDto], elapsed_seconds: float = None):
+        """log timing and status of each job run"""
+        scheduler_log.info("%-40s %-12s %10s  %s", 'Job', 'Status', 'Seconds', 'Failure reason')
+        for job_run in job_runs:
+            scheduler_log.info("%-40s %-12s %10.2f  %s", job_run.name, job_run.job_status.name,
+                               job_run.elapsed_seconds, job_run.failure_reason)
+        if elapsed_seconds is not None:
+            scheduler_log.info("Total time elapsed %.2f, sum of job times %.2f",
+                               elapsed_seconds,
+                               sum(job_run.elapsed_seconds for job_run in job_runs))
@@ -1,11 +1,10 @@
 """prepare data"""
-import pandas as pd
-
 from dtos.settings_dto import SettingsDto
 from helpers.cu_dataset_reader import CuDatasetReader
 from helpers.string_helper import StringHelper
 from helpers.enums import DataModule
 from helpers.file_helper import FileHelper
+from helpers.organization_index_helper import OrganizationIndexHelper
 from data_retrieval.google_analytics_api_retrieval import GoogleAnalyticsFilterClause
 from data_retrieval.google_analytics_data import GoogleAnalyticsData
 from data_transform.clean_landing_page import CleanLandingPage
@@ -53,7 +52,9 @@ def prepare_sessions_data(settings_dto: SettingsDto,
     file_helper = FileHelper()
     landing_page_df = file_helper.read_run_file(
         run_id, DataModule.LANDING_PAGE)
-    cu_export_df = pd.read_csv(settings_dto.sa_community_export_file_path)
+    # first record of each organization, read from the index of the export
+    cu_export_df = OrganizationIndexHelper.get_instance(
+        settings_dto.sa_community_export_file_path).load().reset_index()
 
     clean_landing_page = CleanLandingPage()
     processed_data_df = clean_landing_page.process_data(
@@ -0,0 +1,90 @@
+"""Tests for google analytics api retrieval"""
+import sys
+import os
+import unittest
+from datetime import date
+import numpy as np
+import pandas as pd
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from data_retrieval.google_analytics_api_retrieval import GoogleAnalyticsApiRetrieval
+from dtos.date_range_dto import DateRangeDto
+from helpers.enums import GoogleAuthenticationMethod
+#pylint: enable=wrong-import-position
+
+METRICS = [{'name': 'ga:sessions', 'type': 'INTEGER'},
+           {'name': 'ga:bounceRate', 'type': 'PERCENT'},
+           {'name': 'ga:avgSessionDuration', 'type': 'TIME'},
+           {'name': 'ga:pageviewsPerSession', 'type': 'FLOAT'}]
+
+
+def get_report(rows: list, metrics: list[dict] = None) -> dict:
+    """landing page report of the rows of dimensions and metric values"""
+    metrics = metrics or METRICS
+    return {'columnHeader': {
+                'dimensions': ['ga:customVarValue1', 'ga:landingPagePath'],
+                'metricHeader': {'metricHeaderEntries': metrics}},
+            'data': {'rows': [{'dimensions': dimensions, 'metrics': [{'values': values}]}
+                              for dimensions, values in rows],
+                     'totals': [{'values': [str(len(rows))]}]}}
+
+
+class TestGoogleAnalyticsApiRetrieval(unittest.TestCase):
+    """Test methods for google analytics api retrieval"""
+
+    def setUp(self) -> None:
+        self.google_analytics_api = GoogleAnalyticsApiRetrieval(
+            GoogleAuthenticationMethod.OAUTH, 'credentials.json', 'token.json')
+        self.date_range = DateRangeDto(date(2024, 1, 1), date(2024, 1, 1))
+        return super().setUp()
+
+    def decode(self, report: dict, columnar_decoding: bool) -> pd.DataFrame:
+        """report decoded by the columnar or the row decoder"""
+        self.google_analytics_api.columnar_decoding = columnar_decoding
+        return self.google_analytics_api.decode_report(report, self.date_range)
+
+    def test_extract_columns_from_report_should_parse_each_metric_to_its_type(self):
+        """integer metrics are int64, percent, time and float metrics are float64"""
+        report = get_report([(['20', '/org/1-A'], ['3', '2.5', '10.25', '1']),
+                             (['21', '/org/2-B'], ['0', '100', '0.5', '1.75'])])
+
+        data_df = self.decode(report, columnar_decoding=True)
+
+        self.assertEqual(data_df['ga:sessions'].dtype, np.int64)
+        self.assertEqual(data_df['ga:sessions'].tolist(), [3, 0])
+        self.assertEqual(data_df['ga:bounceRate'].tolist(), [2.5, 100])
+        self.assertEqual(data_df['ga:avgSessionDuration'].tolist(), [10.25, 0.5])
+        self.assertEqual(data_df['ga:pageviewsPerSession'].dtype, np.float64)
+
+    def test_extract_columns_from_report_should_match_row_decoder(self):
+        """columnar and row decoders give the same values for mixed metric types"""
+        report = get_report([([str(i % 3), f'/org/{i % 4}-Org'],
+                               [str(i), f'{i / 8}', str(i * 3), f'{i}.5'])
+                             for i in range(20)])
+
+        columnar_df = self.decode(report, columnar_decoding=True)
+        row_df = self.decode(report, columnar_decoding=False)
+
+        self.assertEqual(list(columnar_df.columns), list(row_df.columns))
+        for dimension in ['ga:customVarValue1', 'ga:landingPagePath']:
+            self.assertEqual(columnar_df[dimension].astype(str).tolist(),
+                             row_df[dimension].tolist())
+        for metric in METRICS:
+            self.assertEqual(columnar_df[metric['name']].tolist(),
+                             pd.to_numeric(row_df[metric['name']]).tolist())
+        self.assertTrue((columnar_df['start_date'] == pd.Timestamp(2024, 1, 1)).all())
+
+    def test_extract_columns_from_report_should_return_empty_columns_without_data(self):
+        """report with zero total has the columns and no rows"""
+        report = get_report([])
+        report['data']['rows'] = None
+
+        data_df = self.decode(report, columnar_decoding=True)
+
+        self.assertEqual(len(data_df), 0)
+        self.assertIn('ga:bounceRate', data_df.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Tests for google analytics api retrieval version 3"""
+import sys
+import os
+import unittest
+from datetime import date
+import pandas as pd
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from data_retrieval.google_analytics_api_retrieval_v3 import GoogleAnalyticsApiRetrievalV3
+from dtos.date_range_dto import DateRangeDto
+from dtos.google_analytics_filter_clause_dto import GoogleAnalyticsFilterClause
+from dtos.page_dto import PageDto
+from helpers.enums import DataModule, GoogleApiVersion, GoogleAuthenticationMethod
+#pylint: enable=wrong-import-position
+
+
+# pylint: disable=too-few-public-methods
+class FakeGoogleAnalyticsApiRetrievalV3(GoogleAnalyticsApiRetrievalV3):
+    """answers the report of the request config with the rows, without google analytics"""
+    def __init__(self, rows: list) -> None:
+        super().__init__(GoogleAuthenticationMethod.OAUTH, 'credentials.json', 'token.json')
+        # (dimension values, sessions) of the rows of the report
+        self.rows = rows
+
+    # pylint: disable=unused-argument
+    def iter_reports_for_request_configs(self, request_configs, filter_clause):
+        """report of the first request config"""
+        dimensions = [f'ga:{dimension}' for dimension in request_configs[0].dimensions]
+        metrics = [{'name': f'ga:{metric}', 'type': 'INTEGER'}
+                   for metric in request_configs[0].metrics]
+        yield 0, {'columnHeader': {'dimensions': dimensions,
+                                   'metricHeader': {'metricHeaderEntries': metrics}},
+                  'data': {'rows': [{'dimensions': dimension_values,
+                                     'metrics': [{'values': [str(sessions)]}]}
+                                    for dimension_values, sessions in self.rows],
+                           'totals': [{'values': [str(len(self.rows))]}]}}
+    # pylint: enable=unused-argument
+# pylint: enable=too-few-public-methods
+
+
+class TestGoogleAnalyticsApiRetrievalV3(unittest.TestCase):
+    """Test methods for google analytics api retrieval version 3"""
+
+    def get_filter_clause(self, start_date: date, end_date: date) -> GoogleAnalyticsFilterClause:
+        """filter clause of the date range"""
+        filter_clause = GoogleAnalyticsFilterClause()
+        filter_clause.set_api_version(GoogleApiVersion.VERSION_3)
+        filter_clause.set_date_range(DateRangeDto(start_date, end_date))
+        filter_clause.set_page_dto(PageDto(1000, None))
+        return filter_clause
+
+    def test_get_sessions_by_date_should_split_response_into_days(self):
+        """rows of each day, with the date range of the day and without the date column"""
+        google_analytics_api = FakeGoogleAnalyticsApiRetrievalV3([
+            (['1', '18-24', '20240103'], 4),
+            (['1', '25-34', '20240101'], 2),
+            (['2', '18-24', '20240101'], 1)])
+
+        daily_data = google_analytics_api.get_sessions_by_date(
+            self.get_filter_clause(date(2024, 1, 1), date(2024, 1, 3)), DataModule.AGE)
+
+        self.assertEqual(list(daily_data), [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)])
+        first_day_df = daily_data[date(2024, 1, 1)]
+        self.assertEqual(first_day_df['dataset_id'].astype(str).tolist(), ['1', '2'])
+        self.assertEqual(first_day_df['sessions'].tolist(), [2, 1])
+        self.assertNotIn('date', first_day_df.columns)
+        self.assertTrue((daily_data[date(2024, 1, 3)]['start_date']
+                         == pd.Timestamp(2024, 1, 3)).all())
+        self.assertTrue((daily_data[date(2024, 1, 3)]['end_date']
+                         == pd.Timestamp(2024, 1, 3)).all())
+
+    def test_get_sessions_by_date_should_return_empty_data_for_days_without_rows(self):
+        """days without rows have the columns of the other days and no rows"""
+        google_analytics_api = FakeGoogleAnalyticsApiRetrievalV3([
+            (['1', '18-24', '20240101'], 3)])
+
+        daily_data = google_analytics_api.get_sessions_by_date(
+            self.get_filter_clause(date(2024, 1, 1), date(2024, 1, 2)), DataModule.AGE)
+
+        self.assertEqual(len(daily_data[date(2024, 1, 2)]), 0)
+        self.assertEqual(list(daily_data[date(2024, 1, 2)].columns),
+                         list(daily_data[date(2024, 1, 1)].columns))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""Tests for clean landing page"""
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from data_transform.clean_landing_page import CleanLandingPage
+#pylint: enable=wrong-import-position
+
+SACOMMUNITY_URL = 'https://sacommunity.org'
+
+
+def process_data_iterrows(clean_landing_page: CleanLandingPage,
+                          landing_page_df, sa_community_df) -> pd.DataFrame:
+    """process_data as it was before the joins, scans the data for each record"""
+    sessions_data_df = clean_landing_page.get_sessions_by_organization(landing_page_df)
+    results = []
+    for _, row in sessions_data_df.iterrows():
+        if pd.isna(row["organization_id"]):
+            continue
+        org_id = int(row["organization_id"])
+        org_names_sa_community = sa_community_df[sa_community_df['ID_19']
+                                                 == org_id]["Org_name"].values
+        org_rows_df = sessions_data_df[sessions_data_df["organization_id"] == org_id]
+        results.append({
+            'org_id': org_id,
+            'landing_page': clean_landing_page.sacommunity_url +
+                            org_rows_df["landing_page"].values[0],
+            'sessions_count': row["sessions"],
+            'organization_name_sa_community': org_names_sa_community[0]
+                                              if len(org_names_sa_community) > 0 else '',
+            'organization_name_google': org_rows_df["organization_name"].values[0],
+            'is_record_available_in_sacommunity_db': len(org_names_sa_community) > 0,
+        })
+    return pd.DataFrame(results)
+
+
+def get_landing_page_df(number_of_pages: int, number_of_organizations: int,
+                        seed: int = 0) -> pd.DataFrame:
+    """synthetic landing pages, with repeated organizations, a name per page variant,
+    search cache and tracking suffixes, and pages which are not of an organization"""
+    rng = np.random.default_rng(seed)
+    org_ids = 200000 + rng.integers(0, number_of_organizations, number_of_pages)
+    variants = rng.integers(0, 3, number_of_pages)
+    landing_pages = np.array([f'/org/{org_id}-Organisation_{org_id}_{variant}'
+                              for org_id, variant in zip(org_ids, variants)], dtype=object)
+    kinds = rng.integers(0, 10, number_of_pages)
+    landing_pages[kinds == 0] = '/search'
+    landing_pages[kinds == 1] += '?fbclid=IwAR05WAQ0z'
+    landing_pages[kinds == 2] = [f'/search?q=cache:a-1ZNgEJ:{SACOMMUNITY_URL}{landing_page}+&cd=63'
+                                 for landing_page in landing_pages[kinds == 2]]
+    return pd.DataFrame({'landing_page': landing_pages,
+                         'sessions': rng.integers(1, 100, number_of_pages)})
+
+
+def get_sa_community_df(number_of_organizations: int, seed: int = 0) -> pd.DataFrame:
+    """synthetic sa community export, with half of the organizations, some twice"""
+    rng = np.random.default_rng(seed)
+    org_ids = 200000 + rng.choice(number_of_organizations, number_of_organizations // 2,
+                                  replace=False)
+    org_ids = np.concatenate([org_ids, org_ids[:number_of_organizations // 10]])
+    return pd.DataFrame({'ID_19': org_ids,
+                         'Org_name': [f'Organisation {org_id} {i}'
+                                      for i, org_id in enumerate(org_ids)]})
+
+
+class TestCleanLandingPage(unittest.TestCase):
+    """Test methods for clean landing page"""
+
+    def setUp(self) -> None:
+        self.clean_landing_page = CleanLandingPage(SACOMMUNITY_URL)
+        return super().setUp()
+
+    def test_clean_landing_page_texts_should_be_same_as_clean_landing_page_text(self):
+        """batch cleaner returns the same texts, ids and names as the cleaner of a text"""
+        texts = pd.Series([
+            "/org/196236-Dave's_Angels_Playgroup?fbclid=IwAR05WAQ0z5mwY7v1UEVmkDITFg7",
+            "/search?q=cache:UTs_a-1ZNgEJ:https://sacommunity.org/org/196341-Neighbourhood_"
+            "Watch_-_Linden_Park_249+&cd=63&hl=en&ct=clnk&gl=bj",
+            "/org/201669-Gifted_&_Talented_Children's_Association_of_SA_Inc.?_x_tr_sl=en",
+            "/org/201830-Aged_Rights_Advocacy_Service_Inc.?back=https://www.google.com/"
+            "search?client=safari+&as_qdr=all?fbclid=1",
+            "https://sacommunity.org/org/5-Name?back=https://sacommunity.org/search?q=cache:",
+            "/", "/search", " /org/ 12 -Name_\x1c", "/org/+7-Name\n?fbclid=\n", "/org/\u0663-Name"])
+
+        organization_id_names = self.clean_landing_page.clean_landing_page_texts(texts)
+
+        pd.testing.assert_series_equal(
+            organization_id_names, texts.apply(self.clean_landing_page.clean_landing_page_text))
+        pd.testing.assert_series_equal(
+            self.clean_landing_page.get_organization_ids(organization_id_names),
+            organization_id_names.apply(self.clean_landing_page.get_organization_id))
+        pd.testing.assert_series_equal(
+            self.clean_landing_page.get_organization_names(organization_id_names),
+            organization_id_names.apply(self.clean_landing_page.get_organization_name))
+
+    def test_get_organization_ids_should_raise_error_of_invalid_id(self):
+        """invalid ids raise error, as get_organization_id does"""
+        with self.assertRaises(ValueError):
+            self.clean_landing_page.get_organization_ids(pd.Series(['1-Name', '1.5-Name']))
+
+    def test_get_sessions_by_organization_should_be_same_as_apply(self):
+        """distinct landing pages cleaned once give the same frame as cleaning each row"""
+        landing_page_df = get_landing_page_df(3000, 500)
+
+        sessions_data_df = self.clean_landing_page.get_sessions_by_organization(landing_page_df)
+
+        expected_df = landing_page_df.dropna().copy()
+        expected_df['organization_id_name'] = expected_df['landing_page'].apply(
+            self.clean_landing_page.clean_landing_page_text)
+        expected_df['organization_id'] = expected_df['organization_id_name'].apply(
+            self.clean_landing_page.get_organization_id)
+        expected_df['organization_name'] = expected_df['organization_id_name'].apply(
+            self.clean_landing_page.get_organization_name)
+        pd.testing.assert_frame_equal(sessions_data_df, expected_df[[
+            "landing_page", "organization_id_name", "organization_id", "organization_name",
+            "sessions"]])
+
+    def test_process_data_should_be_same_as_iterrows(self):
+        """joins return the same records as scanning the data for each record"""
+        landing_page_df = get_landing_page_df(3000, 500)
+        sa_community_df = get_sa_community_df(500)
+
+        processed_data_df = self.clean_landing_page.process_data(
+            landing_page_df, sa_community_df)
+
+        expected_df = process_data_iterrows(self.clean_landing_page,
+                                            landing_page_df, sa_community_df)
+        self.assertGreater(len(expected_df), 0)
+        self.assertTrue(expected_df['is_record_available_in_sacommunity_db'].any())
+        self.assertFalse(expected_df['is_record_available_in_sacommunity_db'].all())
+        pd.testing.assert_frame_equal(processed_data_df, expected_df)
+
+    def test_process_data_should_use_first_names_found(self):
+        """names and landing page are the first ones of the organization id"""
+        landing_page_df = pd.DataFrame({
+            'landing_page': ['/org/1-First_Name', '/search', '/org/1-Second_Name',
+                             '/org/2-Other?fbclid=abc'],
+            'sessions': [5, 1, 3, 2]})
+        sa_community_df = pd.DataFrame({'ID_19': [1, 1], 'Org_name': ['First', 'Second']})
+
+        processed_data_df = self.clean_landing_page.process_data(
+            landing_page_df, sa_community_df)
+
+        self.assertEqual(processed_data_df['org_id'].tolist(), [1, 1, 2])
+        self.assertEqual(processed_data_df['sessions_count'].tolist(), [5, 3, 2])
+        self.assertEqual(processed_data_df['landing_page'].tolist(),
+                         [f'{SACOMMUNITY_URL}/org/1-First_Name'] * 2 +
+                         [f'{SACOMMUNITY_URL}/org/2-Other?fbclid=abc'])
+        self.assertEqual(processed_data_df['organization_name_google'].tolist(),
+                         ['First Name', 'First Name', 'Other'])
+        self.assertEqual(processed_data_df['organization_name_sa_community'].tolist(),
+                         ['First', 'First', ''])
+        self.assertEqual(processed_data_df['is_record_available_in_sacommunity_db'].tolist(),
+                         [True, True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for bulk executor helper"""
+import sys
+import os
+import threading
+import time
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.bulk_executor_helper import BulkExecutorHelper
+#pylint: enable=wrong-import-position
+
+
+class TestBulkExecutorHelper(unittest.TestCase):
+    """Test methods for bulk executor helper"""
+
+    def test_iter_results_should_yield_results_as_they_finish_with_errors(self):
+        """slow inputs come last, errors are returned with the index of the input"""
+        def func(value):
+            if value == 'error':
+                raise ValueError('invalid value')
+            time.sleep(value)
+            return value * 10
+
+        results = list(BulkExecutorHelper(3).iter_results(func, [0.3, 'error', 0.1, 0]))
+
+        self.assertEqual([result.index for result in results], [1, 3, 2, 0])
+        self.assertIsInstance(results[0].error, ValueError)
+        self.assertEqual(results[0].input_value, 'error')
+        self.assertEqual([result.value for result in results[1:]], [0, 1, 3])
+        self.assertTrue(all(result.error is None for result in results[1:]))
+
+    def test_iter_results_should_yield_results_in_input_order(self):
+        """results are reassembled in input order"""
+        results = list(BulkExecutorHelper(4).iter_results(
+            lambda value: time.sleep(value) or value, [0.2, 0, 0.1, 0, 0.05], is_ordered=True))
+
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual([result.value for result in results], [0.2, 0, 0.1, 0, 0.05])
+
+    def test_iter_results_should_run_at_most_maximum_workers(self):
+        """inputs run on a fixed number of threads, and are submitted as threads get free"""
+        running = []
+        maximum_running = []
+        lock = threading.Lock()
+        submitted = []
+
+        def func(value):
+            with lock:
+                running.append(value)
+                maximum_running.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(value)
+            return value
+
+        def inputs():
+            for i in range(100):
+                submitted.append(i)
+                yield i
+
+        executor = BulkExecutorHelper(4)
+        results = executor.iter_results(func, inputs())
+        first_result = next(results)
+        self.assertLessEqual(len(submitted), 4 * executor.maximum_pending_per_worker + 1)
+
+        results = [first_result.value] + [result.value for result in results]
+        self.assertEqual(sorted(results), list(range(100)))
+        self.assertEqual(max(maximum_running), 4)
+
+    def test_run_should_return_results_in_input_order(self):
+        """run returns all the results in input order"""
+        results = BulkExecutorHelper(2).run(lambda value: 1 / value, [1, 0, 2])
+
+        self.assertEqual([result.value for result in results], [1, None, 0.5])
+        self.assertIsInstance(results[1].error, ZeroDivisionError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+"""Tests for council lookup helper"""
+import sys
+import os
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.council_lookup_helper import CouncilLookupBackend, FallbackCouncilLookup
+from helpers.council_lookup_helper import HttpCouncilLookup
+#pylint: enable=wrong-import-position
+
+# address -> location of the geocode service
+LOCATIONS = {"130 L'Estrange Street, Glenunga": {'x': 138.64, 'y': -34.95},
+             '1 King William St, Adelaide': {'x': 138.60, 'y': -34.92},
+             '2 Main Rd, Belair': {'x': 138.62, 'y': -35.00},
+             '1 Ocean Rd, Antarctica': {'x': 0, 'y': -80}}
+# (council, ward) -> minimum x, maximum x, minimum y, maximum y of the council feature
+COUNCILS = {('City of Burnside', 'Kensington Park'): (138.63, 138.70, -34.97, -34.90),
+            ('City of Adelaide', 'Central'): (138.58, 138.62, -34.94, -34.90),
+            ('City of Mitcham', 'Overbrook'): (138.55, 138.65, -35.10, -34.98)}
+
+
+class LookupRequestHandler(BaseHTTPRequestHandler):
+    """stand-in of the arcgis geocode and feature services"""
+    def do_GET(self):
+        """json of the geocode or the query of the council layer"""
+        # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        self.server.record_request(url.path)
+        time.sleep(self.server.delay_in_seconds)
+        if url.path == '/geocode/findAddressCandidates':
+            result = self.get_candidates(params['SingleLine'])
+        elif url.path == '/council/query':
+            result = self.get_features(params['geometry'], params['outFields'].split(','))
+        else:
+            result = {'error': {'code': 400, 'message': 'Invalid URL'}}
+        content = json.dumps(result).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        # pylint: enable=invalid-name
+
+    def get_candidates(self, address: str) -> dict:
+        """candidate of the address, none if the address is unknown"""
+        if address == 'error':
+            return {'error': {'code': 498, 'message': 'Invalid token'}}
+        if address not in LOCATIONS:
+            return {'candidates': []}
+        return {'candidates': [{'address': address, 'location': LOCATIONS[address],
+                                'score': 100}]}
+
+    def get_features(self, geometry: str, fields: list[str]) -> dict:
+        """features of the councils intersecting the point"""
+        x, y = [float(value) for value in geometry.split(',')]
+        features = []
+        for (council_name, ward), (min_x, max_x, min_y, max_y) in COUNCILS.items():
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                attributes = {'lga_name': council_name, 'ward_name': ward}
+                features.append({'attributes': {field: attributes[field] for field in fields}})
+        return {'features': features}
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """requests are not logged"""
+
+
+class LookupServer(ThreadingHTTPServer):
+    """stand-in server counting the requests in flight"""
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), LookupRequestHandler)
+        self.delay_in_seconds = 0
+        self.lock = threading.Lock()
+        self.paths = []
+
+    def record_request(self, path: str):
+        """count the request of the path"""
+        with self.lock:
+            self.paths.append(path)
+
+    @property
+    def url(self) -> str:
+        """base url of the server"""
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+# pylint: disable=too-few-public-methods
+class FakeCouncilLookup(CouncilLookupBackend):
+    """lookup counting the addresses, fails for addresses starting with fail"""
+    def __init__(self) -> None:
+        super().__init__(2)
+        self.addresses = []
+
+    def find_council(self, address: str):
+        """council of the fake lookup"""
+        self.addresses.append(address)
+        if address.startswith('fail'):
+            raise ValueError(f'{address} failed')
+        return {'address': address, 'council_name': 'Fake Council', 'electoral_ward': ''}
+# pylint: enable=too-few-public-methods
+
+
+class TestCouncilLookupHelper(unittest.TestCase):
+    """Test methods for council lookup helper"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = LookupServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.server.delay_in_seconds = 0
+        self.server.paths = []
+        self.lookup_settings = {'GeocodeUrl': f'{self.server.url}/geocode/findAddressCandidates',
+                                'CouncilLayerUrl': f'{self.server.url}/council',
+                                'CouncilNameField': 'lga_name',
+                                'ElectoralWardField': 'ward_name',
+                                'MaximumConcurrentRequests': 20,
+                                'TimeoutInSeconds': 5}
+        self.lookup = HttpCouncilLookup(self.lookup_settings)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.lookup.close()
+        return super().tearDown()
+
+    def test_find_council_should_query_geocode_and_council_layer(self):
+        """council and ward of the feature at the location of the address"""
+        council = self.lookup.find_council("130 L'Estrange Street, Glenunga")
+
+        self.assertEqual(council, {'address': "130 L'Estrange Street, Glenunga",
+                                   'council_name': 'City of Burnside',
+                                   'electoral_ward': 'Kensington Park'})
+        self.assertEqual(self.server.paths, ['/geocode/findAddressCandidates', '/council/query'])
+
+    def test_find_council_should_return_empty_when_address_or_council_is_not_found(self):
+        """'' as the lookup web app when there is no result"""
+        self.assertEqual(self.lookup.find_council('Unknown address'), '')
+        self.assertEqual(self.lookup.find_council('1 Ocean Rd, Antarctica'), '')
+
+    def test_find_council_should_raise_error_of_service(self):
+        """error in the json of the service is raised"""
+        with self.assertRaisesRegex(ValueError, 'Invalid token'):
+            self.lookup.find_council('error')
+
+    def test_find_councils_should_look_up_addresses_concurrently_in_order(self):
+        """addresses are looked up at the same time, results are in the order of addresses"""
+        self.server.delay_in_seconds = 0.2
+        addresses = list(LOCATIONS) * 5 + ['error']
+
+        started_at = time.monotonic()
+        results = self.lookup.find_councils(addresses)
+
+        # 21 addresses of 2 requests each in sequence would take at least 8 seconds
+        self.assertLess(time.monotonic() - started_at, 3)
+        self.assertEqual([result.index for result in results], list(range(len(addresses))))
+        self.assertEqual(results[1].value['council_name'], 'City of Adelaide')
+        self.assertEqual(results[2].value['council_name'], 'City of Mitcham')
+        self.assertEqual(results[3].value, '')
+        self.assertIsInstance(results[-1].error, ValueError)
+
+    def test_council_lookup_backend_should_require_find_council(self):
+        """backends without find_council can't be created"""
+        with self.assertRaises(TypeError):
+            CouncilLookupBackend()  # pylint: disable=abstract-class-instantiated
+
+    def test_get_instance_should_share_lookup_of_same_settings(self):
+        """session is shared by the lookups of the same settings"""
+        lookup = HttpCouncilLookup.get_instance(self.lookup_settings)
+
+        self.assertIs(HttpCouncilLookup.get_instance(dict(self.lookup_settings)), lookup)
+        self.assertIsNot(HttpCouncilLookup.get_instance(
+            {**self.lookup_settings, 'TimeoutInSeconds': 1}), lookup)
+
+    def test_fallback_lookup_should_look_up_failed_addresses_with_next_backend(self):
+        """addresses failed by http are looked up by the fallback, not found ones are not"""
+        fallback = FakeCouncilLookup()
+        lookup = FallbackCouncilLookup([self.lookup, fallback])
+        addresses = ['1 King William St, Adelaide', 'error', 'Unknown address', 'error']
+
+        results = lookup.find_councils(addresses)
+
+        self.assertEqual(fallback.addresses, ['error', 'error'])
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3])
+        self.assertEqual([result.value['council_name'] for result in results[1::2]],
+                         ['Fake Council'] * 2)
+        self.assertEqual(results[2].value, '')
+        self.assertEqual(lookup.find_council('error')['council_name'], 'Fake Council')
+
+        results = FallbackCouncilLookup([fallback, FakeCouncilLookup()]).find_councils(['fail'])
+        self.assertIsInstance(results[0].error, ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""Tests for CU dataset reader"""
+import sys
+import os
+import json
+import shutil
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.cu_dataset_reader import CuDatasetReader
+#pylint: enable=wrong-import-position
+
+PAGE_HEADER = 'https://sacommunity.org/admin/settings/datasets'
+
+
+def get_pdf_object(content: bytes, object_id: int) -> bytes:
+    """pdf object"""
+    return b'%d 0 obj\n' % object_id + content + b'\nendobj\n'
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """pdf with a line of text for each string of the pages"""
+    objects = [b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    for lines in pages:
+        texts = [line.replace('(', r'\(').replace(')', r'\)').encode('latin-1')
+                 for line in lines]
+        stream = b'BT /F1 10 Tf 14 TL 40 800 Td ' + \
+            b' '.join(b'(' + text + b') Tj T*' for text in texts) + b' ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    pages_id = len(objects) + len(pages) + 1
+    page_ids = []
+    for i in range(len(pages)):
+        objects.append(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>'
+                       % (pages_id, i + 2))
+        page_ids.append(len(objects))
+    objects.append(b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % i for i in page_ids) +
+                   b'] /Count %d >>' % len(page_ids))
+    objects.append(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for i, content in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += get_pdf_object(content, i + 1)
+    xref_offset = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' \
+        % (len(objects) + 1, len(objects), xref_offset)
+    return pdf
+
+
+def get_dataset_pages(council_names: list[str], rows_per_page: int = 2) -> list[list[str]]:
+    """pages of the cu dataset pdf, with header and a row for each council"""
+    page_count = (len(council_names) + rows_per_page - 1) // rows_per_page
+    pages = []
+    for page in range(page_count):
+        lines = [f'{PAGE_HEADER} {page + 1}/{page_count}']
+        for i in range(page * rows_per_page, min(len(council_names), (page + 1) * rows_per_page)):
+            lines.append(f'{i + 1} {council_names[i]} support@sacommunity.org')
+        pages.append(lines)
+    return pages
+
+
+# pylint: disable=too-few-public-methods
+class CountingCuDatasetReader(CuDatasetReader):
+    """counts the times the pdf is parsed"""
+    parse_count = 0
+
+    def read_cu_dataset_settings_pdf(self, return_dataframe=False, maximum_workers: int = None):
+        """parse the pdf and count it"""
+        CountingCuDatasetReader.parse_count += 1
+        return super().read_cu_dataset_settings_pdf(return_dataframe, maximum_workers)
+# pylint: enable=too-few-public-methods
+
+
+class TestCuDatasetReader(unittest.TestCase):
+    """Test methods for CU dataset reader"""
+    council_names = ['Adelaide Hills Council', 'City of Adelaide', 'City of Burnside',
+                     'City of Holdfast Bay', 'Adelaide Plains Council']
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.pdf_dir = "./tmp/cu_dataset"
+        self.file_path = os.path.join(self.pdf_dir, "cu_dataset.pdf")
+
+    def setUp(self) -> None:
+        # pylint: disable=protected-access
+        CuDatasetReader._search_indexes.clear()
+        # pylint: enable=protected-access
+        CountingCuDatasetReader.parse_count = 0
+        self.save_pdf(self.council_names)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the pdf directory after each test run"""
+        shutil.rmtree(self.pdf_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def save_pdf(self, council_names: list[str]):
+        """save cu dataset pdf of the councils"""
+        os.makedirs(self.pdf_dir, exist_ok=True)
+        with open(self.file_path, 'wb') as file_obj:
+            file_obj.write(make_pdf(get_dataset_pages(council_names)))
+
+    def test_read_cu_dataset_settings_pdf_should_return_rows_without_header(self):
+        """dataset id and council name of each row"""
+        datasets = CuDatasetReader(self.file_path).read_cu_dataset_settings_pdf()
+
+        self.assertEqual(datasets, [{'dataset_id': str(i + 1), 'council_name': name}
+                                    for i, name in enumerate(self.council_names)])
+
+    def test_read_cu_dataset_settings_pdf_should_read_pages_in_order_with_processes(self):
+        """rows extracted by a process pool are the same as the rows extracted in order"""
+        # page numbers of the pages read so far are removed from the rows
+        council_names = [f'Council {i} {i % 35}/30' for i in range(60)]
+        self.save_pdf(council_names)
+        cu_dataset_reader = CuDatasetReader(self.file_path)
+        cu_dataset_reader.pages_per_task = 2
+
+        datasets = cu_dataset_reader.read_cu_dataset_settings_pdf(maximum_workers=2)
+
+        self.assertEqual(datasets, cu_dataset_reader.read_cu_dataset_settings_pdf())
+        self.assertEqual([d['council_name'] for d in datasets[:2]],
+                         ['Council 0 0/30', 'Council 1'])
+        self.assertEqual(datasets[40]['council_name'], 'Council 40')
+        self.assertEqual(datasets[59], {'dataset_id': '60', 'council_name': 'Council 59 2'})
+
+    def test_search_dataset_id_from_council_name_should_prefer_exact_then_prefix_then_words(self):
+        """best match is returned, the first one of the pdf within a match"""
+        cu_dataset_reader = CuDatasetReader(self.file_path)
+
+        def search(council_name: str):
+            dataset = cu_dataset_reader.search_dataset_id_from_council_name(council_name)
+            return None if dataset is None else dataset['council_name']
+
+        self.assertEqual(search('city of adelaide'), 'City of Adelaide')
+        self.assertEqual(search('Adelaide'), 'Adelaide Hills Council')
+        self.assertEqual(search('city of'), 'City of Adelaide')
+        self.assertEqual(search('plains adelaide'), 'Adelaide Plains Council')
+        self.assertEqual(search('fast'), 'City of Holdfast Bay')
+        self.assertIsNone(search('unley'))
+
+    def test_search_dataset_id_from_council_name_should_parse_pdf_once(self):
+        """datasets are kept in memory and in the json file next to the pdf"""
+        CountingCuDatasetReader(self.file_path).search_dataset_id_from_council_name('burnside')
+        CountingCuDatasetReader(self.file_path).search_dataset_id_from_council_name('holdfast')
+        self.assertEqual(CountingCuDatasetReader.parse_count, 1)
+
+        # pylint: disable=protected-access
+        CuDatasetReader._search_indexes.clear()
+        # pylint: enable=protected-access
+        dataset = CountingCuDatasetReader(self.file_path) \
+            .search_dataset_id_from_council_name('burnside')
+        self.assertEqual(dataset, {'dataset_id': '3', 'council_name': 'City of Burnside'})
+        self.assertEqual(CountingCuDatasetReader.parse_count, 1)
+        with open(CuDatasetReader(self.file_path).datasets_file_path, 'r',
+                  encoding='UTF-8') as file_obj:
+            self.assertEqual(len(json.load(file_obj)['datasets']), len(self.council_names))
+
+    def test_search_dataset_id_from_council_name_should_parse_changed_pdf(self):
+        """pdf is parsed again when its content changes"""
+        cu_dataset_reader = CountingCuDatasetReader(self.file_path)
+        self.assertIsNone(cu_dataset_reader.search_dataset_id_from_council_name('unley'))
+
+        self.save_pdf(self.council_names + ['City of Unley'])
+
+        dataset = cu_dataset_reader.search_dataset_id_from_council_name('unley')
+        self.assertEqual(dataset, {'dataset_id': '6', 'council_name': 'City of Unley'})
+        self.assertEqual(CountingCuDatasetReader.parse_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
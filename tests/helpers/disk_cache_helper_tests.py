@@ -0,0 +1,78 @@
+"""Tests for disk cache helper"""
+import sys
+import os
+import shutil
+import time
+import unittest
+from unittest import mock
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.disk_cache_helper import DiskCacheHelper
+#pylint: enable=wrong-import-position
+
+class TestDiskCacheHelper(unittest.TestCase):
+    """Test methods for disk cache helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.cache_dir = "./tmp/disk_cache"
+
+    def tearDown(self) -> None:
+        """delete the cache directory after each test run"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_get_should_return_cached_value_and_count_hits_and_misses(self):
+        """value is returned for the same key"""
+        cache = DiskCacheHelper(self.cache_dir, 1024 * 1024)
+        key = {'viewId': '1', 'pageToken': None}
+        self.assertIsNone(cache.get(key))
+        cache.set(key, {'reports': [1, 2]})
+
+        self.assertEqual(cache.get({'pageToken': None, 'viewId': '1'}), {'reports': [1, 2]})
+        self.assertIsNone(cache.get({'viewId': '1', 'pageToken': '2'}))
+        statistics = cache.get_statistics()
+        self.assertEqual(statistics['hits'], 1)
+        self.assertEqual(statistics['misses'], 2)
+
+    def test_get_should_return_none_for_expired_value(self):
+        """value expires after the time to live"""
+        cache = DiskCacheHelper(self.cache_dir, 1024 * 1024)
+        cache.set('expired', 1, ttl_in_seconds=-1)
+        cache.set('live', 2, ttl_in_seconds=60)
+
+        self.assertIsNone(cache.get('expired'))
+        self.assertEqual(cache.get('live'), 2)
+
+    def test_set_should_evict_least_recently_used_values(self):
+        """oldest values are removed when the cache is over its maximum size"""
+        cache = DiskCacheHelper(self.cache_dir, 1024 * 1024)
+        value = 'x' * 400
+        for key in ['a', 'b', 'c']:
+            cache.set(key, value)
+            # modified times need to be different for the order of use
+            time.sleep(0.01)
+        cache.get('a')
+        cache.max_size_in_bytes = cache.get_cache_size()
+        cache.set('d', value)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), value)
+        self.assertEqual(cache.get('d'), value)
+
+    def test_invalidate_should_remove_value(self):
+        """invalidated value is not returned"""
+        cache = DiskCacheHelper(self.cache_dir, 1024 * 1024)
+        cache.set('key', 1)
+        cache.invalidate('key')
+        self.assertIsNone(cache.get('key'))
+
+    def test_get_should_return_value_evicted_after_it_is_read(self):
+        """value removed by another process while it is read is still returned"""
+        cache = DiskCacheHelper(self.cache_dir, 1024 * 1024)
+        cache.set('key', 1)
+        with mock.patch('helpers.disk_cache_helper.os.utime', side_effect=FileNotFoundError):
+            self.assertEqual(cache.get('key'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
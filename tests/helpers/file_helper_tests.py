@@ -0,0 +1,135 @@
+"""Tests for file helper methods"""
+import sys
+import os
+import unittest
+from datetime import date
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+import pandas as pd
+import pyarrow.parquet as pq
+from helpers.enums import DataFrequency, DataModule, StorageFormat
+from helpers.file_helper import FileHelper
+#pylint: enable=wrong-import-position
+
+class TestFileHelper(unittest.TestCase):
+    """Test methods for file helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.file_helper = FileHelper()
+        self.file_path = "./tmp/file_helper/data.csv"
+
+    def tearDown(self) -> None:
+        """delete the data directory after each test run"""
+        self.file_helper.remove_directory(self.file_path)
+        return super().tearDown()
+
+    def test_save_dfs_to_csv_should_save_all_dataframes_with_one_header(self):
+        """pages are appended to the same file"""
+        pages = (pd.DataFrame([{'dataset_id': str(i), 'sessions': i}]) for i in range(3))
+        total_rows = self.file_helper.save_dfs_to_csv(pages, self.file_path)
+
+        self.assertEqual(total_rows, 3)
+        data_df = pd.read_csv(self.file_path)
+        self.assertEqual(list(data_df.columns), ['dataset_id', 'sessions'])
+        self.assertEqual(list(data_df['sessions']), [0, 1, 2])
+
+    def test_save_dfs_to_csv_should_keep_existing_file_on_error(self):
+        """file is replaced only when all the pages are written"""
+        self.file_helper.save_df_to_csv(pd.DataFrame([{'sessions': 1}]), self.file_path)
+
+        def failing_pages():
+            yield pd.DataFrame([{'sessions': 2}])
+            raise ValueError('page failed')
+
+        self.assertRaises(ValueError, self.file_helper.save_dfs_to_csv,
+                          failing_pages(), self.file_path)
+        self.assertEqual(list(pd.read_csv(self.file_path)['sessions']), [1])
+        self.assertFalse(os.path.exists(f'{self.file_path}.tmp'))
+
+    def get_age_df(self, date_obj: date, dataset_ids: list[str]) -> pd.DataFrame:
+        """age data of the day, one row per dataset id"""
+        return pd.DataFrame([{'start_date': pd.Timestamp(date_obj),
+                              'end_date': pd.Timestamp(date_obj),
+                              'dataset_id': dataset_id,
+                              'age_bracket': '18-24',
+                              'sessions': i} for i, dataset_id in enumerate(dataset_ids)])
+
+    def save_age_data(self, storage_format: StorageFormat):
+        """save age data of 3 days, 2 datasets a day"""
+        root_dir = os.path.dirname(self.file_path)
+        for day in [1, 2, 3]:
+            file_path = self.file_helper.get_data_file_path(root_dir, 'DAILY', 'AGE',
+                                                            date(2022, 1, day), storage_format)
+            self.file_helper.save_df_to_file(self.get_age_df(date(2022, 1, day), ['2', '1']),
+                                             file_path, DataModule.AGE)
+        return file_path
+
+    def test_save_df_to_parquet_should_partition_by_date(self):
+        """parquet file of each day is saved in the partition of the day"""
+        file_path = self.save_age_data(StorageFormat.PARQUET)
+        self.assertTrue(file_path.endswith(
+            os.path.join('year=2022', 'month=01', 'day=03', 'part-0.parquet')))
+
+    def test_read_range_should_read_days_columns_and_datasets(self):
+        """same data is read from parquet and csv files, by date range and dataset ids"""
+        for storage_format in [StorageFormat.PARQUET, StorageFormat.CSV]:
+            self.save_age_data(storage_format)
+            data_df = self.file_helper.read_range(DataFrequency.DAILY, DataModule.AGE,
+                                                  date(2022, 1, 2), date(2022, 1, 5),
+                                                  dataset_ids=[1],
+                                                  columns=['start_date', 'sessions'],
+                                                  root_dir=os.path.dirname(self.file_path),
+                                                  storage_format=storage_format)
+            self.assertEqual(list(data_df.columns), ['start_date', 'sessions'])
+            self.assertEqual(list(data_df['start_date']),
+                             [pd.Timestamp(2022, 1, 2), pd.Timestamp(2022, 1, 3)])
+            self.assertEqual(list(data_df['sessions']), [1, 1])
+
+            data_df = self.file_helper.read_range(DataFrequency.DAILY, DataModule.AGE,
+                                                  date(2022, 1, 1), date(2022, 1, 1),
+                                                  root_dir=os.path.dirname(self.file_path),
+                                                  storage_format=storage_format)
+            self.assertEqual(list(data_df['dataset_id']), ['1', '2'] if
+                             storage_format == StorageFormat.PARQUET else ['2', '1'])
+            self.assertIsInstance(data_df['age_bracket'].dtype, pd.CategoricalDtype)
+
+    def test_read_range_should_read_csv_days_without_data(self):
+        """days without data are saved with header, and blank files are read as empty"""
+        root_dir = os.path.dirname(self.file_path)
+        self.save_age_data(StorageFormat.CSV)
+        file_path = self.file_helper.get_data_file_path(root_dir, 'DAILY', 'AGE',
+                                                        date(2022, 1, 2), StorageFormat.CSV)
+        self.file_helper.save_dfs_to_file([pd.DataFrame()], file_path, DataModule.AGE)
+        with open(file_path, 'r', encoding='UTF-8') as file_obj:
+            self.assertTrue(file_obj.read().startswith('start_date,end_date,dataset_id'))
+        blank_file_path = self.file_helper.get_data_file_path(root_dir, 'DAILY', 'AGE',
+                                                              date(2022, 1, 3),
+                                                              StorageFormat.CSV)
+        with open(blank_file_path, 'w', encoding='UTF-8') as file_obj:
+            file_obj.write('\n')
+
+        data_df = self.file_helper.read_range(DataFrequency.DAILY, DataModule.AGE,
+                                              date(2022, 1, 1), date(2022, 1, 3),
+                                              root_dir=root_dir,
+                                              storage_format=StorageFormat.CSV)
+        self.assertEqual(list(data_df['start_date']), [pd.Timestamp(2022, 1, 1)] * 2)
+
+    def test_save_df_to_parquet_should_apply_schema_of_data_module(self):
+        """columns are saved in the order and types of the schema"""
+        file_path = os.path.join(os.path.dirname(self.file_path), 'age.parquet')
+        age_df = self.get_age_df(date(2022, 1, 1), ['1'])
+        age_df['dataset_id'] = age_df['dataset_id'].astype('category')
+        self.file_helper.save_df_to_parquet(age_df[['sessions', 'dataset_id', 'start_date',
+                                                    'age_bracket', 'end_date']],
+                                            file_path, DataModule.AGE)
+
+        schema = pq.read_schema(file_path)
+        self.assertTrue(schema.equals(self.file_helper.get_schema(DataModule.AGE)))
+        self.assertRaises(ValueError, self.file_helper.save_df_to_parquet,
+                          age_df.drop(columns=['sessions']), file_path, DataModule.AGE)
+        self.assertEqual(pq.read_table(file_path).num_rows, 1)
+        self.assertFalse(os.path.exists(f'{file_path}.tmp'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,9 @@
 """Tests methods for string helper methods"""
 import sys
 import os
+import json
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 # insert current path to system path, so that we can import python file
 sys.path.insert(1, os.getcwd())
 # disable wrong import position,
@@ -65,6 +66,33 @@ class TestMetadataHelper(unittest.TestCase):
         all_metadata = self.metadata_helper.load_all_metadata()
         self.assertEqual(len(all_metadata), 1)
 
+    def test_save_metadata_should_append_history(self):
+        """every save is kept in the history, with its duration"""
+        job_config = JobConfig(DataFrequency.DAILY, DataModule.GENDER)
+        self.metadata_helper.save_metadata(job_config, date(2022, 1, 1), JobStatus.IN_PROGRESS)
+        self.metadata_helper.save_metadata(job_config, date(2022, 1, 1), JobStatus.SUCCESS,
+                                           duration_in_seconds=1.5)
+
+        history = self.metadata_helper.load_history(DataFrequency.DAILY, DataModule.GENDER)
+        self.assertEqual([h['job_status']['value'] for h in history],
+                         [JobStatus.IN_PROGRESS.value, JobStatus.SUCCESS.value])
+        self.assertEqual(history[-1]['duration_in_seconds'], 1.5)
+        metadata = self.metadata_helper.load_metadata(DataFrequency.DAILY, DataModule.GENDER)
+        self.assertEqual(metadata.job_status['value'], JobStatus.SUCCESS.value)
+
+    def test_load_metadata_should_migrate_json_file(self):
+        """metadata of the json file is imported once"""
+        json_metadata = self.metadata_helper.new_metadata(
+            DataFrequency.DAILY, DataModule.AGE, date(2022, 5, 1), JobStatus.SUCCESS)
+        self.file_helper.create_directory_excluding_filename(self.metadata_helper.file_path)
+        with open(self.metadata_helper.file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump([json_metadata], file_obj)
+
+        metadata = self.metadata_helper.load_metadata(DataFrequency.DAILY, DataModule.AGE)
+        self.assertEqual(metadata.last_data_extraction_date, date(2022, 5, 1))
+        self.assertFalse(os.path.exists(self.metadata_helper.file_path))
+        self.assertTrue(os.path.exists(f'{self.metadata_helper.file_path}.migrated'))
+
 
 if __name__ == '__main__':
     unittest.main()
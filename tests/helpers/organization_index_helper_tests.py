@@ -0,0 +1,76 @@
+"""Tests for organization index helper"""
+import sys
+import os
+import shutil
+import unittest
+import pandas as pd
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.organization_index_helper import OrganizationIndexHelper
+#pylint: enable=wrong-import-position
+
+class TestOrganizationIndexHelper(unittest.TestCase):
+    """Test methods for organization index helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.export_dir = "./tmp/organization_index"
+        self.export_file_path = os.path.join(self.export_dir, "sa_community_export.csv")
+
+    def setUp(self) -> None:
+        self.save_export([[1, 'First', 'Adelaide'], [2, 'Second', 'Burnside'],
+                          [1, 'First Again', 'Unley'], [None, 'No Id', 'Unley']])
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the export directory after each test run"""
+        shutil.rmtree(self.export_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def save_export(self, rows: list):
+        """save sa community export csv"""
+        os.makedirs(self.export_dir, exist_ok=True)
+        pd.DataFrame(rows, columns=['ID_19', 'Org_name', 'Council']).to_csv(
+            self.export_file_path, index=False)
+
+    def test_get_organization_should_return_first_record_of_organization(self):
+        """entries are keyed by id and keep the columns of the first record"""
+        organization_index = OrganizationIndexHelper(self.export_file_path)
+
+        self.assertEqual(organization_index.get_organization(1),
+                         {'Org_name': 'First', 'Council': 'Adelaide'})
+        self.assertEqual(organization_index.get_organization(2),
+                         {'Org_name': 'Second', 'Council': 'Burnside'})
+        self.assertIsNone(organization_index.get_organization(3))
+        self.assertEqual(organization_index.get_organizations([2, 3, 1])['Org_name']
+                         .fillna('').tolist(), ['Second', '', 'First'])
+        self.assertTrue(os.path.exists(organization_index.index_file_path))
+
+    def test_load_should_read_saved_index_of_same_export(self):
+        """a new index of the same export reads the saved index instead of the export"""
+        organization_index = OrganizationIndexHelper(self.export_file_path)
+        organization_index.load()
+        index_modified_time = os.stat(organization_index.index_file_path).st_mtime_ns
+
+        organizations_df = OrganizationIndexHelper(self.export_file_path).load()
+
+        self.assertEqual(os.stat(organization_index.index_file_path).st_mtime_ns,
+                         index_modified_time)
+        self.assertEqual(organizations_df.index.tolist(), [1, 2])
+        self.assertEqual(organizations_df.loc[1, 'Council'], 'Adelaide')
+
+    def test_load_should_rebuild_index_when_export_changes(self):
+        """the index is rebuilt when the hash of the export changes"""
+        organization_index = OrganizationIndexHelper(self.export_file_path)
+        self.assertEqual(organization_index.get_organization(2)['Org_name'], 'Second')
+
+        self.save_export([[2, 'Second Renamed', 'Burnside'], [3, 'Third', 'Unley']])
+
+        self.assertEqual(organization_index.get_organization(2)['Org_name'], 'Second Renamed')
+        self.assertIsNone(organization_index.get_organization(1))
+        self.assertEqual(OrganizationIndexHelper(self.export_file_path).load().index.tolist(),
+                         [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
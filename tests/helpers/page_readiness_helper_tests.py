@@ -0,0 +1,95 @@
+"""Tests for page readiness helper"""
+import sys
+import os
+import time
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.page_readiness_helper import LatencyHistogram, PageReadinessHelper
+#pylint: enable=wrong-import-position
+
+
+# pylint: disable=too-few-public-methods
+class FakeElement():
+    """element of the fake driver"""
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def is_displayed(self) -> bool:
+        """element is visible"""
+        return True
+
+
+class FakeDriver():
+    """driver whose element shows the texts of the timeline, (seconds after start, text)"""
+    def __init__(self, timeline: list[tuple[float, str]]) -> None:
+        self.timeline = timeline
+        self.started_at = time.monotonic()
+
+    def find_elements(self, by_type, xpath):
+        """elements of the xpath, the text of the timeline at this time"""
+        elapsed = time.monotonic() - self.started_at
+        texts = [text for at, text in self.timeline if at <= elapsed]
+        return [FakeElement(texts[-1])] if len(texts) > 0 and by_type and xpath else []
+# pylint: enable=too-few-public-methods
+
+
+class TestPageReadinessHelper(unittest.TestCase):
+    """Test methods for page readiness helper"""
+
+    def setUp(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.page_readiness = PageReadinessHelper(self.histogram, poll_interval_in_seconds=0.01)
+        return super().setUp()
+
+    def test_wait_for_text_should_return_as_soon_as_text_is_not_excluded(self):
+        """text is returned without a fixed sleep"""
+        driver = FakeDriver([(0, 'Loading...'), (0.1, 'Council Name Burnside')])
+
+        started_at = time.monotonic()
+        text, is_ready = self.page_readiness.wait_for_text(
+            driver, '//div', ['Loading...', ''], timeout_in_seconds=5)
+
+        self.assertEqual(text, 'Council Name Burnside')
+        self.assertTrue(is_ready)
+        self.assertLess(time.monotonic() - started_at, 1)
+        self.assertEqual(self.histogram.get_statistics()['ready']['count'], 1)
+
+    def test_wait_for_text_should_wait_for_stable_text(self):
+        """text changing within the stable period is not returned"""
+        driver = FakeDriver([(0, 'Results:1'), (0.05, 'Council'), (0.15, 'Council Name Unley')])
+
+        text, is_ready = self.page_readiness.wait_for_text(
+            driver, '//div', ['Results:1'], timeout_in_seconds=5, stable_for_seconds=0.2)
+
+        self.assertEqual(text, 'Council Name Unley')
+        self.assertTrue(is_ready)
+
+    def test_wait_for_text_should_return_last_text_after_timeout(self):
+        """last text seen is returned when the text is never ready"""
+        driver = FakeDriver([(0, 'Loading...')])
+
+        text, is_ready = self.page_readiness.wait_for_text(
+            driver, '//div', ['Loading...'], timeout_in_seconds=0.1)
+
+        self.assertEqual(text, 'Loading...')
+        self.assertFalse(is_ready)
+        self.assertEqual(self.histogram.get_statistics()['timeout']['count'], 1)
+
+    def test_latency_histogram_should_count_latencies_in_buckets(self):
+        """percentiles are the upper bounds of the buckets"""
+        for seconds in [0.05, 0.3, 0.4, 1.5, 700]:
+            self.histogram.record(seconds)
+
+        statistics = self.histogram.get_statistics()['ready']
+        self.assertEqual(statistics['count'], 5)
+        self.assertEqual(statistics['p50'], 0.5)
+        self.assertEqual(statistics['p90'], float('inf'))
+        self.assertEqual(statistics['buckets'][0.1], 1)
+        self.assertEqual(statistics['buckets'][0.5], 2)
+        self.assertEqual(statistics['buckets'][2], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
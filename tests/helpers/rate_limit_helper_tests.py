@@ -0,0 +1,52 @@
+"""Tests for rate limit helper"""
+import sys
+import os
+import shutil
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.rate_limit_helper import RateLimitHelper
+#pylint: enable=wrong-import-position
+
+class TestRateLimitHelper(unittest.TestCase):
+    """Test methods for rate limit helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.state_file_path = "./tmp/rate_limit/state.json"
+
+    def tearDown(self) -> None:
+        """delete the state file after each test run"""
+        shutil.rmtree(os.path.dirname(self.state_file_path), ignore_errors=True)
+        return super().tearDown()
+
+    def test_try_acquire_should_wait_when_any_budget_is_used(self):
+        """the smallest budget limits the requests"""
+        rate_limiter = RateLimitHelper({'second': (10, 1), 'day': (2, 86400)})
+        self.assertEqual(rate_limiter.try_acquire(), 0)
+        self.assertEqual(rate_limiter.try_acquire(), 0)
+
+        wait_time = rate_limiter.try_acquire()
+        self.assertGreater(wait_time, 1)
+        self.assertAlmostEqual(rate_limiter.get_remaining_tokens()['day'], 0, places=2)
+
+    def test_state_file_should_share_budget_between_limiters(self):
+        """limiters of different processes share the state file"""
+        limits = {'100_seconds': (3, 100)}
+        first_limiter = RateLimitHelper(limits, self.state_file_path)
+        second_limiter = RateLimitHelper(limits, self.state_file_path)
+        first_limiter.acquire()
+        first_limiter.acquire()
+        second_limiter.acquire()
+
+        self.assertGreater(second_limiter.try_acquire(), 0)
+        self.assertGreater(first_limiter.try_acquire(), 0)
+
+    def test_drain_should_empty_the_budget(self):
+        """drained budget has no tokens left"""
+        rate_limiter = RateLimitHelper({'second': (10, 1), '100_seconds': (100, 100)})
+        rate_limiter.drain('100_seconds')
+        self.assertGreater(rate_limiter.try_acquire(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
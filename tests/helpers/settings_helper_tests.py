@@ -0,0 +1,67 @@
+"""Tests for settings helper"""
+import sys
+import os
+import json
+import shutil
+import unittest
+from unittest import mock
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.settings_helper import SettingsHelper
+#pylint: enable=wrong-import-position
+
+class TestSettingsHelper(unittest.TestCase):
+    """Test methods for settings helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.file_path = "./tmp/settings/app_settings.json"
+
+    def setUp(self) -> None:
+        """write settings file, and check it for changes on every call"""
+        self.save_settings({'GoogleAnalytics': {'PageSize': 100},
+                            'Jobs': {'MaximumWorkers': 2}})
+        self.settings_helper = SettingsHelper(self.file_path)
+        self.settings_helper.reload_check_interval_in_seconds = 0
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the settings file after each test run"""
+        shutil.rmtree(os.path.dirname(self.file_path), ignore_errors=True)
+        return super().tearDown()
+
+    def save_settings(self, settings: dict, mtime_ns: int = None):
+        """save settings to file, with the modified time if given"""
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump(settings, file_obj)
+        if mtime_ns is not None:
+            os.utime(self.file_path, ns=(mtime_ns, mtime_ns))
+
+    def test_get_snapshot_should_be_shared_until_file_changes(self):
+        """snapshot is loaded once, and reloaded when the file is modified"""
+        snapshot = self.settings_helper.get_snapshot()
+        self.assertIs(SettingsHelper(self.file_path).get_snapshot(), snapshot)
+        self.assertEqual(snapshot.jobs_maximum_workers, 2)
+        self.assertEqual(snapshot.jobs_fetch_period, 'DAILY')
+        self.assertIsNone(snapshot.rate_limit)
+
+        mtime_ns = os.stat(self.file_path).st_mtime_ns
+        self.save_settings({'GoogleAnalytics': {'PageSize': 200}}, mtime_ns + 1_000_000_000)
+        self.assertEqual(self.settings_helper.get_google_analytics_page_size(), 200)
+        self.assertEqual(self.settings_helper.get_jobs_maximum_workers(), 1)
+
+    def test_get_snapshot_should_apply_environment_overrides(self):
+        """environment variables override the settings of the file"""
+        with mock.patch.dict(os.environ, {'APP_SETTINGS__Jobs__MaximumWorkers': '8',
+                                          'APP_SETTINGS__RateLimit__Enabled': 'true',
+                                          'APP_SETTINGS__SACommunityUrl': 'https://test'}):
+            self.assertEqual(self.settings_helper.get_jobs_maximum_workers(), 8)
+            self.assertEqual(self.settings_helper.get_rate_limit_settings(), {'Enabled': True})
+            self.assertEqual(self.settings_helper.get_sacommunity_url(), 'https://test')
+            self.assertEqual(self.settings_helper.get_google_analytics_page_size(), 100)
+
+        self.assertEqual(self.settings_helper.get_jobs_maximum_workers(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
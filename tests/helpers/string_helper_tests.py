@@ -41,5 +41,12 @@ class TestStringHelper(unittest.TestCase):
         # check non emtpy string
         self.assertFalse(self.string_helper.is_null_or_whitespace("something"))
 
+    def test_normalize_address_should_return_same_address_for_ways_of_writing_it(self):
+        """case, spaces, punctuation and abbreviations are normalized"""
+        self.assertEqual(self.string_helper.normalize_address("130  L'Estrange St., GLENUNGA"),
+                         "130 l'estrange street glenunga")
+        self.assertEqual(self.string_helper.normalize_address("Unit 2/15 Fullarton Rd,Kent Town"),
+                         self.string_helper.normalize_address("unit 2/15 fullarton road kent town"))
+
 if __name__ == '__main__':
     unittest.main()
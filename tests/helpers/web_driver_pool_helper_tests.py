@@ -0,0 +1,134 @@
+"""Tests for web driver pool helper"""
+import sys
+import os
+import threading
+import time
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from selenium.common.exceptions import TimeoutException as SeleniumTimeoutException
+from selenium.common.exceptions import WebDriverException
+from helpers.web_driver_pool_helper import WebDriverPoolHelper
+#pylint: enable=wrong-import-position
+
+
+class FakeDriver():
+    """records the calls of the pool"""
+    def __init__(self) -> None:
+        self.cookies_deleted = 0
+        self.is_quit = False
+
+    def delete_all_cookies(self):
+        """delete cookies"""
+        self.cookies_deleted += 1
+
+    def execute_script(self, script: str):
+        """execute script"""
+        return script
+
+    def get(self, url: str):
+        """load url"""
+        return url
+
+    def quit(self):
+        """quit browser"""
+        self.is_quit = True
+
+
+class TestWebDriverPoolHelper(unittest.TestCase):
+    """Test methods for web driver pool helper"""
+
+    def setUp(self) -> None:
+        self.drivers = []
+        return super().setUp()
+
+    def create_driver(self) -> FakeDriver:
+        """driver factory of the pool"""
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+    def test_driver_should_reuse_warm_driver_and_clear_it(self):
+        """the same driver is handed out again after clearing cookies"""
+        pool = WebDriverPoolHelper(self.create_driver, 2)
+        with pool.driver() as driver:
+            first_driver = driver
+        with pool.driver() as driver:
+            self.assertIs(driver, first_driver)
+
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(first_driver.cookies_deleted, 2)
+        self.assertEqual(pool.get_statistics(), {'open': 1, 'idle': 1, 'created': 1})
+
+    def test_driver_should_be_recycled_after_maximum_pages(self):
+        """driver is quit after maximum pages and a new one is created"""
+        pool = WebDriverPoolHelper(self.create_driver, 1, maximum_pages_per_driver=2)
+        for _ in range(3):
+            with pool.driver():
+                pass
+
+        self.assertEqual(len(self.drivers), 2)
+        self.assertTrue(self.drivers[0].is_quit)
+        self.assertFalse(self.drivers[1].is_quit)
+
+    def test_driver_should_be_quit_when_it_fails(self):
+        """a crashed driver is quit, a timeout keeps the driver"""
+        pool = WebDriverPoolHelper(self.create_driver, 1)
+        with self.assertRaises(SeleniumTimeoutException):
+            with pool.driver():
+                raise SeleniumTimeoutException('timeout')
+        self.assertFalse(self.drivers[0].is_quit)
+
+        with self.assertRaises(WebDriverException):
+            with pool.driver():
+                raise WebDriverException('chrome not reachable')
+        self.assertTrue(self.drivers[0].is_quit)
+
+        with pool.driver() as driver:
+            self.assertIs(driver, self.drivers[1])
+
+    def test_driver_should_wait_for_free_driver(self):
+        """at most maximum drivers are open at a time"""
+        pool = WebDriverPoolHelper(self.create_driver, 2)
+        in_use = []
+        maximum_in_use = []
+        lock = threading.Lock()
+
+        def use_driver():
+            with pool.driver() as driver:
+                with lock:
+                    in_use.append(driver)
+                    maximum_in_use.append(len(in_use))
+                time.sleep(0.05)
+                with lock:
+                    in_use.remove(driver)
+
+        threads = [threading.Thread(target=use_driver) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(maximum_in_use), 2)
+        self.assertEqual(len(self.drivers), 2)
+
+    def test_close_should_quit_drivers(self):
+        """idle drivers are quit on close, drivers in use when they are returned"""
+        pool = WebDriverPoolHelper(self.create_driver, 2)
+        with pool.driver():
+            with pool.driver():
+                pass
+            pool.close()
+            self.assertTrue(self.drivers[1].is_quit)
+            self.assertFalse(self.drivers[0].is_quit)
+
+        self.assertTrue(self.drivers[0].is_quit)
+        self.assertEqual(pool.get_statistics()['open'], 0)
+        with self.assertRaises(RuntimeError):
+            with pool.driver():
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for work queue helper"""
+import sys
+import os
+import shutil
+import time
+import unittest
+from datetime import date
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from dtos.date_range_dto import DateRangeDto
+from helpers.enums import DataFrequency, DataModule, WorkUnitStatus
+from helpers.work_queue_helper import WorkQueueHelper
+#pylint: enable=wrong-import-position
+
+class TestWorkQueueHelper(unittest.TestCase):
+    """Test methods for work queue helper"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.db_path = "./tmp/work_queue/work_queue.db"
+
+    def setUp(self) -> None:
+        """enqueue three days of age"""
+        self.work_queue = WorkQueueHelper(self.db_path, lease_in_seconds=60, maximum_attempts=2)
+        self.work_queue.enqueue(DataFrequency.DAILY, DataModule.AGE,
+                                [DateRangeDto(date(2022, 1, day), date(2022, 1, day))
+                                 for day in [1, 2, 3]])
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the work queue after each test run"""
+        shutil.rmtree(os.path.dirname(self.db_path), ignore_errors=True)
+        return super().tearDown()
+
+    def test_claim_should_give_each_unit_to_one_worker(self):
+        """workers claim different units, oldest first"""
+        first_unit = self.work_queue.claim('worker-1')
+        second_unit = WorkQueueHelper(self.db_path).claim('worker-2')
+
+        self.assertEqual(first_unit.start_date, date(2022, 1, 1))
+        self.assertEqual(second_unit.start_date, date(2022, 1, 2))
+        self.assertTrue(self.work_queue.complete(first_unit, 'worker-1'))
+        self.assertFalse(self.work_queue.complete(second_unit, 'worker-1'))
+        self.assertEqual(self.work_queue.get_counts(), {'PENDING': 1, 'CLAIMED': 1, 'DONE': 1})
+
+    def test_claim_should_reclaim_unit_with_expired_lease(self):
+        """unit of a dead worker is claimed again, and the dead worker loses the lease"""
+        self.work_queue.lease_in_seconds = 0.01
+        work_unit = self.work_queue.claim('dead-worker')
+        time.sleep(0.05)
+
+        self.work_queue.lease_in_seconds = 60
+        work_units = [self.work_queue.claim('worker') for _ in range(3)]
+        self.assertEqual(work_units[0].unit_id, work_unit.unit_id)
+        self.assertEqual(work_units[0].attempts, 2)
+        self.assertFalse(self.work_queue.heartbeat(work_unit, 'dead-worker'))
+        self.assertTrue(self.work_queue.heartbeat(work_units[0], 'worker'))
+
+    def test_fail_should_retry_till_maximum_attempts(self):
+        """failed unit is pending again, and failed after maximum attempts"""
+        work_unit = self.work_queue.claim('worker', module=DataModule.AGE)
+        self.work_queue.fail(work_unit, 'worker', 'api error')
+        work_unit = self.work_queue.claim('worker')
+        self.assertEqual(work_unit.attempts, 2)
+        self.work_queue.fail(work_unit, 'worker', 'api error')
+
+        units = self.work_queue.get_units(DataFrequency.DAILY, DataModule.AGE)
+        self.assertEqual(units[0].status, WorkUnitStatus.FAILED)
+        self.assertEqual(units[0].failure_reason, 'api error')
+
+        # enqueue again retries the failed unit
+        added = self.work_queue.enqueue(DataFrequency.DAILY, DataModule.AGE,
+                                        [DateRangeDto(date(2022, 1, day), date(2022, 1, day))
+                                         for day in [1, 2, 3, 4]])
+        self.assertEqual(added, 2)
+        self.assertEqual(self.work_queue.claim('worker').start_date, date(2022, 1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for google analytics job planner"""
+import sys
+import os
+import json
+import math
+import shutil
+import unittest
+from datetime import date
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.enums import DataFrequency, DataModule, JobStatus
+from helpers.metadata_helper import JobConfig, MetadataHelper
+from helpers.settings_helper import SettingsHelper
+from jobs.google_analytics_job_planner import GoogleAnalyticsJobPlanner
+from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+#pylint: enable=wrong-import-position
+
+
+# pylint: disable=too-few-public-methods
+class QuotaJobPlanner(GoogleAnalyticsJobPlanner):
+    """planner with a fixed number of requests left in the daily quota"""
+    def __init__(self, google_analytics_jobs: GoogleAnalyticsJobs,
+                 remaining_daily_requests: float) -> None:
+        super().__init__(google_analytics_jobs)
+        self.remaining_daily_requests = remaining_daily_requests
+
+    def get_remaining_daily_requests(self) -> float:
+        """requests left in the daily quota"""
+        return self.remaining_daily_requests
+# pylint: enable=too-few-public-methods
+
+
+class TestGoogleAnalyticsJobPlanner(unittest.TestCase):
+    """Test methods for google analytics job planner"""
+    job_configs = [JobConfig(DataFrequency.DAILY, DataModule.AGE),
+                   JobConfig(DataFrequency.DAILY, DataModule.GENDER)]
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.root_dir = "./tmp/google_analytics_job_planner"
+
+    def setUp(self) -> None:
+        """jobs whose data is extracted till 1 january 2024, 2 requests per day"""
+        os.makedirs(self.root_dir, exist_ok=True)
+        settings_file_path = os.path.join(self.root_dir, 'app_settings.json')
+        with open(settings_file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump({'Jobs': {'MaximumWorkers': 8, 'FetchPeriod': 'DAILY'},
+                       'RateLimit': {'Enabled': True,
+                                     'StateFilePath': os.path.join(self.root_dir,
+                                                                   'rate_limit_state.json'),
+                                     'RequestsPerSecond': 10,
+                                     'RequestsPer100Seconds': 100,
+                                     'RequestsPerDay': 50000,
+                                     'EstimatedSecondsPerRequest': 2,
+                                     'EstimatedPagesPerQuery': 2}}, file_obj)
+        self.google_analytics_jobs = GoogleAnalyticsJobs()
+        self.google_analytics_jobs.settings_helper = SettingsHelper(settings_file_path)
+        self.google_analytics_jobs.metadata_helper = MetadataHelper(
+            os.path.join(self.root_dir, 'metadata.json'))
+        for job_config in self.job_configs:
+            self.google_analytics_jobs.metadata_helper.save_metadata(
+                job_config, date(2024, 1, 1), JobStatus.SUCCESS)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the root directory after each test run"""
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_plan_should_share_tight_quota_between_jobs_in_turns(self):
+        """periods are given to the jobs in turns till the quota is used"""
+        planner = QuotaJobPlanner(self.google_analytics_jobs, 7)
+
+        job_plans = planner.plan(self.job_configs, date(2024, 1, 12))
+
+        self.assertEqual([job_plan.start_date for job_plan in job_plans],
+                         [date(2024, 1, 2)] * 2)
+        self.assertEqual([job_plan.pending_days for job_plan in job_plans], [10, 10])
+        self.assertEqual([job_plan.planned_days for job_plan in job_plans], [2, 1])
+        self.assertEqual([job_plan.end_date for job_plan in job_plans],
+                         [date(2024, 1, 4), date(2024, 1, 3)])
+        self.assertEqual([job_plan.estimated_requests for job_plan in job_plans], [4, 2])
+
+    def test_plan_should_plan_all_pending_days_with_generous_quota(self):
+        """jobs run till end date when the quota is enough"""
+        for remaining_daily_requests in [1000, math.inf]:
+            planner = QuotaJobPlanner(self.google_analytics_jobs, remaining_daily_requests)
+
+            job_plans = planner.plan(self.job_configs, date(2024, 1, 12))
+
+            self.assertEqual([job_plan.planned_days for job_plan in job_plans], [10, 10])
+            self.assertEqual([job_plan.end_date for job_plan in job_plans],
+                             [date(2024, 1, 12)] * 2)
+            self.assertEqual(sum(job_plan.estimated_requests for job_plan in job_plans), 40)
+
+    def test_plan_should_plan_nothing_without_quota(self):
+        """jobs don't move when the quota is used"""
+        job_plans = QuotaJobPlanner(self.google_analytics_jobs, 1) \
+            .plan(self.job_configs, date(2024, 1, 12))
+
+        self.assertEqual([job_plan.planned_days for job_plan in job_plans], [0, 0])
+        self.assertEqual([job_plan.end_date for job_plan in job_plans], [date(2024, 1, 2)] * 2)
+
+    def test_get_maximum_workers_should_match_rate_limit(self):
+        """workers in flight at the sustained rate, 1 request per second of 2 seconds"""
+        planner = GoogleAnalyticsJobPlanner(self.google_analytics_jobs)
+        self.assertEqual(planner.get_maximum_workers(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
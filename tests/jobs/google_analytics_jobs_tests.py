@@ -0,0 +1,121 @@
+"""Tests for google analytics jobs"""
+import sys
+import os
+import json
+import shutil
+import unittest
+from datetime import date, timedelta
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+import pandas as pd
+from helpers.enums import DataFrequency, DataModule, JobStatus, StorageFormat
+from helpers.metadata_helper import JobConfig, MetadataHelper
+from helpers.settings_helper import SettingsHelper
+from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+#pylint: enable=wrong-import-position
+
+class TestGoogleAnalyticsJobs(unittest.TestCase):
+    """Test methods for google analytics jobs"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.root_dir = "./tmp/google_analytics_jobs"
+
+    def setUp(self) -> None:
+        """jobs with the settings and metadata in the root directory"""
+        os.makedirs(self.root_dir, exist_ok=True)
+        settings_file_path = os.path.join(self.root_dir, 'app_settings.json')
+        with open(settings_file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump({'FileStorage': {'RootDir': self.root_dir, 'Format': 'PARQUET'}},
+                      file_obj)
+        self.google_analytics_jobs = GoogleAnalyticsJobs()
+        self.google_analytics_jobs.settings_helper = SettingsHelper(settings_file_path)
+        self.google_analytics_jobs.metadata_helper = MetadataHelper(
+            os.path.join(self.root_dir, 'metadata.json'))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the root directory after each test run"""
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def save_daily_data(self, start_date: date, number_of_days: int):
+        """save age data of the days as the daily job does, 1 session per dataset and day"""
+        for i in range(number_of_days):
+            extraction_date = start_date + timedelta(days=i)
+            self.google_analytics_jobs.file_helper.save_df_to_file(
+                pd.DataFrame([{'start_date': pd.Timestamp(extraction_date),
+                               'end_date': pd.Timestamp(extraction_date),
+                               'dataset_id': dataset_id,
+                               'age_bracket': '18-24',
+                               'sessions': 1} for dataset_id in ['1', '2']]),
+                self.google_analytics_jobs.get_data_file_path(DataFrequency.DAILY,
+                                                              DataModule.AGE,
+                                                              extraction_date),
+                DataModule.AGE)
+            self.google_analytics_jobs.metadata_helper.save_metadata(
+                JobConfig(DataFrequency.DAILY, DataModule.AGE), extraction_date,
+                JobStatus.SUCCESS)
+
+    def test_get_period_end_date_should_return_end_of_week_month_and_year(self):
+        """periods end on sunday, last day of month and 31 december"""
+        date_obj = date(2024, 2, 14)
+        self.assertEqual(self.google_analytics_jobs.get_period_end_date(
+            date_obj, DataFrequency.WEEKLY), date(2024, 2, 18))
+        self.assertEqual(self.google_analytics_jobs.get_period_end_date(
+            date_obj, DataFrequency.MONTHLY), date(2024, 2, 29))
+        self.assertEqual(self.google_analytics_jobs.get_period_end_date(
+            date_obj, DataFrequency.YEARLY), date(2024, 12, 31))
+
+    def get_extraction_periods(self, start_date: date, end_date: date,
+                               fetch_frequency: DataFrequency) -> list[tuple[date, date]]:
+        """(start date, end date) of the extraction periods"""
+        return [(period.start_date, period.end_date) for period in
+                self.google_analytics_jobs.get_extraction_periods(start_date, end_date,
+                                                                  fetch_frequency)]
+
+    def test_get_extraction_periods_should_group_days_by_week_and_month(self):
+        """first and last periods are partial, end date is excluded"""
+        start_date = date(2024, 1, 31)
+        end_date = date(2024, 3, 6)
+
+        weekly_periods = self.get_extraction_periods(start_date, end_date, DataFrequency.WEEKLY)
+        self.assertEqual(weekly_periods[0], (date(2024, 1, 31), date(2024, 2, 4)))
+        self.assertEqual(weekly_periods[1], (date(2024, 2, 5), date(2024, 2, 11)))
+        self.assertEqual(weekly_periods[-1], (date(2024, 3, 4), date(2024, 3, 5)))
+        self.assertEqual(len(weekly_periods), 6)
+
+        self.assertEqual(self.get_extraction_periods(start_date, end_date, DataFrequency.MONTHLY),
+                         [(date(2024, 1, 31), date(2024, 1, 31)),
+                          (date(2024, 2, 1), date(2024, 2, 29)),
+                          (date(2024, 3, 1), date(2024, 3, 5))])
+
+        daily_periods = self.get_extraction_periods(start_date, end_date, DataFrequency.DAILY)
+        self.assertEqual(len(daily_periods), 35)
+        self.assertTrue(all(start == end for start, end in daily_periods))
+        self.assertEqual(self.get_extraction_periods(start_date, start_date,
+                                                     DataFrequency.WEEKLY), [])
+
+    def test_rollup_job_should_recompute_only_changed_periods(self):
+        """monthly files sum the daily sessions, and only months with new days are rolled up"""
+        self.save_daily_data(date(2022, 1, 1), 40)
+        self.assertEqual(self.google_analytics_jobs.rollup_job(DataFrequency.MONTHLY,
+                                                               DataModule.AGE), 2)
+        self.assertEqual(self.google_analytics_jobs.rollup_job(DataFrequency.MONTHLY,
+                                                               DataModule.AGE), 0)
+        self.save_daily_data(date(2022, 2, 10), 3)
+        self.assertEqual(self.google_analytics_jobs.rollup_job(DataFrequency.MONTHLY,
+                                                               DataModule.AGE), 1)
+
+        monthly_df = self.google_analytics_jobs.file_helper.read_range(
+            DataFrequency.MONTHLY, DataModule.AGE, date(2022, 1, 1), date(2022, 2, 1),
+            root_dir=self.root_dir, storage_format=StorageFormat.PARQUET)
+        self.assertEqual(list(monthly_df['sessions']), [31, 31, 12, 12])
+        self.assertEqual(list(monthly_df['end_date']), [pd.Timestamp(2022, 1, 31)] * 2 +
+                         [pd.Timestamp(2022, 2, 28)] * 2)
+        metadata = self.google_analytics_jobs.metadata_helper.load_metadata(
+            DataFrequency.MONTHLY, DataModule.AGE)
+        self.assertEqual(metadata.last_data_extraction_date, date(2022, 2, 12))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for job scheduler"""
+import sys
+import os
+import threading
+import time
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.enums import JobStatus
+from jobs.job_scheduler import JobScheduler
+#pylint: enable=wrong-import-position
+
+class TestJobScheduler(unittest.TestCase):
+    """Test methods for job scheduler"""
+
+    def test_run_should_run_independent_jobs_concurrently(self):
+        """total time is about the time of the slowest job"""
+        scheduler = JobScheduler(3)
+        for name in ['AGE', 'GENDER', 'LANDING_PAGE']:
+            scheduler.register(name, lambda: time.sleep(0.2))
+
+        started_at = time.perf_counter()
+        job_runs = scheduler.run()
+        elapsed_seconds = time.perf_counter() - started_at
+
+        self.assertLess(elapsed_seconds, 0.5)
+        self.assertEqual([job_run.name for job_run in job_runs],
+                         ['AGE', 'GENDER', 'LANDING_PAGE'])
+        for job_run in job_runs:
+            self.assertEqual(job_run.job_status, JobStatus.SUCCESS)
+            self.assertGreaterEqual(job_run.elapsed_seconds, 0.2)
+
+    def test_run_should_run_dependencies_first_and_by_priority(self):
+        """jobs wait for their dependencies, and ready jobs start by priority"""
+        started = []
+        lock = threading.Lock()
+
+        def job(name):
+            def run():
+                with lock:
+                    started.append(name)
+            return run
+
+        scheduler = JobScheduler(1)
+        scheduler.register('backfill', job('backfill'), priority=30)
+        scheduler.register('recent', job('recent'), priority=1)
+        scheduler.register('rollup', job('rollup'), depends_on=['backfill', 'recent'])
+        scheduler.run()
+
+        self.assertEqual(started, ['recent', 'backfill', 'rollup'])
+
+    def test_run_should_not_run_dependents_of_failed_job(self):
+        """failure is reported, and the jobs depending on it are not run"""
+        def fail():
+            raise ValueError('api error')
+        started = []
+
+        scheduler = JobScheduler(2)
+        scheduler.register('extract', fail)
+        scheduler.register('transform', lambda: started.append('transform'),
+                           depends_on=['extract'])
+        scheduler.register('report', lambda: started.append('report'),
+                           depends_on=['transform'])
+        scheduler.register('other', lambda: started.append('other'))
+        job_runs = {job_run.name: job_run for job_run in scheduler.run()}
+
+        self.assertEqual(started, ['other'])
+        self.assertEqual(job_runs['extract'].job_status, JobStatus.FAILED)
+        self.assertEqual(job_runs['extract'].failure_reason, 'api error')
+        self.assertEqual(job_runs['report'].job_status, JobStatus.FAILED)
+        self.assertEqual(job_runs['other'].job_status, JobStatus.SUCCESS)
+
+    def test_run_should_raise_for_cyclic_dependencies(self):
+        """cycle in the dependencies is not allowed"""
+        scheduler = JobScheduler()
+        scheduler.register('a', lambda: None, depends_on=['b'])
+        scheduler.register('b', lambda: None, depends_on=['a'])
+        self.assertRaises(ValueError, scheduler.run)
+
+if __name__ == '__main__':
+    unittest.main()
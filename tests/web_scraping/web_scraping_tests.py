@@ -0,0 +1,134 @@
+"""Tests for web scraping"""
+import sys
+import os
+import json
+import shutil
+import threading
+import unittest
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+#pylint: disable=wrong-import-position
+from helpers.settings_helper import SettingsHelper
+from web_scraping import WebScraping
+#pylint: enable=wrong-import-position
+
+
+# pylint: disable=too-few-public-methods
+class CountingWebScraping(WebScraping):
+    """answers the council lookup page without a browser, and counts the pages"""
+    def __init__(self, settings_file_path: str) -> None:
+        super().__init__()
+        self.settings_helper = SettingsHelper(settings_file_path)
+        self.urls = []
+        self.lock = threading.Lock()
+        self.text = 'Results:1\nCouncil Name City of Burnside\nElectoral Ward Kensington Park'
+
+    def get_data_from_url(self, request_dto):
+        """results panel text of the lookup app"""
+        with self.lock:
+            self.urls.append(request_dto.url)
+        return self.text
+# pylint: enable=too-few-public-methods
+
+
+class TestWebScraping(unittest.TestCase):
+    """Test methods for web scraping"""
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.tmp_dir = "./tmp/web_scraping"
+        self.settings_file_path = os.path.join(self.tmp_dir, "app_settings.json")
+
+    def setUp(self) -> None:
+        """settings with council cache enabled"""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        with open(self.settings_file_path, 'w', encoding='UTF-8') as file_obj:
+            json.dump({'WebScraping': {'MaximumConcurrentRequests': 2},
+                       'CouncilCache': {'Enabled': True,
+                                        'Directory': os.path.join(self.tmp_dir, 'cache'),
+                                        'MaximumSizeInMegabytes': 1,
+                                        'TimeToLiveInSeconds': 3600}}, file_obj)
+        self.web_scraping = CountingWebScraping(self.settings_file_path)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """delete the settings and cache after each test run"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_find_council_by_address_should_use_cached_council(self):
+        """the council of an address written another way is read from the cache"""
+        council = self.web_scraping.find_council_by_address("130 L'Estrange Street, Glenunga")
+        cached_council = CountingWebScraping(self.settings_file_path) \
+            .find_council_by_address("130  l'estrange st. GLENUNGA")
+
+        self.assertEqual(len(self.web_scraping.urls), 1)
+        self.assertEqual(council['council_name'], 'City of Burnside')
+        self.assertEqual(cached_council, {'address': "130  l'estrange st. GLENUNGA",
+                                          'council_name': 'City of Burnside',
+                                          'electoral_ward': 'Kensington Park'})
+
+    def test_invalidate_council_by_address_should_look_up_address_again(self):
+        """invalidated address is looked up again"""
+        self.web_scraping.find_council_by_address('1 King William St, Adelaide')
+        self.web_scraping.invalidate_council_by_address('1 King William Street Adelaide')
+        self.web_scraping.find_council_by_address('1 King William St, Adelaide')
+
+        self.assertEqual(len(self.web_scraping.urls), 2)
+
+    def test_find_council_by_address_should_not_cache_unresolved_page(self):
+        """council of a page which timed out before showing the results is looked up again"""
+        # last text of the results panel is returned when the page times out
+        self.web_scraping.text = 'Loading...'
+        council = self.web_scraping.find_council_by_address('1 King William St, Adelaide')
+        self.assertEqual(council['council_name'], '')
+
+        self.web_scraping.text = 'Results:1\nCouncil Name City of Adelaide\nElectoral Ward Central'
+        council = self.web_scraping.find_council_by_address('1 King William St, Adelaide')
+
+        self.assertEqual(len(self.web_scraping.urls), 2)
+        self.assertEqual(council['council_name'], 'City of Adelaide')
+
+    def test_find_councils_by_addresses_should_skip_missing_addresses(self):
+        """None and empty addresses are skipped, the other addresses are looked up"""
+        councils = self.web_scraping.find_councils_by_addresses(
+            [None, '1 King William St, Adelaide', ''])
+
+        self.assertEqual([council['address'] for council in councils],
+                         ['1 King William St, Adelaide'])
+
+    def test_find_councils_by_addresses_should_look_up_each_address_once(self):
+        """same addresses are looked up once, and returned for each address in order"""
+        addresses = ['1 King William St, Adelaide', '2 Main Rd, Belair',
+                     '1 king william street adelaide', '2 Main Rd, Belair']
+
+        councils = self.web_scraping.find_councils_by_addresses(addresses)
+
+        self.assertEqual(len(self.web_scraping.urls), 2)
+        self.assertEqual([council['address'] for council in councils], addresses)
+
+        self.web_scraping.find_councils_by_addresses(addresses + ['3 Main Rd, Belair'])
+        self.assertEqual(len(self.web_scraping.urls), 3)
+
+    def test_find_councils_by_addresses_should_fall_back_to_browser_when_http_fails(self):
+        """addresses failed by the http backend are looked up in the lookup web app"""
+        with open(self.settings_file_path, 'w', encoding='UTF-8') as file_obj:
+            # nothing listens on port 9 of localhost, so the http lookup fails to connect
+            json.dump({'WebScraping': {'MaximumConcurrentRequests': 2},
+                       'CouncilLookup': {'Backend': 'HTTP',
+                                         'GeocodeUrl': 'http://127.0.0.1:9/geocode',
+                                         'CouncilLayerUrl': 'http://127.0.0.1:9/council',
+                                         'CouncilNameField': 'lga_name',
+                                         'TimeoutInSeconds': 1}}, file_obj)
+        web_scraping = CountingWebScraping(self.settings_file_path)
+
+        councils = web_scraping.find_councils_by_addresses(['1 King William St, Adelaide',
+                                                            '2 Main Rd, Belair'])
+
+        self.assertEqual(len(web_scraping.urls), 2)
+        self.assertEqual([council['council_name'] for council in councils],
+                         ['City of Burnside'] * 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,8 +4,6 @@
 import re
 import logging
 import time
-from datetime import datetime
-from threading import Semaphore, Thread
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
@@ -16,14 +14,23 @@ import backoff
 import requests
 from bs4 import BeautifulSoup
 from dtos.get_data_from_url_request_dto import GetDataFromUrlRequestDto
+from helpers.bulk_executor_helper import BulkExecutorHelper
+from helpers.council_lookup_helper import CouncilLookupBackend, FallbackCouncilLookup
+from helpers.council_lookup_helper import HttpCouncilLookup, SeleniumCouncilLookup
+from helpers.disk_cache_helper import DiskCacheHelper
+from helpers.page_readiness_helper import LatencyHistogram, PageReadinessHelper
 from helpers.settings_helper import SettingsHelper
+from helpers.string_helper import StringHelper
+from helpers.web_driver_pool_helper import WebDriverPoolHelper
 
 
+# pylint: disable=too-many-public-methods
 class WebScraping():
     """web scraping"""
     def __init__(self) -> None:
         self.log = logging.getLogger(__name__)
         self.settings_helper = SettingsHelper()
+        self.string_helper = StringHelper()
 
     def extract_value_replacing_prefix(self, text_array, prefix):
         '''
@@ -47,6 +54,18 @@ class WebScraping():
         return options
 
 
+    def get_web_driver_pool(self, is_headless) -> WebDriverPoolHelper:
+        '''
+        Get pool of chrome drivers shared by the web scrapings, sized by MaximumConcurrentRequests
+        '''
+        options = self.get_chrome_options(is_headless)
+        return WebDriverPoolHelper.get_instance(
+            ('chrome', is_headless),
+            lambda: webdriver.Chrome(options=options),
+            self.settings_helper.get_web_scraping_maximum_concurrent_requests(),
+            self.settings_helper.get_web_scraping_maximum_pages_per_driver())
+
+
     def on_backoff_handler(self, details):
         '''
         Handler function when the backoff occurs. It simply logs the message
@@ -58,6 +77,13 @@ class WebScraping():
         #     tries calling function {details.get('target')} with args {details.get('args')}
         #     and kwargs {details.get('kwargs')}")
 
+    def get_latency_histogram(self) -> LatencyHistogram:
+        '''
+        Get histogram of the time until the data of get_data_from_url is ready
+        '''
+        return LatencyHistogram.get_instance('get_data_from_url')
+
+
     # backoff reference: https://pypi.org/project/backoff/
     # TODO, if the url is no longer valid, and the page redirects,
         # it will raise Timeout exception, because the element by xpath is not available
@@ -75,33 +101,24 @@ class WebScraping():
         '''
         if request_dto.url is None or request_dto.url == '':
             raise ValueError('url is required')
-        start_time = datetime.now()
-        default_wait_secs = 5
+        started_at = time.monotonic()
+        page_readiness = PageReadinessHelper(self.get_latency_histogram(),
+                                             request_dto.poll_interval_in_seconds)
 
-        options = self.get_chrome_options(request_dto.is_headless)
-        with webdriver.Chrome(options=options) as driver:
+        with self.get_web_driver_pool(request_dto.is_headless).driver() as driver:
             self.log.info('Fetching data from url %s', request_dto.url)
             driver.get(request_dto.url)
-            text = ''
-            while True:
-                rows = WebDriverWait(driver, 20).until(
-                    EC.visibility_of_all_elements_located((By.XPATH, request_dto.xpath)))
-                if len(rows) > 0:
-                    text = rows[0].text
-                # wait some seconds before next try
-                sleep_timeout = default_wait_secs if \
-                    request_dto.timeout_in_seconds > default_wait_secs \
-                    else request_dto.timeout_in_seconds
-                time.sleep(sleep_timeout)
-                if text not in request_dto.to_exclude:
-                    break
-
-                # if we couldnot find data in timeout,
-                # then simply ignore it, else there is possibility of infinite loop
-                difference_time = datetime.now() - start_time
-                if difference_time.total_seconds() > request_dto.timeout_in_seconds:
-                    print(f'Wait Timeout of {request_dto.timeout_in_seconds} seconds exceeded')
-                    break
+            WebDriverWait(driver, 20).until(
+                EC.visibility_of_all_elements_located((By.XPATH, request_dto.xpath)))
+            # if we couldnot find data in timeout,
+            # then simply return the last text, else there is possibility of infinite loop
+            text, is_ready = page_readiness.wait_for_text(
+                driver, request_dto.xpath, request_dto.to_exclude,
+                request_dto.timeout_in_seconds - (time.monotonic() - started_at),
+                request_dto.stable_for_seconds, started_at)
+            if not is_ready:
+                self.log.warning('Wait Timeout of %s seconds exceeded for url %s',
+                                 request_dto.timeout_in_seconds, request_dto.url)
 
         if text == '':
             self.log.info('Couldnot retrieve data. So, return None')
@@ -130,6 +147,78 @@ class WebScraping():
     #             return None
 
 
+    def get_council_cache(self) -> DiskCacheHelper:
+        '''
+        Get cache of councils by normalized address, None if the cache is disabled
+        '''
+        return DiskCacheHelper.from_settings(self.settings_helper.get_council_cache_settings())
+
+
+    def get_council_cache_key(self, address: str) -> dict:
+        '''
+        Get cache key of the address, same for the ways of writing the address
+        '''
+        return {'council_by_address': self.string_helper.normalize_address(address)}
+
+
+    def invalidate_council_by_address(self, address: str):
+        '''
+        Remove the cached council of the address, so that it is looked up again
+        '''
+        council_cache = self.get_council_cache()
+        if council_cache is not None:
+            council_cache.invalidate(self.get_council_cache_key(address))
+
+
+    def get_cached_council(self, address: str):
+        '''
+        Get council of the address from the cache, None if it is not cached
+        '''
+        council_cache = self.get_council_cache()
+        if council_cache is None:
+            return None
+        council = council_cache.get(self.get_council_cache_key(address))
+        if council is None:
+            return None
+        return {**council, 'address': address}
+
+
+    def set_cached_council(self, council):
+        '''
+        Cache the council found for its address, for TimeToLiveInSeconds of CouncilCache.
+        Councils without name, as when the page timed out before showing the results,
+        are not cached, so that they are looked up again
+        '''
+        council_cache = self.get_council_cache()
+        if council_cache is None or not isinstance(council, dict) \
+            or not council.get('council_name'):
+            return
+        council_cache.set(self.get_council_cache_key(council['address']), council,
+                          self.settings_helper.get_council_cache_settings().get(
+                              'TimeToLiveInSeconds'))
+
+
+    def get_council_lookup(self, timeout_in_seconds=600, is_headless=True) -> CouncilLookupBackend:
+        '''
+        Get backend looking up councils, set by Backend of CouncilLookup.
+        HTTP queries the geocode and feature services of the lookup web app directly,
+        and falls back to the web app in chrome for the addresses it failed.
+        SELENIUM, or HTTP without its urls, reads the web app in chrome
+        '''
+        selenium_lookup = SeleniumCouncilLookup(
+            self, timeout_in_seconds, is_headless,
+            self.settings_helper.get_web_scraping_maximum_concurrent_requests())
+        lookup_settings = self.settings_helper.get_council_lookup_settings()
+        if str(lookup_settings.get('Backend')).upper() != 'HTTP':
+            return selenium_lookup
+        if not HttpCouncilLookup.is_configured(lookup_settings):
+            self.log.warning('GeocodeUrl, CouncilLayerUrl and CouncilNameField of '
+                             'CouncilLookup are required by HTTP backend, so use SELENIUM')
+            return selenium_lookup
+        return FallbackCouncilLookup([HttpCouncilLookup.get_instance(lookup_settings),
+                                      selenium_lookup])
+
+
     def find_council_by_address(self, address:str, timeout_in_seconds=600, is_headless=True):
         '''
         Finds council by address
@@ -138,10 +227,26 @@ class WebScraping():
         wait before returning None
         is_headless: if False, a chrome browser will popup, 
         else the operation will be done in background
+        Councils are looked up by the backend of get_council_lookup, and found councils
+        are cached by normalized address, for TimeToLiveInSeconds of CouncilCache
         '''
         if address is None or address == '':
             raise ValueError('address is required')
 
+        council = self.get_cached_council(address)
+        if council is not None:
+            return council
+
+        council = self.get_council_lookup(timeout_in_seconds, is_headless).find_council(address)
+        self.set_cached_council(council)
+        return council
+
+
+    def find_council_by_address_in_browser(self, address:str, timeout_in_seconds=600,
+                                           is_headless=True):
+        '''
+        Finds council by address from the results panel of the lookup web app, not cached
+        '''
         address_encoded = quote(address)
         app_id = 'db6cce7b773746b4a1d4ce544435f9da'
         base_url = 'https://lga-sa.maps.arcgis.com/apps/instant/lookup/index.html'
@@ -159,12 +264,17 @@ class WebScraping():
         electoral_ward = self.extract_value_replacing_prefix(
             text_array, "Electoral Ward")
 
-        return {'address': address, 'council_name': council_name, 'electoral_ward': electoral_ward}
+        return {'address': address, 'council_name': council_name,
+                'electoral_ward': electoral_ward}
 
 
     def find_councils_by_addresses(self, addresses: list, is_headless=True, timeout_in_seconds=600):
         '''
-        Find councils by addresses in parallel
+        Find councils by addresses in parallel, returned in the order of addresses.
+        Addresses which failed are logged and skipped.
+        Addresses are normalized, and the council of an address written in different ways
+        is found once. Addresses not cached are looked up together by the backend of
+        get_council_lookup
         Example: 
         # with less timeout, to check test timeout feature. 
         # Without timeout, there is possibility of infinite loop
@@ -173,33 +283,74 @@ class WebScraping():
         # with default timeout, this generally gives data
         # print('council details ', find_council_by_address("130 L'Estrange Street, Glenunga"))
         '''
-        # maximum number of concurrent requests at a time
-        semaphore = Semaphore(self.settings_helper.get_web_scraping_maximum_concurrent_requests())
-
-        threads = []
-
-        def find_council(address, all_councils):
-            with semaphore:
-                try:
-                    council = self.find_council_by_address(
-                        address, timeout_in_seconds, is_headless)
-                    all_councils.append(council)
-                except Exception as ex:
-                    # simply log the exception, don't raise it further
-                    self.log.error(ex, exc_info=True)
-                    raise ex
+        # normalized address -> first address written that way
+        unique_addresses = {}
+        for address in addresses:
+            if address is None or address == '':
+                self.log.error('Failed for %s, address is required', address)
+                continue
+            unique_addresses.setdefault(self.string_helper.normalize_address(address), address)
+        councils = {key: self.get_cached_council(address)
+                    for key, address in unique_addresses.items()}
+        uncached_keys = [key for key, council in councils.items() if council is None]
+        results = self.get_council_lookup(timeout_in_seconds, is_headless).find_councils(
+            [unique_addresses[key] for key in uncached_keys])
+        for key, result in zip(uncached_keys, results):
+            # failed addresses are left out of councils
+            del councils[key]
+            if result.error is not None:
+                self.log.error('Failed for %s', result.input_value, exc_info=result.error)
+                continue
+            self.set_cached_council(result.value)
+            councils[key] = result.value
+        self.get_latency_histogram().log_report(self.log)
 
         all_councils = []
         for address in addresses:
-            thread = Thread(target=find_council, args=(address, all_councils))
-            threads.append(thread)
-            thread.start()
+            if address is None or address == '':
+                continue
+            key = self.string_helper.normalize_address(address)
+            if key not in councils:
+                continue
+            council = councils[key]
+            all_councils.append({**council, 'address': address}
+                                if isinstance(council, dict) else council)
+        return all_councils
 
-        # print('Wait for all threads to complete ')
-        for thread in threads:
-            thread.join()
 
-        return all_councils
+    def get_bulk_executor(self) -> BulkExecutorHelper:
+        '''
+        Get executor running MaximumConcurrentRequests requests at a time
+        '''
+        return BulkExecutorHelper(
+            self.settings_helper.get_web_scraping_maximum_concurrent_requests())
+
+
+    def get_values(self, results) -> list:
+        '''
+        Get values of the bulk results in their order, errors are logged and skipped.
+        Latencies of the pages so far are logged at the end
+        '''
+        values = []
+        for result in results:
+            if result.error is not None:
+                self.log.error('Failed for %s', result.input_value, exc_info=result.error)
+                continue
+            values.append(result.value)
+        self.get_latency_histogram().log_report(self.log)
+        return values
+
+
+    def iter_councils_by_addresses(self, addresses: list, is_headless=True,
+                                   timeout_in_seconds=600, is_ordered=False):
+        '''
+        Yields BulkResultDto of council of each address as they finish,
+        or in the order of addresses if is_ordered
+        '''
+        return self.get_bulk_executor().iter_results(
+            lambda address: self.find_council_by_address(address, timeout_in_seconds,
+                                                         is_headless),
+            addresses, is_ordered)
 
 
     def find_address_from_sacommunity_website(self,
@@ -259,32 +410,27 @@ class WebScraping():
                                                 is_headless=True,
                                                 timeout_in_seconds=600):
         '''
-        Retrieves addresses from the sa-community website for given lists of urls in parallel
+        Retrieves addresses from the sa-community website for given lists of urls in parallel,
+        returned in the order of urls. Urls which failed are logged and skipped
         '''
-        semaphore = Semaphore(self.settings_helper.get_web_scraping_maximum_concurrent_requests())
+        return self.get_values(self.iter_addresses_from_sacommunity_website(
+            urls, is_headless, timeout_in_seconds, is_ordered=True))
 
-        threads = []
 
-        def find_addr(url, all_address):
-            with semaphore:
-                try:
-                    addr = self.find_address_from_sacommunity_website(
-                        url, is_headless, timeout_in_seconds)
-                    council = self.get_council_from_sacommunity_website(url)
-                    all_address.append(
-                        {'url': url, 'address': addr, 'council_in_sacommunity_website': council})
-                except Exception as ex:
-                    self.log.error(ex, exc_info=True)
-                    raise ex
-
-        all_address = []
-        for url in urls:
-            thread = Thread(target=find_addr, args=(url, all_address))
-            threads.append(thread)
-            thread.start()
-
-        # print('Wait for all threads to complete ')
-        for thread in threads:
-            thread.join()
-
-        return all_address
+    def iter_addresses_from_sacommunity_website(self,
+                                                urls: list,
+                                                is_headless=True,
+                                                timeout_in_seconds=600,
+                                                is_ordered=False):
+        '''
+        Yields BulkResultDto of address and council of each url as they finish,
+        or in the order of urls if is_ordered
+        '''
+        def find_address(url):
+            address = self.find_address_from_sacommunity_website(
+                url, is_headless, timeout_in_seconds)
+            council = self.get_council_from_sacommunity_website(url)
+            return {'url': url, 'address': address, 'council_in_sacommunity_website': council}
+
+        return self.get_bulk_executor().iter_results(find_address, urls, is_ordered)
+# pylint: enable=too-many-public-methods
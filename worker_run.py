@@ -0,0 +1,42 @@
+"""Entry point for a worker sharing google analytics extraction through the work queue.
+Run it in as many processes, or hosts sharing the work queue file, as needed"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import socket
+import sys
+import os
+import logging
+# insert current path to system path, so that we can import python file
+sys.path.insert(1, os.getcwd())
+# pylint: disable=wrong-import-position
+from helpers.enums import DataFrequency, DataModule
+from jobs.google_analytics_jobs import GoogleAnalyticsJobs
+from job_run import setup_logging
+# pylint: enable=wrong-import-position
+
+
+def main():
+    """enqueue the pending days of the daily jobs, and extract them till the queue is empty"""
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    google_analytics_jobs = GoogleAnalyticsJobs()
+    end_date = datetime.now().date()
+    logger.info("Worker Started at %s", datetime.now())
+
+    # units already in the queue are skipped, so every worker can enqueue
+    for data_module in [DataModule.AGE, DataModule.GENDER, DataModule.LANDING_PAGE]:
+        google_analytics_jobs.enqueue_job(DataFrequency.DAILY, data_module, end_date)
+
+    maximum_workers = max(1, google_analytics_jobs.settings_helper.get_jobs_maximum_workers())
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    with ThreadPoolExecutor(max_workers=maximum_workers) as executor:
+        processed = sum(executor.map(google_analytics_jobs.run_worker,
+                                     [f'{worker_id}:{i}' for i in range(maximum_workers)]))
+
+    logger.info("Worker Completed at %s, processed %s units, queue %s", datetime.now(),
+                processed, google_analytics_jobs.get_work_queue().get_counts())
+
+
+if __name__ == "__main__":
+    main()